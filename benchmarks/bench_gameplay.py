@@ -0,0 +1,203 @@
+"""
+Benchmarks for the gameplay hot paths.
+
+Runs the game headless (SDL dummy video driver) and times the phases that dominate
+a gameplay frame, for every combination of level size and enemy count:
+
+- `update`: one `Gameplay.update` tick (reported as ticks/sec as well).
+- `draw`: one `Gameplay.draw` to the offscreen screen surface.
+- `tile_collision`: one `CollisionManager.check_tile_collision` query.
+- `chase`: one `ChasePlayerBehavior.execute` call.
+
+`AssetManager.load_assets_from_config` is timed once per run as `assets/load`.
+
+Each phase is repeated several times and the best repeat is kept, which filters out
+most scheduling noise. With `--compare`, results are checked against a stored baseline
+and the run exits with status 1 if any phase is slower than the baseline by more than
+the tolerance, or with status 2 if there is no baseline to compare against.
+
+Baselines are per-machine: timings depend on the CPU, its clock and whatever else is
+running, so a baseline recorded elsewhere says nothing about a regression here. The
+baseline file is not checked in; record one on the machine that will compare against
+it, from a known-good revision, and re-record it when the hardware changes.
+
+Usage:
+    python -m benchmarks.bench_gameplay                     # run and print timings
+    python -m benchmarks.bench_gameplay --save-baseline     # record this machine's baseline
+    python -m benchmarks.bench_gameplay --compare           # check against that baseline
+    python -m benchmarks.bench_gameplay --sizes 64 --enemies 10 1000
+    python -m benchmarks.bench_gameplay --ai-workers 8      # enemy AI in worker processes
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import pygame
+from game.ai_manager import ChasePlayerBehavior
+from game.asset_manager import AssetManager
+from game.game import Game
+from entities.enemy import Enemy
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_SIZES = (16, 64, 128)
+DEFAULT_ENEMIES = (1, 100, 1000)
+
+
+def make_layout(size):
+    """Builds a square layout with an outer wall and a sprinkling of inner walls."""
+    rng = random.Random(size)
+    layout = []
+    for row in range(size):
+        line = []
+        for col in range(size):
+            edge = row in (0, size - 1) or col in (0, size - 1)
+            line.append("W" if edge or rng.random() < 0.1 else "F")
+        layout.append("".join(line))
+    return layout
+
+
+def setup_gameplay(game, size, enemy_count):
+    """Loads a generated level into the gameplay state and populates it with enemies."""
+    gameplay = game.state_manager.states["Gameplay"]
+    gameplay.level.load(make_layout(size))
+    tile_size = gameplay.collision_manager.cell_size
+    rng = random.Random(enemy_count)
+    sprite = game.asset_manager.get_image("enemy")
+    span = (size - 2) * tile_size - sprite.get_width()
+    gameplay.enemies = [
+        Enemy(tile_size + rng.randrange(max(span, 1)), tile_size + rng.randrange(max(span, 1)),
+              sprite, 50, gameplay.enemy_behavior)
+        for _ in range(enemy_count)
+    ]
+    gameplay.player.rect.center = (size * tile_size // 2, size * tile_size // 2)
+    gameplay.level.stream_around(gameplay.player.rect.center, wait=True)
+    gameplay.player.health = float("inf")  # Keep the player alive for the whole run
+    game.state_manager.change_state("Gameplay")
+    return gameplay
+
+
+def best_time(func, calls, repeats, setup=None):
+    """
+    Returns the best average duration of one call, in milliseconds. `setup`, if
+    given, runs untimed before each repeat so every repeat starts from the same state.
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best * 1000
+
+
+def run_scenario(game, size, enemy_count, ticks, repeats):
+    """Times every phase for one level size / enemy count combination."""
+    gameplay = setup_gameplay(game, size, enemy_count)
+
+    def reset():
+        setup_gameplay(game, size, enemy_count)
+
+    def reset_and_bake():
+        reset()
+        gameplay.draw(game.screen)  # Keep the one-off level bake out of the timing
+
+    collision_manager = gameplay.collision_manager
+    tile_size = collision_manager.cell_size
+    rng = random.Random(0)
+    rects = [pygame.Rect(rng.randrange(size * tile_size), rng.randrange(size * tile_size), 50, 50)
+             for _ in range(1000)]
+    rect_iter = iter(rects * (ticks * repeats))
+    chase = ChasePlayerBehavior()
+    probe = Enemy(tile_size, tile_size, game.asset_manager.get_image("enemy"), 50, chase)
+
+    results = {
+        "update": best_time(gameplay.update, ticks, repeats, reset),
+        "draw": best_time(lambda: gameplay.draw(game.screen), ticks, repeats, reset_and_bake),
+        "tile_collision": best_time(lambda: collision_manager.check_tile_collision(next(rect_iter), "Wall"),
+                                    1000, repeats),
+        "chase": best_time(lambda: chase.execute(probe, gameplay.player, collision_manager), 1000, repeats),
+    }
+    return results
+
+
+def time_asset_loading(repeats):
+    """Times a cold load of the asset configuration."""
+    return best_time(lambda: AssetManager().load_assets_from_config("assets_config.json"), 1, repeats)
+
+
+def compare(results, baseline, tolerance):
+    """Returns a list of human-readable regressions against the baseline."""
+    regressions = []
+    for key, value in sorted(results.items()):
+        reference = baseline.get(key)
+        if reference and value > reference * (1 + tolerance):
+            regressions.append(f"{key}: {value:.4f} ms vs baseline {reference:.4f} ms "
+                               f"(+{(value / reference - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="level widths/heights in tiles")
+    parser.add_argument("--enemies", type=int, nargs="+", default=DEFAULT_ENEMIES,
+                        help="enemy counts")
+    parser.add_argument("--ticks", type=int, default=30, help="ticks per timed repeat")
+    parser.add_argument("--repeats", type=int, default=5, help="repeats per phase; the best is kept")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="allowed slowdown against the baseline, as a fraction")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file to compare against")
+    parser.add_argument("--compare", action="store_true",
+                        help="fail if any phase is slower than the baseline by more than the tolerance")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--ai-workers", type=int, default=0,
+                        help="worker processes for enemy AI (0 runs it on the main thread)")
+    parser.add_argument("--ai-lod", action="store_true", help="update far-off enemy AI less often")
+    parser.add_argument("--ai-budget-ms", type=float, default=None, help="AI time budget per tick with --ai-lod")
+    args = parser.parse_args(argv)
+
+    game = Game(headless=True, ai_workers=args.ai_workers, ai_lod=args.ai_lod, ai_budget_ms=args.ai_budget_ms)
+    results = {"assets/load": time_asset_loading(args.repeats)}
+    print(f"{'scenario':<24}{'ticks/sec':>12}{'update ms':>12}{'draw ms':>12}"
+          f"{'tile coll ms':>14}{'chase ms':>12}")
+    for size in args.sizes:
+        for enemy_count in args.enemies:
+            scenario = f"level{size}x{size}/enemies{enemy_count}"
+            phases = run_scenario(game, size, enemy_count, args.ticks, args.repeats)
+            print(f"{scenario:<24}{1000 / phases['update']:>12.1f}{phases['update']:>12.4f}"
+                  f"{phases['draw']:>12.4f}{phases['tile_collision']:>14.5f}{phases['chase']:>12.5f}")
+            for phase, value in phases.items():
+                results[f"{scenario}/{phase}"] = value
+    print(f"assets/load: {results['assets/load']:.3f} ms")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not args.compare:
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one.", file=sys.stderr)
+        return 2
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\nPERFORMANCE REGRESSION (tolerance {args.tolerance:.0%}):")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,8 @@
 from .entity import Entity
 
 class Enemy(Entity):
+    __slots__ = ("ai_behavior", "speed")
+
     def __init__(self, x, y, sprite, health, ai_behavior=None):
         super().__init__(x, y, sprite, health)
         self.ai_behavior = ai_behavior
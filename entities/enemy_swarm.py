@@ -0,0 +1,304 @@
+import numpy as np
+import pygame
+from game.ai_manager import AIBehavior
+from level.tile import tile_ids_matching
+
+
+class EnemySwarm:
+    """
+    An array-backed group of enemies sharing one sprite. Positions, speeds, health
+    and sizes live in NumPy arrays so that AI steps and collision tests can run
+    over the whole group with a handful of vectorized operations instead of one
+    Python call per enemy.
+
+    The swarm follows the same contract as `Enemy`: `update(player, collision_manager)`
+    runs its AI behavior, `draw(screen, alpha)` renders it and `take_damage` applies damage.
+    Indexing a swarm returns a `SwarmEnemy` view that can be used wherever a single
+    enemy is expected.
+
+    Attributes:
+        sprite (pygame.Surface): The sprite drawn for every member of the swarm.
+        ai_behavior (AIBehavior): The behavior executed with the whole swarm as the enemy.
+        x, y (numpy.ndarray): Top-left positions of the members.
+        prev_x, prev_y (numpy.ndarray): Positions at the start of the current tick, for
+            render interpolation.
+        speed (numpy.ndarray): Movement speed of each member, in pixels per tick.
+        health (numpy.ndarray): Remaining health of each member.
+        width, height (numpy.ndarray): Collision size of each member.
+    """
+
+    def __init__(self, sprite, ai_behavior=None):
+        self.sprite = sprite
+        self.ai_behavior = ai_behavior
+        self.x = np.zeros(0, dtype=np.int64)
+        self.y = np.zeros(0, dtype=np.int64)
+        self.prev_x = np.zeros(0, dtype=np.int64)
+        self.prev_y = np.zeros(0, dtype=np.int64)
+        self.speed = np.zeros(0, dtype=np.int64)
+        self.health = np.zeros(0, dtype=np.int64)
+        self.width = np.zeros(0, dtype=np.int64)
+        self.height = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError("swarm index out of range")
+        return SwarmEnemy(self, index % len(self))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield SwarmEnemy(self, index)
+
+    def spawn(self, xs, ys, health, speed=1):
+        """
+        Adds members at the given positions. Scalars or sequences are accepted for
+        every argument; sizes are taken from the shared sprite.
+        """
+        xs = np.atleast_1d(np.asarray(xs, dtype=np.int64))
+        ys = np.broadcast_to(np.asarray(ys, dtype=np.int64), xs.shape)
+        count = len(xs)
+        width, height = self.sprite.get_size()
+        self.x = np.concatenate((self.x, xs))
+        self.y = np.concatenate((self.y, ys))
+        self.prev_x = np.concatenate((self.prev_x, xs))
+        self.prev_y = np.concatenate((self.prev_y, ys))
+        self.speed = np.concatenate((self.speed, np.broadcast_to(np.asarray(speed, dtype=np.int64), (count,))))
+        self.health = np.concatenate((self.health, np.broadcast_to(np.asarray(health, dtype=np.int64), (count,))))
+        self.width = np.concatenate((self.width, np.full(count, width, dtype=np.int64)))
+        self.height = np.concatenate((self.height, np.full(count, height, dtype=np.int64)))
+
+    def update(self, player, collision_manager):
+        if self.ai_behavior:
+            self.ai_behavior.execute(self, player, collision_manager)
+
+    def store_previous_positions(self):
+        """Remembers the current positions; called at the start of every simulation tick."""
+        self.prev_x[:] = self.x
+        self.prev_y[:] = self.y
+
+    def draw(self, screen, alpha=1.0, offset=(0, 0), view=None):
+        """
+        Draws every member, interpolated `alpha` of the way from its previous to its
+        latest position and moved by `offset`. With a view (a world-space rect), only
+        the members overlapping it are drawn.
+        """
+        sprite = self.sprite
+        if alpha == 1.0:
+            x, y = self.x, self.y
+        else:
+            x = self.prev_x + (self.x - self.prev_x) * alpha
+            y = self.prev_y + (self.y - self.prev_y) * alpha
+        if view is not None:
+            visible = ((x < view.right) & (x + self.width > view.left) &
+                       (y < view.bottom) & (y + self.height > view.top))
+            x, y = x[visible], y[visible]
+        x = x + offset[0]
+        y = y + offset[1]
+        screen.blits([(sprite, position) for position in zip(x.tolist(), y.tolist())], False)
+
+    def colliding_indices(self, rect):
+        """Returns the indices of the members whose bounding box overlaps a rect."""
+        hits = ((self.x < rect.right) & (self.x + self.width > rect.left) &
+                (self.y < rect.bottom) & (self.y + self.height > rect.top))
+        return np.flatnonzero(hits)
+
+    def take_damage(self, indices, amount):
+        """
+        Damages the given members (an index, index array or boolean mask); members
+        whose health drops to zero or below die.
+        """
+        self.health[indices] -= amount
+        dead = np.flatnonzero(self.health <= 0)
+        if len(dead):
+            self.die(dead)
+
+    def die(self, indices):
+        """Removes the given members from the swarm."""
+        keep = np.ones(len(self), dtype=bool)
+        keep[indices] = False
+        for name in ("x", "y", "prev_x", "prev_y", "speed", "health", "width", "height"):
+            setattr(self, name, getattr(self, name)[keep])
+
+
+class SwarmEnemy:
+    """
+    A view of a single swarm member exposing the `Enemy` attributes. Views are
+    positional, so they should not be kept across ticks in which members die.
+    """
+
+    def __init__(self, swarm, index):
+        self.swarm = swarm
+        self.index = index
+        self.sprite = swarm.sprite
+        self.ai_behavior = swarm.ai_behavior
+
+    @property
+    def x(self):
+        return int(self.swarm.x[self.index])
+
+    @x.setter
+    def x(self, value):
+        self.swarm.x[self.index] = value
+
+    @property
+    def y(self):
+        return int(self.swarm.y[self.index])
+
+    @y.setter
+    def y(self, value):
+        self.swarm.y[self.index] = value
+
+    @property
+    def speed(self):
+        return int(self.swarm.speed[self.index])
+
+    @property
+    def health(self):
+        return int(self.swarm.health[self.index])
+
+    @property
+    def rect(self):
+        swarm, index = self.swarm, self.index
+        return pygame.Rect(int(swarm.x[index]), int(swarm.y[index]),
+                           int(swarm.width[index]), int(swarm.height[index]))
+
+    @rect.setter
+    def rect(self, rect):
+        self.swarm.x[self.index], self.swarm.y[self.index] = rect.topleft
+
+    def move(self, dx, dy):
+        self.swarm.x[self.index] += dx
+        self.swarm.y[self.index] += dy
+
+    @property
+    def prev_x(self):
+        return int(self.swarm.prev_x[self.index])
+
+    @property
+    def prev_y(self):
+        return int(self.swarm.prev_y[self.index])
+
+    def interpolated_position(self, alpha):
+        x, y = self.x, self.y
+        return (self.prev_x + (x - self.prev_x) * alpha,
+                self.prev_y + (y - self.prev_y) * alpha)
+
+    def draw(self, screen, alpha=1.0, offset=(0, 0)):
+        x, y = self.interpolated_position(alpha)
+        screen.blit(self.sprite, (x + offset[0], y + offset[1]))
+
+    def take_damage(self, amount):
+        self.swarm.take_damage(self.index, amount)
+
+
+class SwarmChasePlayerBehavior(AIBehavior):
+    """
+    The vectorized counterpart of `ChasePlayerBehavior` for an `EnemySwarm`. Every
+    member steps towards the player on each axis by its speed, and the move is
+    resolved like `CollisionManager.move_rect`: along x first, then along y from the
+    resolved x, each axis stopping flush against the first wall cell in its way. So
+    members slide along walls and cannot pass through them however fast they move.
+
+    Wall tests run against a summed-area table of the level's wall cells, built
+    straight from the tile ID arrays of the resident chunks, so testing a grid line
+    costs four array lookups per member no matter how many cells the rect spans.
+    The table is rebuilt only when the level's layout revision changes.
+    """
+
+    def __init__(self, tile_type="Wall"):
+        self.tile_type = tile_type
+        self._grid_key = None
+        self._table = None
+        self._origin = (0, 0)
+
+    def execute(self, swarm, player, collision_manager):
+        """
+        Moves every member of the swarm one step towards the player.
+
+        Parameters:
+            swarm (EnemySwarm): The swarm executing this behavior.
+            player (Player): The target player entity.
+            collision_manager (CollisionManager): Provides the level.
+        """
+        if not len(swarm):
+            return
+        dx = np.sign(player.x - swarm.x).astype(np.int64) * swarm.speed
+        dy = np.sign(player.y - swarm.y).astype(np.int64) * swarm.speed
+
+        swarm.x += self.sweep(collision_manager, swarm.x, swarm.x + swarm.width,
+                              swarm.y, swarm.y + swarm.height, dx, False)
+        swarm.y += self.sweep(collision_manager, swarm.y, swarm.y + swarm.height,
+                              swarm.x, swarm.x + swarm.width, dy, True)
+
+    def sweep(self, collision_manager, start, end, across_start, across_end, delta, vertical):
+        """
+        `CollisionManager._sweep` over arrays of spans: returns how far, up to `delta`,
+        each span [start, end) can move along one axis before entering a wall cell,
+        where [across_start, across_end) is its span on the other axis. The grid lines
+        the spans' leading edges cross are tested one at a time for all spans still
+        moving, so the number of passes is the most cells any span crosses.
+        """
+        table = self.wall_table(collision_manager)
+        if table is None:
+            return delta
+        size = collision_manager.cell_size
+        origin_col, origin_row = self._origin
+        # Index the table as [across, line] on either axis.
+        table = table.T if vertical else table
+        line_origin, across_origin = (origin_row, origin_col) if vertical else (origin_col, origin_row)
+        lines, across = table.shape[1] - 1, table.shape[0] - 1
+
+        forward = delta > 0
+        first = np.where(forward, (end - 1) // size + 1, start // size - 1) - line_origin
+        last = np.where(forward, (end - 1 + delta) // size, (start + delta) // size) - line_origin
+        crossed = np.where(forward, last - first + 1, first - last + 1)
+        step = np.where(forward, 1, -1)
+        across0 = across_start // size - across_origin
+        across1 = (across_end - 1) // size - across_origin
+        moving = ((crossed > 0) & (end > start) & (across_end > across_start) &
+                  (across1 >= 0) & (across0 < across))
+        across0 = np.clip(across0, 0, across - 1)
+        across1 = np.clip(across1, 0, across - 1) + 1
+
+        delta = delta.copy()
+        index = np.flatnonzero(moving)
+        passes = 0
+        while len(index):
+            line = first[index] + step[index] * passes
+            clipped = np.clip(line, 0, lines - 1)
+            low, high = across0[index], across1[index]
+            walls = (table[high, clipped + 1] - table[low, clipped + 1]
+                     - table[high, clipped] + table[low, clipped])
+            hit = (line >= 0) & (line < lines) & (walls > 0)
+            stopped, edge = index[hit], line[hit] + line_origin
+            delta[stopped] = np.where(forward[stopped], edge * size - end[stopped], (edge + 1) * size - start[stopped])
+            passes += 1
+            index = index[~hit & (crossed[index] > passes)]
+        return delta
+
+    def wall_table(self, collision_manager):
+        """Returns the summed-area table of wall cells, rebuilding it if the level changed."""
+        level = collision_manager.level
+        key = (id(level), level.revision)
+        if key != self._grid_key:
+            self._grid_key = key
+            self._table = None
+            if level.chunks:
+                # The tile IDs of every resident chunk, viewed as arrays and placed
+                # side by side in one grid of wall flags.
+                size = level.chunk_size
+                keys = np.array(list(level.chunks))
+                origin_col, origin_row = keys.min(axis=0)
+                shape = (keys[:, 1].max() - origin_row + 1, keys[:, 0].max() - origin_col + 1)
+                grid = np.zeros((shape[0] * size, shape[1] * size), dtype=np.int32)
+                wall_ids = np.array(sorted(tile_ids_matching(self.tile_type)), dtype=np.uint8)
+                for (col, row), chunk in level.chunks.items():
+                    cells = np.frombuffer(chunk.cells, dtype=np.uint8).reshape(size, size)
+                    top, left = (row - origin_row) * size, (col - origin_col) * size
+                    grid[top:top + size, left:left + size] = np.isin(cells, wall_ids)
+                self._table = np.zeros((grid.shape[0] + 1, grid.shape[1] + 1), dtype=np.int32)
+                self._table[1:, 1:] = grid.cumsum(axis=0).cumsum(axis=1)
+                self._origin = (int(origin_col) * size, int(origin_row) * size)
+        return self._table
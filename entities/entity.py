@@ -1,20 +1,48 @@
 class Entity:
+    # Slots instead of a per-instance __dict__: entities are numerous and short-lived.
+    __slots__ = ("sprite", "health", "rect", "prev_x", "prev_y")
+
     def __init__(self, x, y, sprite, health):
-        self.x = x
-        self.y = y
         self.sprite = sprite  # This would be a pygame.Surface object
         self.health = health
-        # Initialize the rect attribute based on the sprite size
+        # The rect is the one source of truth for the position; x and y read and write it.
         self.rect = sprite.get_rect(topleft=(x, y))
+        # Position at the start of the current simulation tick, for render interpolation
+        self.prev_x = self.rect.x
+        self.prev_y = self.rect.y
+
+    @property
+    def x(self):
+        return self.rect.x
+
+    @x.setter
+    def x(self, value):
+        self.rect.x = value
+
+    @property
+    def y(self):
+        return self.rect.y
+
+    @y.setter
+    def y(self, value):
+        self.rect.y = value
 
     def move(self, dx, dy):
-        self.x += dx
-        self.y += dy
-        # Update the rect position as well
-        self.rect.topleft = (self.x, self.y)
+        self.rect.move_ip(dx, dy)
+
+    def store_previous_position(self):
+        # Called at the start of every simulation tick
+        self.prev_x, self.prev_y = self.rect.topleft
+
+    def interpolated_position(self, alpha):
+        # Position between the previous and the latest tick; alpha 1.0 is the latest
+        x, y = self.rect.topleft
+        return (self.prev_x + (x - self.prev_x) * alpha,
+                self.prev_y + (y - self.prev_y) * alpha)
 
-    def draw(self, screen):
-        screen.blit(self.sprite, (self.x, self.y))
+    def draw(self, screen, alpha=1.0, offset=(0, 0)):
+        x, y = self.interpolated_position(alpha)
+        screen.blit(self.sprite, (x + offset[0], y + offset[1]))
 
     def take_damage(self, amount):
         self.health -= amount
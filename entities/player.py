@@ -2,10 +2,11 @@ import pygame
 from .entity import Entity
 
 class Player(Entity):
+    __slots__ = ("speed", "moving_left", "moving_right", "moving_up", "moving_down")
+
     def __init__(self, x, y, sprite, health):
         super().__init__(x, y, sprite, health)
         self.speed = 5
-        self.direction = pygame.math.Vector2(0, 0)  # Movement direction
         # Initialize movement flags
         self.moving_left = False
         self.moving_right = False
@@ -18,21 +19,22 @@ class Player(Entity):
         super().move(dx, dy)  # Call the move method from the Entity base class
 
 
-    def update(self, collision_manager):
+    def update(self, collision_manager, input_snapshot=None):
+        # Read the movement actions from the frame's input snapshot when one is given;
+        # otherwise the flags set by handle_event are used.
+        if input_snapshot is not None:
+            self.moving_left = input_snapshot.is_pressed("move_left")
+            self.moving_right = input_snapshot.is_pressed("move_right")
+            self.moving_up = input_snapshot.is_pressed("move_up")
+            self.moving_down = input_snapshot.is_pressed("move_down")
+
         # Calculate the desired movement
         dx = (self.moving_right - self.moving_left) * self.speed
         dy = (self.moving_down - self.moving_up) * self.speed
 
-        # Create a copy of rect for hypothetical movement
-        new_rect = self.rect.copy()
-        new_rect.x += dx
-        new_rect.y += dy
-        
-        # Check for wall collisions. Only move if there's no collision
-        if not collision_manager.check_tile_collision(new_rect, "Wall"):
-            self.rect = new_rect
-            self.x = self.rect.x
-            self.y = self.rect.y
+        # Move as far as the walls allow on each axis, so the player slides along them
+        if dx or dy:
+            self.rect = collision_manager.move_rect(self.rect, dx, dy, "Wall")
 
     def handle_event(self, event):
         # Respond to key press and release events
@@ -1,3 +1,7 @@
+from collections import deque
+
+from level.tile import tile_ids_matching
+
 class AIBehavior:
     """
     A base class for AI behaviors. This class defines a contract for AI behaviors
@@ -25,14 +29,13 @@ class AIBehavior:
 class ChasePlayerBehavior(AIBehavior):
     """
     A specific AI behavior where the enemy entity attempts to chase or move towards
-    the player character, avoiding obstacles if necessary.
+    the player character, sliding along obstacles in its way.
     """
     
     def execute(self, enemy, player, collision_manager):
         """
         Executes the chase player behavior. Determines the direction to move towards
-        the player and adjusts the enemy's position, checking for collisions to avoid
-        obstacles.
+        the player and moves the enemy that way, as far as walls allow on each axis.
 
         Parameters:
             enemy (Enemy): The enemy entity executing this behavior.
@@ -41,23 +44,112 @@ class ChasePlayerBehavior(AIBehavior):
                 for collisions with obstacles.
         """
         # Determine the direction of movement towards the player
-        dx = enemy.speed if player.x > enemy.x else -enemy.speed if player.x < enemy.x else 0
-        dy = enemy.speed if player.y > enemy.y else -enemy.speed if player.y < enemy.y else 0
-
-        # Create hypothetical rects for testing collision after moving
-        test_rect_x = enemy.rect.copy()
-        test_rect_x.x += dx
-        test_rect_y = enemy.rect.copy()
-        test_rect_y.y += dy
-        
-        # Check for wall collisions before moving horizontally
-        if not collision_manager.check_tile_collision(test_rect_x, "Wall"):
-            enemy.rect.x += dx
-            enemy.x = enemy.rect.x  # Update the enemy's x-coordinate
-        
-        # Check for wall collisions before moving vertically
-        if not collision_manager.check_tile_collision(test_rect_y, "Wall"):
-            enemy.rect.y += dy
-            enemy.y = enemy.rect.y  # Update the enemy's y-coordinate
+        rect, target, speed = enemy.rect, player.rect, enemy.speed
+        dx = speed if target.x > rect.x else -speed if target.x < rect.x else 0
+        dy = speed if target.y > rect.y else -speed if target.y < rect.y else 0
+
+        # Sweep through the grid, stopping flush against walls
+        if dx or dy:
+            enemy.rect = collision_manager.move_rect(rect, dx, dy, "Wall")
+
+class FlowFieldBehavior(AIBehavior):
+    """
+    An AI behavior that steers enemies around walls using a flow field shared by
+    every enemy holding the same behavior instance.
+
+    A single breadth-first search runs over the tile grid, starting from the cell
+    containing the player, and records for every reachable cell the neighbouring
+    cell one step closer to the player. Each enemy then only looks up the entry for
+    the cell under its centre and heads for the centre of the next cell, so the
+    per-enemy cost is constant and the search cost depends on the map size alone.
+    The field is cached until the player moves to another cell or the level layout
+    changes.
+
+    Attributes:
+        blocking_type (str): The tile type enemies cannot walk through.
+        next_cells (dict): Maps a grid cell to the next cell on a shortest path to the player.
+    """
+
+    def __init__(self, blocking_type="Wall"):
+        """
+        Initializes the behavior with an empty flow field.
+
+        Parameters:
+            blocking_type (str, optional): The tile type treated as impassable.
+        """
+        self.blocking_type = blocking_type
+        self.next_cells = {}
+        self._field_key = None
+
+    def execute(self, enemy, player, collision_manager):
+        """
+        Moves the enemy one step along the flow field towards the player, sliding
+        along walls like `ChasePlayerBehavior`. Once the enemy
+        shares the player's cell, or the player cannot be reached, it falls back to
+        chasing the player directly.
+
+        Parameters:
+            enemy (Enemy): The enemy entity executing this behavior.
+            player (Player): The target player entity.
+            collision_manager (CollisionManager): Provides the level and wall checks.
+        """
+        size = collision_manager.cell_size
+        player_cell = (player.rect.centerx // size, player.rect.centery // size)
+        self.update_flow_field(player_cell, collision_manager)
+
+        enemy_cell = (enemy.rect.centerx // size, enemy.rect.centery // size)
+        next_cell = self.next_cells.get(enemy_cell)
+        if next_cell is None or enemy_cell == player_cell:
+            dx = enemy.speed if player.x > enemy.x else -enemy.speed if player.x < enemy.x else 0
+            dy = enemy.speed if player.y > enemy.y else -enemy.speed if player.y < enemy.y else 0
+        else:
+            # Head for the centre of the next cell, without overshooting it.
+            offset_x = next_cell[0] * size + size // 2 - enemy.rect.centerx
+            offset_y = next_cell[1] * size + size // 2 - enemy.rect.centery
+            dx = max(-enemy.speed, min(enemy.speed, offset_x))
+            dy = max(-enemy.speed, min(enemy.speed, offset_y))
+
+        if dx or dy:
+            enemy.rect = collision_manager.move_rect(enemy.rect, dx, dy, self.blocking_type)
+
+    def update_flow_field(self, target_cell, collision_manager):
+        """
+        Recomputes the flow field towards the target cell if the target cell or the
+        level layout changed since the last computation.
+
+        Parameters:
+            target_cell (tuple): The (col, row) cell the field should lead to.
+            collision_manager (CollisionManager): Provides the level.
+        """
+        level = collision_manager.level
+        key = (target_cell, id(level), level.revision, collision_manager.cell_size)
+        if key == self._field_key:
+            return
+        self._field_key = key
+
+        bounds = level.resident_cell_bounds()
+        if bounds is None:
+            self.next_cells = {}
+            return
+        min_col, min_row, max_col, max_row = bounds
+        blocked_ids = tile_ids_matching(self.blocking_type)
+        chunks, size = level.chunks, level.chunk_size
+
+        next_cells = {target_cell: target_cell}
+        frontier = deque([target_cell])
+        while frontier:
+            cell = frontier.popleft()
+            col, row = cell
+            for neighbour in ((col + 1, row), (col - 1, row), (col, row + 1), (col, row - 1)):
+                if neighbour in next_cells:
+                    continue
+                if not (min_col <= neighbour[0] <= max_col and min_row <= neighbour[1] <= max_row):
+                    continue
+                chunk = chunks.get((neighbour[0] // size, neighbour[1] // size))
+                if chunk is not None and chunk.cells[(neighbour[1] % size) * size + neighbour[0] % size] in blocked_ids:
+                    continue
+                next_cells[neighbour] = cell
+                frontier.append(neighbour)
+        self.next_cells = next_cells
 
 # Further behaviors can be defined following the AIBehavior contract.
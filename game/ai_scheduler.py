@@ -0,0 +1,539 @@
+"""
+AI scheduling.
+
+An `AIScheduler` runs the behaviors of the enemies updated in a tick. The default
+one simply calls each enemy's behavior on the main thread, in order.
+
+`ParallelAIScheduler` spreads the work over a pool of worker processes instead, so
+large enemy counts can use every core. Each tick it writes a read-only snapshot of
+the world into shared memory: the tile IDs of the resident part of the level, the
+player's rect and, for every enemy, its rect, speed and behavior. Workers read the
+snapshot through memoryviews, compute each enemy's intent (the step it wants to
+take, already resolved against walls) and write it back next to the snapshot. The
+main thread does not wait for them: the intents are applied at the start of the
+next tick, so enemies react to the world one tick late.
+
+Snapshots are double-buffered: two shared memory blocks are used in turn, so the
+next snapshot is written into one block while the other still holds the batch
+whose intents are being applied, and a batch dropped because the level was
+reloaded is never overwritten while a worker may still be reading it.
+
+Only behaviors with a worker-side implementation run in the pool (see
+`ParallelAIScheduler.slot_for`); enemies with any other behavior are updated on
+the main thread, as with `AIScheduler`.
+
+`LODAIScheduler` cuts the work instead of spreading it: enemies near the player or
+on screen are updated every tick, those further away only every few ticks, and a
+per-tick time budget caps the total. Enemies not updated in a tick keep moving the
+way their last update moved them.
+"""
+
+import atexit
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+from game.ai_manager import ChasePlayerBehavior, FlowFieldBehavior
+from level.tile import tile_ids_matching
+
+# Snapshot layout: HEADER_INTS header ints, then ENTITY_INTS ints per enemy, then
+# INTENT_INTS ints per enemy written by the workers, then one tile ID byte per cell.
+HEADER_INTS = 16
+COUNT, CAPACITY, CELL_CAPACITY, GRID_SERIAL, PLAYER_X, PLAYER_Y, PLAYER_W, PLAYER_H, \
+    MIN_COL, MIN_ROW, COLS, ROWS, CELL_SIZE = range(13)
+ENTITY_INTS = 6  # x, y, width, height, speed, behavior slot
+INTENT_INTS = 2  # dx, dy
+
+CHASE, FLOW = 0, 1  # Worker-side behavior kernels
+
+
+def _layout(capacity):
+    """Returns the int offsets of the entities and intents, and the byte offset of the grid."""
+    intents = HEADER_INTS + capacity * ENTITY_INTS
+    return HEADER_INTS, intents, (intents + capacity * INTENT_INTS) * 4
+
+
+class AIScheduler:
+    """Runs every enemy's behavior on the main thread as soon as it is updated."""
+
+    def update(self, enemies, player, collision_manager, view=None):
+        """
+        Updates the AI of the given enemies for one tick.
+
+        Parameters:
+            enemies (list): The enemies to update.
+            player (Player): The player, the usual target of the behaviors.
+            collision_manager (CollisionManager): Provides the level and wall checks.
+            view (pygame.Rect, optional): The area of the world visible on screen.
+        """
+        for enemy in enemies:
+            enemy.update(player, collision_manager)
+
+    def close(self):
+        """Releases the scheduler's resources."""
+
+
+class _Snapshot:
+    """One of the two shared memory blocks of a `ParallelAIScheduler`, and the batch computed from it."""
+
+    def __init__(self, capacity, cell_capacity):
+        self.capacity = capacity
+        self.cell_capacity = cell_capacity
+        entities, intents, grid = _layout(capacity)
+        self.memory = shared_memory.SharedMemory(create=True, size=grid + max(cell_capacity, 1))
+        self.ints = self.memory.buf[:grid].cast("i")
+        self.grid = self.memory.buf[grid:grid + cell_capacity]
+        self.ints[CAPACITY] = capacity
+        self.ints[CELL_CAPACITY] = cell_capacity
+        self.grid_key = None
+        self.futures = []
+        self.enemies = []
+        self.blocking_types = []
+        self.generation = None
+        self.revision = None
+
+    def fits(self, count, cells):
+        return count <= self.capacity and cells <= self.cell_capacity
+
+    def close(self):
+        wait(self.futures)
+        self.ints.release()
+        self.grid.release()
+        self.memory.close()
+        self.memory.unlink()
+
+
+class ParallelAIScheduler(AIScheduler):
+    """
+    Computes enemy intents in a pool of worker processes from a shared memory
+    snapshot of the world, and applies them on the next tick.
+
+    Attributes:
+        workers (int): The number of worker processes.
+        min_batch (int): Below this many enemies, behaviors run on the main thread;
+            a batch this small costs more to hand over than to compute.
+    """
+
+    def __init__(self, workers, min_batch=64):
+        """
+        Creates the scheduler. The worker processes are started on first use.
+
+        Parameters:
+            workers (int): The number of worker processes.
+            min_batch (int, optional): The smallest enemy count sent to the pool.
+        """
+        self.workers = workers
+        self.min_batch = min_batch
+        self.executor = None
+        self.snapshots = [None, None]
+        self.back = 0  # Index of the snapshot the next batch is written into
+        self.grid_serial = 0
+
+    @staticmethod
+    def slot_for(behavior):
+        """
+        Returns the (kernel, blocking tile type) a behavior is computed with in the
+        workers, or None if it has to run on the main thread.
+        """
+        # Exact types only: a subclass may override `execute`.
+        if type(behavior) is ChasePlayerBehavior:
+            return CHASE, "Wall"
+        if type(behavior) is FlowFieldBehavior:
+            return FLOW, behavior.blocking_type
+        return None
+
+    def update(self, enemies, player, collision_manager, view=None):
+        """
+        Applies the intents computed during the previous tick, then sends a snapshot
+        of the given enemies to the workers. Enemies whose behavior cannot run in the
+        workers, and all of them when there are fewer than `min_batch`, are updated on
+        the main thread right away.
+        """
+        self.apply_intents(collision_manager)
+
+        batch, slots, slot_keys = [], [], {}
+        for enemy in enemies:
+            behavior = enemy.ai_behavior
+            key = self.slot_for(behavior) if behavior is not None else None
+            if key is None:
+                enemy.update(player, collision_manager)
+                continue
+            slot = slot_keys.get(key)
+            if slot is None:
+                slot = slot_keys[key] = len(slots)
+                slots.append(key)
+            batch.append((enemy, slot))
+
+        if len(batch) < self.min_batch:
+            for enemy, _ in batch:
+                enemy.update(player, collision_manager)
+            return
+        self.dispatch(batch, slots, player, collision_manager)
+
+    def apply_intents(self, collision_manager):
+        """
+        Waits for the batch sent during the previous tick and moves its enemies by
+        their intents. An enemy that was moved since the snapshot, e.g. pushed apart
+        from another one, or a level edited since then, has its intent resolved
+        against the walls again instead.
+        """
+        snapshot = self.snapshots[1 - self.back]
+        if snapshot is None or not snapshot.enemies:
+            return
+        level = collision_manager.level
+        enemies, snapshot.enemies = snapshot.enemies, []
+        if snapshot.generation != level.generation:
+            return  # Computed for a level that has been replaced since
+        for future in snapshot.futures:
+            future.result()
+        count = len(enemies)
+        start, intents, _ = _layout(snapshot.capacity)
+        positions = snapshot.ints[start:start + count * ENTITY_INTS].tolist()
+        moves = snapshot.ints[intents:intents + count * INTENT_INTS].tolist()
+        edited = snapshot.revision != level.revision
+        move_rect = collision_manager.move_rect
+        blocking_types = snapshot.blocking_types
+        for index, enemy in enumerate(enemies):
+            dx, dy = moves[2 * index], moves[2 * index + 1]
+            if not (dx or dy):
+                continue
+            rect = enemy.rect
+            base = index * ENTITY_INTS
+            if edited or rect.x != positions[base] or rect.y != positions[base + 1]:
+                enemy.rect = move_rect(rect, dx, dy, blocking_types[positions[base + 5]])
+            else:
+                rect.move_ip(dx, dy)
+
+    def dispatch(self, batch, slots, player, collision_manager):
+        """Writes a snapshot of the world for a batch of enemies and hands it to the workers."""
+        level = collision_manager.level
+        bounds = level.resident_cell_bounds()
+        if bounds is None:
+            min_col, min_row, cols, rows = 0, 0, 0, 0
+        else:
+            min_col, min_row = bounds[0], bounds[1]
+            cols, rows = bounds[2] - min_col + 1, bounds[3] - min_row + 1
+
+        snapshot = self.snapshots[self.back]
+        if snapshot is not None:
+            wait(snapshot.futures)  # Only a dropped batch can still be running
+            if not snapshot.fits(len(batch), cols * rows):
+                snapshot.close()
+                snapshot = None
+        if snapshot is None:
+            snapshot = self.snapshots[self.back] = _Snapshot(
+                max(len(batch) * 2, self.min_batch), max(cols * rows * 2, 1024))
+
+        ints = snapshot.ints
+        grid_key = (id(level), level.revision, bounds)
+        if snapshot.grid_key != grid_key:
+            self.write_grid(snapshot.grid, level, min_col, min_row, cols, rows)
+            snapshot.grid_key = grid_key
+            self.grid_serial += 1
+            ints[GRID_SERIAL] = self.grid_serial
+        ints[MIN_COL], ints[MIN_ROW], ints[COLS], ints[ROWS] = min_col, min_row, cols, rows
+        ints[CELL_SIZE] = collision_manager.cell_size
+        ints[PLAYER_X], ints[PLAYER_Y], ints[PLAYER_W], ints[PLAYER_H] = player.rect
+        ints[COUNT] = len(batch)
+
+        entities = []
+        for enemy, slot in batch:
+            rect = enemy.rect
+            entities += (rect.x, rect.y, rect.width, rect.height, enemy.speed, slot)
+        ints[HEADER_INTS:HEADER_INTS + len(entities)] = array("i", entities)
+
+        snapshot.enemies = [enemy for enemy, _ in batch]
+        snapshot.blocking_types = [blocking_type for _, blocking_type in slots]
+        snapshot.generation = level.generation
+        snapshot.revision = level.revision
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            atexit.register(self.close)
+        kernels = [(kernel, tile_ids_matching(blocking_type)) for kernel, blocking_type in slots]
+        step = -(-len(batch) // self.workers)
+        snapshot.futures = [
+            self.executor.submit(compute_intents, snapshot.memory.name, start, min(start + step, len(batch)), kernels)
+            for start in range(0, len(batch), step)
+        ]
+        self.back = 1 - self.back
+
+    @staticmethod
+    def write_grid(grid, level, min_col, min_row, cols, rows):
+        """Copies the tile IDs of a block of cells into the snapshot, row by row; unloaded cells are EMPTY."""
+        size, chunks = level.chunk_size, level.chunks
+        for row in range(rows):
+            level_row = min_row + row
+            local_row = level_row % size
+            col = min_col
+            while col < min_col + cols:
+                end = min((col // size + 1) * size, min_col + cols)
+                chunk = chunks.get((col // size, level_row // size))
+                start = row * cols + col - min_col
+                if chunk is None:
+                    grid[start:start + end - col] = bytes(end - col)
+                else:
+                    offset = local_row * size + col % size
+                    grid[start:start + end - col] = chunk.cells[offset:offset + end - col]
+                col = end
+
+    def close(self):
+        """Stops the worker processes and frees the shared memory."""
+        for index, snapshot in enumerate(self.snapshots):
+            if snapshot is not None:
+                snapshot.close()
+                self.snapshots[index] = None
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+            atexit.unregister(self.close)
+
+
+class LODAIScheduler(AIScheduler):
+    """
+    Updates enemies at a rate set by their distance to the player (level of detail)
+    and within a time budget per tick.
+
+    Enemies on screen or within the first tier's distance are due every tick; further
+    tiers are due every few ticks, and enemies beyond the last tier every
+    `far_interval` ticks. An enemy's interval is reassessed each time its AI runs.
+    New enemies are spread over their interval, so a far-off crowd is updated a slice
+    at a time rather than all in the same tick. With a budget, due enemies run most
+    overdue first until it is spent; the rest are deferred to the next tick, where
+    they are more overdue and run earlier.
+
+    An enemy that is not updated in a tick is moved by the step its last update took,
+    unless that would take it into a solid tile, in which case it stops until its
+    next update.
+
+    Attributes:
+        budget_ms (float or None): The time AI updates may take per tick, in
+            milliseconds; None for no limit. At least one due enemy runs every tick.
+        tiers (tuple): (distance in pixels, interval in ticks) pairs, nearest first.
+            The distance is measured between centers, along the longer axis.
+        far_interval (int): The interval of enemies beyond the last tier.
+        stats (dict): "run", "deferred" and "extrapolated" counts of the latest tick:
+            AI updates run, due updates postponed by the budget, and enemies moved
+            by extrapolation (deferred ones included).
+    """
+
+    TIERS = ((400, 1), (1200, 4))
+    FAR_INTERVAL = 16
+
+    def __init__(self, budget_ms=None, tiers=TIERS, far_interval=FAR_INTERVAL):
+        """
+        Creates the scheduler.
+
+        Parameters:
+            budget_ms (float, optional): The time budget per tick, in milliseconds.
+            tiers (tuple, optional): (distance, interval) pairs, nearest first.
+            far_interval (int, optional): The interval beyond the last tier.
+        """
+        self.budget_ms = budget_ms
+        self.tiers = tiers
+        self.far_interval = far_interval
+        self.stats = {"run": 0, "deferred": 0, "extrapolated": 0}
+        self.tick = 0
+        # Enemy -> [tick of its last AI update, interval, dx, dy of that update]
+        self.schedule = {}
+        self._added = 0
+
+    def interval(self, enemy, center, view):
+        """Returns how many ticks apart an enemy is due, given the player's center and the view."""
+        rect = enemy.rect
+        if view is not None and view.colliderect(rect):
+            return 1
+        distance = max(abs(rect.centerx - center[0]), abs(rect.centery - center[1]))
+        for limit, interval in self.tiers:
+            if distance <= limit:
+                return interval
+        return self.far_interval
+
+    def update(self, enemies, player, collision_manager, view=None):
+        """
+        Runs the AI of the due enemies, most overdue first, until the budget is
+        spent, and extrapolates the others.
+        """
+        self.tick += 1
+        tick, schedule = self.tick, self.schedule
+        if len(schedule) > 2 * len(enemies) + 64:
+            # Forget enemies that are gone or frozen; they start afresh if they return.
+            current = set(enemies)
+            self.schedule = schedule = {enemy: entry for enemy, entry in schedule.items() if enemy in current}
+
+        center = player.rect.center
+        due, moving = [], []
+        for enemy in enemies:
+            entry = schedule.get(enemy)
+            if entry is None:
+                interval = self.interval(enemy, center, view)
+                entry = schedule[enemy] = [tick - 1 - self._added % interval, interval, 0, 0]
+                self._added += 1
+            if tick - entry[0] >= entry[1]:
+                due.append(enemy)
+            elif entry[2] or entry[3]:
+                moving.append(enemy)
+
+        run = len(due)
+        if self.budget_ms is None:
+            for enemy in due:
+                self.run(enemy, schedule[enemy], player, collision_manager, center, view)
+        else:
+            due.sort(key=lambda enemy: (schedule[enemy][0] - tick) / schedule[enemy][1])
+            deadline = time.perf_counter() + self.budget_ms / 1000
+            for index, enemy in enumerate(due):
+                if index and time.perf_counter() > deadline:
+                    run = index
+                    moving.extend(enemy for enemy in due[index:] if schedule[enemy][2] or schedule[enemy][3])
+                    break
+                self.run(enemy, schedule[enemy], player, collision_manager, center, view)
+
+        extrapolated = 0
+        check, size = collision_manager.check_tile_collision, collision_manager.cell_size
+        for enemy in moving:
+            entry = schedule[enemy]
+            dx, dy = entry[2], entry[3]
+            x, y, width, height = rect = enemy.rect
+            # The enemy's current cells are clear, so only a step into new cells needs a wall check.
+            if ((x // size != (x + dx) // size or (x + width - 1) // size != (x + width - 1 + dx) // size
+                    or y // size != (y + dy) // size or (y + height - 1) // size != (y + height - 1 + dy) // size)
+                    and check(rect.move(dx, dy))):
+                entry[2] = entry[3] = 0
+                continue
+            rect.move_ip(dx, dy)
+            extrapolated += 1
+        self.stats = {"run": run, "deferred": len(due) - run, "extrapolated": extrapolated}
+
+    def run(self, enemy, entry, player, collision_manager, center, view):
+        """Runs an enemy's AI, records the step it took and reassesses its interval."""
+        rect = enemy.rect
+        x, y = rect.x, rect.y
+        enemy.update(player, collision_manager)
+        rect = enemy.rect
+        entry[0] = self.tick
+        entry[1] = self.interval(enemy, center, view)
+        entry[2], entry[3] = rect.x - x, rect.y - y
+
+
+# Worker side. Each worker process keeps the snapshot blocks it has attached to and
+# the flow fields it has computed, keyed by the snapshot's grid.
+
+_attached = {}  # Shared memory name -> (SharedMemory, ints view, grid view)
+_fields = {}  # (grid serial, target cell, blocked IDs) -> flow field
+MAX_ATTACHED = 2
+MAX_FIELDS = 8
+
+
+def _attach(name):
+    views = _attached.get(name)
+    if views is None:
+        while len(_attached) >= MAX_ATTACHED:
+            memory, ints, grid = _attached.pop(next(iter(_attached)))
+            ints.release()
+            grid.release()
+            memory.close()
+        memory = shared_memory.SharedMemory(name=name)
+        header = memory.buf[:HEADER_INTS * 4].cast("i")
+        capacity, cell_capacity = header[CAPACITY], header[CELL_CAPACITY]
+        header.release()
+        _, _, grid = _layout(capacity)
+        views = _attached[name] = (memory, memory.buf[:grid].cast("i"), memory.buf[grid:grid + cell_capacity])
+    return views
+
+
+def _sweep(grid, blocked, min_col, min_row, cols, rows, size, start, end, across_start, across_end, delta,
+           vertical):
+    """`CollisionManager._sweep` over the snapshot grid."""
+    if not blocked or across_start >= across_end or start >= end:
+        return delta
+    across = range(across_start // size, (across_end - 1) // size + 1)
+    if delta > 0:
+        lines = range((end - 1) // size + 1, (end - 1 + delta) // size + 1)
+    else:
+        lines = range(start // size - 1, (start + delta) // size - 1, -1)
+    for line in lines:
+        for cell in across:
+            col, row = (cell, line) if vertical else (line, cell)
+            if (0 <= col - min_col < cols and 0 <= row - min_row < rows
+                    and grid[(row - min_row) * cols + col - min_col] in blocked):
+                return line * size - end if delta > 0 else (line + 1) * size - start
+    return delta
+
+
+def _flow_field(grid, serial, min_col, min_row, cols, rows, target, blocked):
+    """`FlowFieldBehavior.update_flow_field` over the snapshot grid."""
+    key = (serial, target, blocked)
+    next_cells = _fields.get(key)
+    if next_cells is not None:
+        return next_cells
+    next_cells = {target: target}
+    frontier = deque([target])
+    while frontier:
+        cell = frontier.popleft()
+        col, row = cell
+        for neighbour in ((col + 1, row), (col - 1, row), (col, row + 1), (col, row - 1)):
+            if neighbour in next_cells:
+                continue
+            local_col, local_row = neighbour[0] - min_col, neighbour[1] - min_row
+            if not (0 <= local_col < cols and 0 <= local_row < rows):
+                continue
+            if grid[local_row * cols + local_col] in blocked:
+                continue
+            next_cells[neighbour] = cell
+            frontier.append(neighbour)
+    if len(_fields) >= MAX_FIELDS:
+        _fields.clear()
+    _fields[key] = next_cells
+    return next_cells
+
+
+def compute_intents(name, start, stop, kernels):
+    """
+    Runs in a worker process: computes the intents of enemies start to stop of a
+    snapshot and writes them into it, matching what `ChasePlayerBehavior.execute`
+    and `FlowFieldBehavior.execute` would do on the main thread.
+
+    Parameters:
+        name (str): The shared memory block holding the snapshot.
+        start, stop (int): The range of enemies to compute.
+        kernels (list): (kernel, blocked tile IDs) for each behavior slot.
+    """
+    _, ints, grid = _attach(name)
+    header = ints[:HEADER_INTS].tolist()
+    min_col, min_row, cols, rows = header[MIN_COL], header[MIN_ROW], header[COLS], header[ROWS]
+    size = header[CELL_SIZE]
+    px, py, pw, ph = header[PLAYER_X], header[PLAYER_Y], header[PLAYER_W], header[PLAYER_H]
+    player_cell = ((px + pw // 2) // size, (py + ph // 2) // size)
+    entities, intents, _ = _layout(header[CAPACITY])
+    rows_data = ints[entities + start * ENTITY_INTS:entities + stop * ENTITY_INTS].tolist()
+    fields = {}
+
+    out = []
+    for base in range(0, len(rows_data), ENTITY_INTS):
+        x, y, width, height, speed, slot = rows_data[base:base + ENTITY_INTS]
+        kernel, blocked = kernels[slot]
+        next_cell = None
+        if kernel == FLOW:
+            field = fields.get(slot)
+            if field is None:
+                field = fields[slot] = _flow_field(grid, header[GRID_SERIAL], min_col, min_row, cols, rows,
+                                                   player_cell, blocked)
+            enemy_cell = ((x + width // 2) // size, (y + height // 2) // size)
+            next_cell = field.get(enemy_cell)
+            if enemy_cell == player_cell:
+                next_cell = None
+        if next_cell is None:
+            dx = speed if px > x else -speed if px < x else 0
+            dy = speed if py > y else -speed if py < y else 0
+        else:
+            dx = max(-speed, min(speed, next_cell[0] * size + size // 2 - (x + width // 2)))
+            dy = max(-speed, min(speed, next_cell[1] * size + size // 2 - (y + height // 2)))
+        # `CollisionManager.move_rect`: x first, then y from the resolved x.
+        if dx:
+            dx = _sweep(grid, blocked, min_col, min_row, cols, rows, size, x, x + width, y, y + height, dx, False)
+        if dy:
+            dy = _sweep(grid, blocked, min_col, min_row, cols, rows, size, y, y + height, x + dx, x + dx + width,
+                        dy, True)
+        out += (dx, dy)
+    ints[intents + start * INTENT_INTS:intents + stop * INTENT_INTS] = array("i", out)
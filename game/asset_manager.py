@@ -1,5 +1,12 @@
-import pygame
+import io
 import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+from game.asset_pack import AssetPack
+from game.texture_atlas import TextureAtlas
 
 class AssetManager:
     """
@@ -7,17 +14,66 @@ class AssetManager:
     to game assets, such as images and sounds. It simplifies the process of managing
     these resources throughout the game.
 
+    In lazy mode, loading a configuration only records the asset definitions in a
+    manifest; `get_image`/`get_sound` load an asset on first use. Loaded assets are
+    kept in least-recently-used order, and once their estimated size exceeds the byte
+    budget the least recently used assets are evicted, except those pinned with
+    `acquire` until the matching `release`.
+
     Attributes:
-        images (dict): A dictionary storing loaded images, accessible by name.
-        sounds (dict): A dictionary storing loaded sounds, accessible by name.
+        images (OrderedDict): Loaded images, accessible by name, least recently used first.
+        sounds (OrderedDict): Loaded sounds, accessible by name, least recently used first.
+        lazy (bool): Whether assets in the manifest are loaded on first use.
+        budget_bytes (int or None): The memory budget for loaded assets, or None for no limit.
+        manifest (dict): Asset definitions from the configuration, accessible by name.
+        memory_used (int): Estimated bytes used by the loaded assets.
+        stats (dict): "hits", "misses" and "evictions" counters of the cache.
+        pack (AssetPack or None): A memory-mapped pack of preprocessed images, consulted
+            before decoding an image file.
+        atlas (TextureAtlas or None): The atlas small images were packed into by
+            `build_atlas`; their entries in `images` are then subsurfaces of its pages.
     """
 
-    def __init__(self):
+    def __init__(self, lazy=False, budget_bytes=None):
         """
         Initializes the AssetManager with empty dictionaries for images and sounds.
+
+        Parameters:
+            lazy (bool, optional): Load assets from the manifest on first use instead of
+                when the configuration is loaded.
+            budget_bytes (int, optional): Evict least recently used, unpinned assets once
+                loaded assets take more than this many bytes.
+        """
+        self.images = OrderedDict()
+        self.sounds = OrderedDict()
+        self.pack = None
+        self.atlas = None
+        self.lazy = lazy
+        self.budget_bytes = budget_bytes
+        self.manifest = {}
+        self.pins = {}  # (kind, name) -> reference count
+        self.sizes = {}  # (kind, name) -> estimated bytes
+        self.memory_used = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def open_pack(self, pack_path):
+        """
+        Memory-maps a pack of preprocessed images (see `game.asset_pack`). Images found
+        in the pack with an unchanged source file are then created straight from the
+        mapped pixels instead of being decoded and scaled. A missing or invalid pack is
+        ignored and images are loaded from their source files as before.
+
+        Parameters:
+            pack_path (str): The file path to the asset pack.
+
+        Returns:
+            bool: True if the pack was opened.
         """
-        self.images = {}
-        self.sounds = {}
+        try:
+            self.pack = AssetPack(pack_path)
+        except (OSError, ValueError):
+            self.pack = None
+        return self.pack is not None
 
     def load_image(self, name, path, size=None):
         """
@@ -32,16 +88,146 @@ class AssetManager:
         Returns:
             pygame.Surface: The loaded and optionally resized image.
         """
-        if name not in self.images:
-            image = pygame.image.load(path).convert_alpha()
-            if size:
-                image = pygame.transform.scale(image, size)
-            self.images[name] = image
-        return self.images[name]
+        image = self.images.get(name)
+        if image is None:
+            image = self.pack.get_image(path, size) if self.pack else None
+            if image is None:
+                image = pygame.image.load(path).convert_alpha()
+                if size:
+                    image = pygame.transform.scale(image, size)
+            self.store_asset('image', name, image)
+        return image
+
+    def store_asset(self, kind, name, asset):
+        """
+        Stores a loaded asset, accounts for its memory and evicts other assets if the
+        budget is exceeded.
+
+        Parameters:
+            kind (str): 'image' or 'sound'.
+            name (str): The name to store the asset under.
+            asset (pygame.Surface or pygame.mixer.Sound): The loaded asset.
+        """
+        cache = self.images if kind == 'image' else self.sounds
+        key = (kind, name)
+        self.memory_used -= self.sizes.get(key, 0)
+        size = self.estimate_size(kind, asset)
+        cache[name] = asset
+        cache.move_to_end(name)
+        self.sizes[key] = size
+        self.memory_used += size
+        # An asset larger than the budget stays until something else needs the room.
+        self.enforce_budget(keep=key)
+
+    @staticmethod
+    def estimate_size(kind, asset):
+        """
+        Estimates the bytes an asset occupies: the pixel data of an image, or the
+        decoded samples of a sound.
+        """
+        if kind == 'image':
+            return asset.get_width() * asset.get_height() * asset.get_bytesize()
+        mixer = pygame.mixer.get_init()
+        if not mixer:
+            return 0
+        frequency, sample_format, channels = mixer
+        return int(asset.get_length() * frequency * channels * abs(sample_format) // 8)
+
+    def enforce_budget(self, keep=None):
+        """
+        Evicts least recently used, unpinned assets until the loaded assets fit in the
+        budget (or only pinned assets are left).
+
+        Parameters:
+            keep (tuple, optional): The (kind, name) of an asset never to evict, such as
+                the one just stored, which its caller is about to use.
+        """
+        if self.budget_bytes is None or self.memory_used <= self.budget_bytes:
+            return
+        # Images and sounds share one budget; evict whichever was used least recently
+        # within each cache, images first since they are usually the larger ones.
+        for kind, cache in (('image', self.images), ('sound', self.sounds)):
+            for name in list(cache):
+                if self.memory_used <= self.budget_bytes:
+                    return
+                if self.pins.get((kind, name)) or (kind, name) == keep:
+                    continue
+                self.evict(kind, name)
+
+    def evict(self, kind, name):
+        """
+        Drops a loaded asset from the cache. In lazy mode it is reloaded from the
+        manifest on its next use.
+
+        Parameters:
+            kind (str): 'image' or 'sound'.
+            name (str): The name of the asset.
+        """
+        cache = self.images if kind == 'image' else self.sounds
+        if name in cache:
+            del cache[name]
+            self.memory_used -= self.sizes.pop((kind, name), 0)
+            self.stats["evictions"] += 1
+
+    def acquire(self, name, kind='image'):
+        """
+        Pins an asset so it is never evicted, loading it if needed, and returns it.
+        Every call must be balanced by a call to `release`.
+
+        Parameters:
+            name (str): The name of the asset.
+            kind (str, optional): 'image' or 'sound'.
+
+        Returns:
+            pygame.Surface or pygame.mixer.Sound or None: The asset, or None if unknown.
+        """
+        asset = self.get_image(name) if kind == 'image' else self.get_sound(name)
+        cache = self.images if kind == 'image' else self.sounds
+        if asset is not None and name in cache:
+            self.pins[(kind, name)] = self.pins.get((kind, name), 0) + 1
+        return asset
+
+    def release(self, name, kind='image'):
+        """
+        Unpins an asset previously pinned with `acquire`, making it evictable again
+        once no other pins remain.
+
+        Parameters:
+            name (str): The name of the asset.
+            kind (str, optional): 'image' or 'sound'.
+        """
+        key = (kind, name)
+        count = self.pins.get(key, 0) - 1
+        if count > 0:
+            self.pins[key] = count
+        else:
+            self.pins.pop(key, None)
+            self.enforce_budget()
+
+    def build_atlas(self, layout_path=None, max_size=256, page_size=(1024, 1024)):
+        """
+        Packs every loaded image no larger than `max_size` in either dimension into
+        texture atlas pages, and replaces those images with subsurfaces of the pages,
+        so `get_image` keeps returning surfaces that can be blitted as before.
+
+        Parameters:
+            layout_path (str, optional): Where the packing layout is persisted, so it is
+                only recomputed when the set of images or their sizes change.
+            max_size (int, optional): The largest width or height packed into the atlas.
+            page_size (tuple, optional): The (width, height) of an atlas page.
+        """
+        small = {name: image for name, image in self.images.items()
+                 if image.get_width() <= max_size and image.get_height() <= max_size
+                 and image.get_width() <= page_size[0] and image.get_height() <= page_size[1]}
+        self.atlas = TextureAtlas(page_size)
+        self.atlas.build(small, layout_path)
+        for name in small:
+            self.store_asset('image', name, self.atlas.get_image(name))
 
     def get_image(self, name):
         """
-        Retrieves a previously loaded image by name.
+        Retrieves a previously loaded image by name. In lazy mode, an image from the
+        manifest that is not loaded yet (or was evicted) is loaded first.
 
         Parameters:
             name (str): The name of the image to retrieve.
@@ -49,7 +235,16 @@ class AssetManager:
         Returns:
             pygame.Surface or None: The image if found, or None if not found.
         """
-        return self.images.get(name)
+        image = self.images.get(name)
+        if image is not None:
+            self.stats["hits"] += 1
+            self.images.move_to_end(name)
+            return image
+        self.stats["misses"] += 1
+        asset = self.manifest.get(name) if self.lazy else None
+        if asset is None or asset['type'] != 'image':
+            return None
+        return self.load_image(name, asset['path'], self.asset_size(asset))
 
     def load_sound(self, name, path):
         """
@@ -62,14 +257,16 @@ class AssetManager:
         Returns:
             pygame.mixer.Sound: The loaded sound.
         """
-        if name not in self.sounds:
+        sound = self.sounds.get(name)
+        if sound is None:
             sound = pygame.mixer.Sound(path)
-            self.sounds[name] = sound
-        return self.sounds[name]
+            self.store_asset('sound', name, sound)
+        return sound
 
     def get_sound(self, name):
         """
-        Retrieves a previously loaded sound by name.
+        Retrieves a previously loaded sound by name. In lazy mode, a sound from the
+        manifest that is not loaded yet (or was evicted) is loaded first.
 
         Parameters:
             name (str): The name of the sound to retrieve.
@@ -77,20 +274,39 @@ class AssetManager:
         Returns:
             pygame.mixer.Sound or None: The sound if found, or None if not found.
         """
-        return self.sounds.get(name)
+        sound = self.sounds.get(name)
+        if sound is not None:
+            self.stats["hits"] += 1
+            self.sounds.move_to_end(name)
+            return sound
+        self.stats["misses"] += 1
+        asset = self.manifest.get(name) if self.lazy else None
+        if asset is None or asset['type'] != 'sound':
+            return None
+        return self.load_sound(name, asset['path'])
+
+    @staticmethod
+    def asset_size(asset):
+        """Returns the (width, height) an image definition asks for, or None."""
+        return (asset['width'], asset['height']) if 'width' in asset and 'height' in asset else None
 
     def load_assets(self, asset_list):
         """
         Loads multiple assets from a list of asset definitions. Each asset definition
         is a dictionary specifying the type, name, path, and optionally size for images.
+        Every definition is added to the manifest; in lazy mode nothing else happens
+        until the asset is first requested.
 
         Parameters:
             asset_list (list of dict): A list of dictionaries, each representing an asset to load.
         """
+        for asset in asset_list:
+            self.manifest[asset['name']] = asset
+        if self.lazy:
+            return
         for asset in asset_list:
             if asset['type'] == 'image':
-                size = (asset['width'], asset['height']) if 'width' in asset and 'height' in asset else None
-                self.load_image(asset['name'], asset['path'], size)
+                self.load_image(asset['name'], asset['path'], self.asset_size(asset))
             elif asset['type'] == 'sound':
                 self.load_sound(asset['name'], asset['path'])
 
@@ -103,6 +319,126 @@ class AssetManager:
         Parameters:
             config_path (str): The file path to the JSON configuration file defining assets.
         """
+        self.load_assets(self.read_config(config_path))
+
+    def read_config(self, config_path):
+        """
+        Reads the list of asset definitions from a JSON configuration file.
+
+        Parameters:
+            config_path (str): The file path to the JSON configuration file defining assets.
+
+        Returns:
+            list of dict: The asset definitions.
+        """
         with open(config_path, 'r') as f:
-            asset_list = json.load(f)
-            self.load_assets(asset_list)
+            return json.load(f)
+
+    def load_assets_async(self, asset_list, progress_callback=None, max_workers=None):
+        """
+        Starts loading multiple assets on a thread pool and returns immediately.
+        Reading, decoding and scaling run on worker threads; the returned job must be
+        polled from the main thread, which finishes each asset (`convert_alpha`, sound
+        creation) and stores it, so the game loop keeps running while assets load.
+
+        Parameters:
+            asset_list (list of dict): Asset definitions, as for `load_assets`.
+            progress_callback (callable, optional): Called on the main thread as
+                `progress_callback(loaded, total)` each time an asset is stored.
+            max_workers (int, optional): The number of worker threads. Defaults to the
+                number of CPUs.
+
+        Returns:
+            AssetLoadJob: The job to poll until it is done.
+        """
+        return AssetLoadJob(self, asset_list, progress_callback, max_workers)
+
+
+class AssetLoadJob:
+    """
+    An asset loading job running on a thread pool, created by
+    `AssetManager.load_assets_async`. Call `poll` from the main thread, once per frame,
+    until `done` is True.
+
+    Attributes:
+        total (int): The number of assets in the job.
+        loaded (int): The number of assets finished and stored so far.
+    """
+
+    def __init__(self, asset_manager, asset_list, progress_callback=None, max_workers=None):
+        self.asset_manager = asset_manager
+        self.progress_callback = progress_callback
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count())
+        self.pending = []
+        for asset in asset_list:
+            if asset['type'] == 'image':
+                if asset['name'] in asset_manager.images:
+                    continue
+                size = AssetManager.asset_size(asset)
+                packed = asset_manager.pack.get_image(asset['path'], size) if asset_manager.pack else None
+                if packed is not None:
+                    asset_manager.store_asset('image', asset['name'], packed)  # Already decoded; nothing to do in the background
+                    continue
+                future = self.executor.submit(self._decode_image, asset['path'], size)
+            elif asset['type'] == 'sound':
+                if asset['name'] in asset_manager.sounds:
+                    continue
+                future = self.executor.submit(self._read_file, asset['path'])
+            else:
+                continue
+            self.pending.append((asset, future))
+        self.total = len(self.pending)
+        self.loaded = 0
+        if not self.pending:
+            self.executor.shutdown(wait=False)
+
+    @staticmethod
+    def _decode_image(path, size):
+        # pygame releases the GIL while decoding and scaling, so these run in parallel.
+        image = pygame.image.load(path)
+        if size:
+            image = pygame.transform.scale(image, size)
+        return image
+
+    @staticmethod
+    def _read_file(path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    @property
+    def done(self):
+        """bool: True once every asset has been stored."""
+        return not self.pending
+
+    @property
+    def progress(self):
+        """float: The fraction of assets stored, between 0 and 1."""
+        return self.loaded / self.total if self.total else 1.0
+
+    def poll(self):
+        """
+        Finishes and stores every asset whose background work has completed. Must be
+        called from the main thread. Errors raised while loading an asset are re-raised
+        here.
+
+        Returns:
+            bool: True if the job is done.
+        """
+        if not self.pending:
+            return True
+        still_pending = []
+        for asset, future in self.pending:
+            if not future.done():
+                still_pending.append((asset, future))
+                continue
+            if asset['type'] == 'image':
+                self.asset_manager.store_asset('image', asset['name'], future.result().convert_alpha())
+            else:
+                self.asset_manager.store_asset('sound', asset['name'], pygame.mixer.Sound(file=io.BytesIO(future.result())))
+            self.loaded += 1
+            if self.progress_callback:
+                self.progress_callback(self.loaded, self.total)
+        self.pending = still_pending
+        if not self.pending:
+            self.executor.shutdown(wait=False)
+        return not self.pending
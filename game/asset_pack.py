@@ -0,0 +1,174 @@
+"""
+Preprocessed asset packs.
+
+An asset pack holds images that have already been decoded and scaled to the size the
+asset configuration asks for, stored as raw pixels in the display's native 32-bit
+layout, plus a JSON index. `AssetPack` memory-maps the file and wraps the pixel data
+in surfaces directly, so loading a packed image involves no decoding, scaling or
+copying.
+
+Pack layout:
+    magic (4 bytes, b"APK1"), index length (uint32, little endian), JSON index,
+    then the pixel data of every image, each starting at a 64-byte aligned offset.
+
+Each index entry is keyed by the source path and target size and records a SHA-1 of
+the source file and the target size. An entry whose source file has changed is
+stale and ignored, and the caller falls back to decoding the source image. The source
+file's size and modification time are recorded as well, so an unchanged file does
+not have to be hashed again.
+
+Build a pack from the asset configuration with:
+    python -m game.asset_pack assets_config.json assets.pack
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+import pygame
+
+MAGIC = b"APK1"
+HEADER = struct.Struct("<4sI")
+ALIGNMENT = 64
+PIXEL_FORMAT = "BGRA"  # Matches the masks convert_alpha() produces on 32-bit displays
+
+
+def entry_key(path, size):
+    """Returns the index key for an image path and target size (or None)."""
+    return f"{path}|{size[0]}x{size[1]}" if size else f"{path}|native"
+
+
+def content_hash(path, size):
+    """Returns the SHA-1 of the source file's contents and the target size."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        digest.update(f.read())
+    digest.update(repr(tuple(size) if size else None).encode())
+    return digest.hexdigest()
+
+
+def build_pack(config_path, pack_path):
+    """
+    Decodes and scales every image in an asset configuration and writes them to a pack.
+
+    Parameters:
+        config_path (str): The JSON asset configuration.
+        pack_path (str): Where to write the pack.
+
+    Returns:
+        int: The number of images written.
+    """
+    with open(config_path, "r") as f:
+        asset_list = json.load(f)
+
+    entries = {}
+    blobs = []
+    offset = 0
+    for asset in asset_list:
+        if asset["type"] != "image":
+            continue
+        size = (asset["width"], asset["height"]) if "width" in asset and "height" in asset else None
+        key = entry_key(asset["path"], size)
+        if key in entries:
+            continue
+        image = pygame.image.load(asset["path"])
+        if size:
+            image = pygame.transform.scale(image, size)
+        pixels = pygame.image.tobytes(image, PIXEL_FORMAT)
+        stat = os.stat(asset["path"])
+        entries[key] = {
+            "hash": content_hash(asset["path"], size),
+            "file_size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": list(image.get_size()),
+            "offset": offset,
+            "length": len(pixels),
+        }
+        padding = -len(pixels) % ALIGNMENT
+        blobs.append(pixels + bytes(padding))
+        offset += len(pixels) + padding
+
+    index = json.dumps({"format": PIXEL_FORMAT, "entries": entries}).encode()
+    data_start = HEADER.size + len(index)
+    data_start += -data_start % ALIGNMENT
+    with open(pack_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(index)))
+        f.write(index)
+        f.write(bytes(data_start - HEADER.size - len(index)))
+        for blob in blobs:
+            f.write(blob)
+    return len(entries)
+
+
+class AssetPack:
+    """
+    A memory-mapped asset pack. Surfaces returned by `get_image` share memory with the
+    mapping, which is private (copy-on-write), so the pack file is never modified.
+
+    Attributes:
+        path (str): The pack file.
+        entries (dict): The index, keyed by `entry_key`.
+    """
+
+    def __init__(self, path):
+        """
+        Opens and maps a pack file.
+
+        Parameters:
+            path (str): The pack file.
+
+        Raises:
+            ValueError: If the file is not an asset pack.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self.mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, index_length = HEADER.unpack_from(self.mapping)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an asset pack")
+        index = json.loads(bytes(self.mapping[HEADER.size:HEADER.size + index_length]))
+        self.format = index["format"]
+        self.entries = index["entries"]
+        self.data_start = HEADER.size + index_length
+        self.data_start += -self.data_start % ALIGNMENT
+        self.view = memoryview(self.mapping)
+
+    def is_fresh(self, entry, path, size):
+        """Returns True if an index entry still matches its source file."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if stat.st_size == entry["file_size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        return content_hash(path, size) == entry["hash"]
+
+    def get_image(self, path, size=None):
+        """
+        Returns the packed image for a source path and target size.
+
+        Parameters:
+            path (str): The source image path, as in the asset configuration.
+            size (tuple, optional): The target (width, height).
+
+        Returns:
+            pygame.Surface or None: A surface backed by the pack, or None if the image
+            is not in the pack or its source file changed since the pack was built.
+        """
+        entry = self.entries.get(entry_key(path, size))
+        if entry is None or not self.is_fresh(entry, path, size):
+            return None
+        start = self.data_start + entry["offset"]
+        buffer = self.view[start:start + entry["length"]]
+        return pygame.image.frombuffer(buffer, tuple(entry["size"]), self.format)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python -m game.asset_pack <assets_config.json> <output.pack>")
+        sys.exit(2)
+    count = build_pack(sys.argv[1], sys.argv[2])
+    print(f"Packed {count} images into {sys.argv[2]}")
@@ -0,0 +1,72 @@
+import pygame
+
+
+class Camera:
+    """
+    The Camera maps world space to screen space. It follows a target (usually the
+    player) once per simulation tick, and its position is interpolated between the
+    previous and the latest tick when drawing, like entity positions, so a followed
+    entity stays steady on screen.
+
+    Attributes:
+        rect (pygame.Rect): The area of the world visible on screen at the latest tick.
+        prev_topleft (tuple): The world position of the view's top-left corner at the
+            previous tick.
+    """
+
+    def __init__(self, width, height):
+        """
+        Initializes a camera looking at the world origin.
+
+        Parameters:
+            width (int): The width of the viewport, in pixels.
+            height (int): The height of the viewport, in pixels.
+        """
+        self.rect = pygame.Rect(0, 0, width, height)
+        self.prev_topleft = self.rect.topleft
+
+    def follow(self, target, bounds=None, snap=False):
+        """
+        Centers the view on a target rect, keeping it inside the world bounds. On an
+        axis where the world is smaller than the view, the view is aligned with the
+        world's top-left edge.
+
+        Parameters:
+            target (pygame.Rect): The rect to center on, in world coordinates.
+            bounds (pygame.Rect, optional): The extent of the world.
+            snap (bool, optional): Jump straight to the new position instead of
+                moving there over the next frames.
+        """
+        self.prev_topleft = self.rect.topleft
+        self.rect.center = target.center
+        if bounds is not None:
+            self.rect.left = max(bounds.left, min(self.rect.left, bounds.right - self.rect.width))
+            self.rect.top = max(bounds.top, min(self.rect.top, bounds.bottom - self.rect.height))
+        if snap:
+            self.prev_topleft = self.rect.topleft
+
+    def moved(self):
+        """Returns True if the view moved during the latest tick."""
+        return self.prev_topleft != self.rect.topleft
+
+    def position(self, alpha=1.0):
+        """
+        Returns the world position of the view's top-left corner, interpolated between
+        the previous and the latest tick and rounded to whole pixels.
+        """
+        prev_x, prev_y = self.prev_topleft
+        return (round(prev_x + (self.rect.x - prev_x) * alpha),
+                round(prev_y + (self.rect.y - prev_y) * alpha))
+
+    def offset(self, alpha=1.0):
+        """Returns the (dx, dy) that turns world coordinates into screen coordinates."""
+        x, y = self.position(alpha)
+        return -x, -y
+
+    def view(self, alpha=1.0):
+        """Returns the visible area of the world, in world coordinates."""
+        return pygame.Rect(self.position(alpha), self.rect.size)
+
+    def to_screen(self, rect, alpha=1.0):
+        """Returns a world-space rect moved into screen space."""
+        return rect.move(self.offset(alpha))
@@ -1,22 +1,62 @@
+from level.tile import TILE_SIZE, tile_ids_matching
+
+
 class CollisionManager:
     """
     The CollisionManager is responsible for managing collision detection in the game.
     It offers methods to check for collisions between entities (e.g., characters, enemies)
     and between entities and the environment (specific tile types within the level).
 
+    Tile queries read the level's grid of tile IDs directly: a rect is only tested
+    against the few cells it overlaps, each one a byte lookup, and nothing has to be
+    rebuilt when the level is loaded, edited or streamed.
+
+    Movement is resolved with `move_rect`, which sweeps a rect through the grid one
+    axis at a time and stops it flush against the first blocking tile, so entities
+    slide along walls and cannot pass through them however fast they move.
+
+    Entity-vs-entity collisions use a broadphase: a uniform spatial hash rebuilt each
+    tick with `update_broadphase`, from which `get_candidate_pairs` reports only the
+    pairs of entities sharing a cell, instead of testing every pair.
+
     Attributes:
         level (Level): The level object containing tile information necessary for
             collision checks against the environment.
+        cell_size (int): The size, in pixels, of a level grid cell.
+        broadphase_cell_size (int): The size, in pixels, of a cell in the entity spatial hash.
+        broadphase (dict): Maps a spatial hash cell to the indices of the entities overlapping it.
+        broadphase_entities (list): The entities the spatial hash was last built from.
     """
 
-    def __init__(self, level):
+    def __init__(self, level, broadphase_cell_size=TILE_SIZE * 2):
         """
         Initializes the CollisionManager with a reference to the level object.
 
         Parameters:
             level (Level): The level containing tile information for environment collision checks.
+            broadphase_cell_size (int, optional): The size of a cell in the entity spatial hash.
+                Works best at about the size of the largest entity.
         """
         self.level = level
+        self.cell_size = TILE_SIZE
+        self.broadphase_cell_size = broadphase_cell_size
+        self.broadphase = {}
+        self.broadphase_entities = []
+
+    def _cells(self, rect, size=None):
+        """
+        Yields the cells of the given size (the level grid cell size by default)
+        overlapped by a rect. Empty rects overlap no cells, matching
+        `pygame.Rect.colliderect`.
+        """
+        left, right = sorted((rect.left, rect.right))
+        top, bottom = sorted((rect.top, rect.bottom))
+        if left == right or top == bottom:
+            return
+        size = size or self.cell_size
+        for row in range(top // size, (bottom - 1) // size + 1):
+            for col in range(left // size, (right - 1) // size + 1):
+                yield col, row
 
     def check_entity_collision(self, entity1, entity2):
         """
@@ -31,19 +71,138 @@ class CollisionManager:
         """
         return entity1.rect.colliderect(entity2.rect)
 
-    def check_tile_collision(self, test_rect, tile_type):
+    def update_broadphase(self, entities):
+        """
+        Rebuilds the entity spatial hash from the current positions of the given
+        entities. Call once per tick after entities have moved.
+
+        Parameters:
+            entities (list): The entities to insert, each with a `rect` attribute.
+        """
+        self.broadphase = {}
+        self.broadphase_entities = list(entities)
+        size = self.broadphase_cell_size
+        for index, entity in enumerate(self.broadphase_entities):
+            for cell in self._cells(entity.rect, size):
+                bucket = self.broadphase.get(cell)
+                if bucket is None:
+                    self.broadphase[cell] = [index]
+                else:
+                    bucket.append(index)
+
+    def get_candidate_pairs(self):
+        """
+        Returns the pairs of entities that share at least one spatial hash cell and
+        may therefore be colliding. Each pair is reported once, ordered as in the list
+        given to `update_broadphase`; confirm with `check_entity_collision`.
+
+        Returns:
+            list of tuple: The candidate (entity1, entity2) pairs.
+        """
+        pairs = set()
+        for bucket in self.broadphase.values():
+            count = len(bucket)
+            if count < 2:
+                continue
+            for i in range(count - 1):
+                first = bucket[i]
+                for j in range(i + 1, count):
+                    pairs.add((first, bucket[j]))
+        entities = self.broadphase_entities
+        return [(entities[i], entities[j]) for i, j in sorted(pairs)]
+
+    def query_rect(self, rect):
+        """
+        Returns the entities from the last `update_broadphase` that share a spatial hash
+        cell with a rect, e.g. the visible area of the world, in the order they were
+        given. Entities near the rect's edge may not actually overlap it.
+
+        Parameters:
+            rect (pygame.Rect): The area to query.
+
+        Returns:
+            list: The entities in the cells the rect overlaps.
+        """
+        indices = set()
+        for cell in self._cells(rect, self.broadphase_cell_size):
+            bucket = self.broadphase.get(cell)
+            if bucket:
+                indices.update(bucket)
+        entities = self.broadphase_entities
+        return [entities[index] for index in sorted(indices)]
+
+    def check_tile_collision(self, test_rect, tile_type=None):
         """
         Checks for collisions between a given rectangle (representing an entity's bounding box)
         and tiles of a specific type within the level.
 
+        Only the grid cells the rectangle overlaps are looked up. Tiles fill their cell,
+        so a tile in one of those cells always overlaps the rectangle.
+
         Parameters:
             test_rect (pygame.Rect): The rectangle to test for collisions.
-            tile_type (str): The type of tile to check for collisions with.
+            tile_type (str, optional): The type of tile to check for collisions with;
+                any solid tile if omitted.
 
         Returns:
             bool: True if there is a collision with the specified tile type, False otherwise.
         """
-        for tile in self.level.tiles:
-            if tile.tile_type == tile_type and test_rect.colliderect(tile.rect):
+        tile_ids = tile_ids_matching(tile_type)
+        if not tile_ids:
+            return False
+        # Level.get_tile_id, inlined: this is the hottest query in the game.
+        chunks, size = self.level.chunks, self.level.chunk_size
+        for col, row in self._cells(test_rect):
+            chunk = chunks.get((col // size, row // size))
+            if chunk is not None and chunk.cells[(row % size) * size + col % size] in tile_ids:
                 return True
         return False
+
+    def move_rect(self, rect, dx, dy, tile_type=None):
+        """
+        Moves a rect through the level, first along x and then along y, stopping it
+        on each axis flush against the first tile of a given type in its way. Only
+        the cells the rect's leading edge sweeps into are looked up, so the cost grows
+        with the number of cells crossed and fast movement cannot skip over a tile.
+        Tiles the rect already overlaps do not block it, so it can move out of them.
+
+        Parameters:
+            rect (pygame.Rect): The rect to move; it is not modified.
+            dx (int): The movement along x, in pixels.
+            dy (int): The movement along y, in pixels.
+            tile_type (str, optional): The type of tile that blocks movement; any
+                solid tile if omitted.
+
+        Returns:
+            pygame.Rect: The rect at its resolved position.
+        """
+        tile_ids = tile_ids_matching(tile_type)
+        rect = rect.copy()
+        if dx:
+            rect.x += self._sweep(rect.left, rect.right, rect.top, rect.bottom, dx, tile_ids, False)
+        if dy:
+            rect.y += self._sweep(rect.top, rect.bottom, rect.left, rect.right, dy, tile_ids, True)
+        return rect
+
+    def _sweep(self, start, end, across_start, across_end, delta, tile_ids, vertical):
+        """
+        Returns how far, up to `delta`, the span [start, end) can move along one axis
+        before entering a cell holding one of `tile_ids`, where [across_start,
+        across_end) is the span on the other axis.
+        """
+        if not tile_ids or across_start >= across_end or start >= end:
+            return delta
+        size = self.cell_size
+        chunks, chunk_size = self.level.chunks, self.level.chunk_size
+        across = range(across_start // size, (across_end - 1) // size + 1)
+        if delta > 0:
+            lines = range((end - 1) // size + 1, (end - 1 + delta) // size + 1)
+        else:
+            lines = range(start // size - 1, (start + delta) // size - 1, -1)
+        for line in lines:
+            for cell in across:
+                col, row = (cell, line) if vertical else (line, cell)
+                chunk = chunks.get((col // chunk_size, row // chunk_size))
+                if chunk is not None and chunk.cells[(row % chunk_size) * chunk_size + col % chunk_size] in tile_ids:
+                    return line * size - end if delta > 0 else (line + 1) * size - start
+        return delta
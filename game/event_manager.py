@@ -6,6 +6,14 @@ class EventManager:
     within the game. It allows for a decoupled architecture where game states and
     other components can listen for and react to events without being directly linked.
 
+    Listeners can subscribe to specific event types, in which case they are only
+    called for those types, and are called in order of decreasing priority. A listener
+    consumes an event by returning True from its handle_event method, which stops the
+    event from reaching lower-priority listeners. Dispatch goes through a per-type table
+    of interested listeners, so the cost of an event depends on how many listeners want
+    it rather than on how many are registered. Listeners may register or unregister
+    while an event is being dispatched.
+
     Attributes:
         listeners (list): A list of registered listeners that will receive events.
     """
@@ -15,6 +23,9 @@ class EventManager:
         Initializes the EventManager with an empty list of listeners.
         """
         self.listeners = []
+        self.registrations = {}  # listener -> (event types or None for all, priority, registration order)
+        self.dispatch_table = {}  # event type -> tuple of listeners, built on first use
+        self.registration_count = 0
 
     def process_events(self, events):
         """
@@ -32,17 +43,26 @@ class EventManager:
             else:
                 self.dispatch(event)
 
-    def register_listener(self, listener):
+    def register_listener(self, listener, event_types=None, priority=0):
         """
         Registers a new listener for event notifications if it's not already registered.
         Registered listeners will receive events through their handle_event method.
 
         Parameters:
             listener: The listener to be registered, expected to implement a
-            handle_event method.
+            handle_event method. Returning True from handle_event consumes the event.
+            event_types (iterable, optional): The event types the listener is interested
+                in. All events are delivered if omitted.
+            priority (int, optional): Listeners with a higher priority receive events
+                first. Listeners with equal priority are called in registration order.
         """
-        if listener not in self.listeners:
-            self.listeners.append(listener)
+        if listener in self.registrations:
+            return
+        types = frozenset(event_types) if event_types is not None else None
+        self.registrations[listener] = (types, priority, self.registration_count)
+        self.registration_count += 1
+        self.listeners.append(listener)
+        self.dispatch_table = {}  # Rebuilt lazily; a dispatch in progress keeps its own snapshot
 
     def unregister_listener(self, listener):
         """
@@ -52,16 +72,45 @@ class EventManager:
         Parameters:
             listener: The listener to be unregistered.
         """
-        if listener in self.listeners:
+        if listener in self.registrations:
+            del self.registrations[listener]
             self.listeners.remove(listener)
+            self.dispatch_table = {}
+
+    def listeners_for(self, event_type):
+        """
+        Returns the listeners interested in an event type, highest priority first.
+
+        Parameters:
+            event_type (int): The pygame event type.
+
+        Returns:
+            tuple: The interested listeners.
+        """
+        listeners = self.dispatch_table.get(event_type)
+        if listeners is None:
+            interested = [(-priority, order, listener)
+                          for listener, (types, priority, order) in self.registrations.items()
+                          if types is None or event_type in types]
+            interested.sort(key=lambda entry: entry[:2])
+            listeners = self.dispatch_table[event_type] = tuple(entry[2] for entry in interested)
+        return listeners
 
     def dispatch(self, event):
         """
-        Dispatches an event to all registered listeners, calling their handle_event
-        method with the event as the argument.
+        Dispatches an event to the registered listeners interested in its type,
+        calling their handle_event method with the event as the argument, until one
+        of them consumes it.
 
         Parameters:
             event: The event to be dispatched.
+
+        Returns:
+            bool: True if a listener consumed the event.
         """
-        for listener in self.listeners:
-            listener.handle_event(event)
+        registrations = self.registrations
+        for listener in self.listeners_for(event.type):
+            # Skip listeners unregistered by an earlier listener during this dispatch.
+            if listener in registrations and listener.handle_event(event):
+                return True
+        return False
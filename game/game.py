@@ -1,9 +1,16 @@
+import os
+import time
+
 import pygame
 from game.asset_manager import AssetManager
 from game.event_manager import EventManager
+from game.input_manager import InputManager
+from game.profiler import FrameProfiler
+from game.text_cache import TextCache
 from game.state_manager import StateManager
 from states.game_over_state import GameOver
 from states.gameplay import Gameplay
+from states.loading_state import Loading
 from states.main_menu_state import MainMenu
 from states.pause_state import Pause
 
@@ -14,41 +21,149 @@ class Game:
     executing the main game loop.
 
     Attributes:
-        screen (pygame.Surface): The main screen surface where the game is rendered.
+        headless (bool): True when the game runs without a window, e.g. on build boxes.
+        screen (pygame.Surface): The main screen surface where the game is rendered. In
+            headless mode this is an offscreen surface.
         clock (pygame.time.Clock): Clock used to control the game's frame rate.
+        tick_rate (int): Simulation ticks per second; game speed is defined per tick.
+        frame_rate (int): Maximum rendered frames per second, 0 for uncapped.
         running (bool): Flag indicating if the game is running.
+        text_cache (TextCache): Shared fonts and rendered text surfaces for all states.
         font (pygame.font.Font): Default font used across different game states.
         state_manager (StateManager): Manages transitions between game states.
         asset_manager (AssetManager): Handles loading and accessing game assets.
         event_manager (EventManager): Processes and delegates events within the game.
+        input (InputManager): Drains the event queue once per frame into an input snapshot
+            and maps keys to named actions.
+        tick_count (int): Number of ticks simulated so far.
+        dirty_rect_rendering (bool): Whether only the regions reported by the current
+            state are redrawn and presented each frame, instead of the full screen.
+        dirty_rects (list or None): The regions rendered by the last frame; None means the
+            whole screen.
+        profiler (FrameProfiler): Records per-phase frame timings. F3 toggles its
+            overlay and F4 captures a cProfile of the next PROFILE_CAPTURE_FRAMES frames.
+        ai_workers (int): Worker processes enemy AI is spread over; 0 runs it on the
+            main thread.
+        ai_lod (bool): Whether enemy AI is updated less often far from the player.
+        ai_budget_ms (float or None): The time enemy AI may take per tick with `ai_lod`.
+        atlas (bool): Whether small images are packed into a texture atlas once loaded.
     """
 
-    def __init__(self):
+    ASSET_CONFIG_PATH = "assets_config.json"
+    ASSET_PACK_PATH = "assets.pack"  # Built with `python -m game.asset_pack`; optional
+    ATLAS_LAYOUT_PATH = "atlas_layout.json"  # Cached texture atlas packing
+    PROFILE_CAPTURE_FRAMES = 120
+    PROFILE_CAPTURE_PATH = "frame_profile.prof"
+    MAX_CATCHUP_TICKS = 5  # Simulation ticks run at most per rendered frame
+
+    def __init__(self, headless=False, screen_size=(800, 600), dirty_rect_rendering=False,
+                 asset_budget_bytes=None, tick_rate=60, frame_rate=60, ai_workers=0,
+                 ai_lod=False, ai_budget_ms=None, atlas=False):
         """
         Initializes the game, setting up the screen, clock, and managers for states,
         assets, and events. It also preloads assets and sets up initial game states.
+
+        Parameters:
+            headless (bool, optional): Run without opening a window. SDL's dummy video
+                and audio drivers are used and rendering goes to an offscreen surface;
+                drive the game with `step` instead of `run`.
+            screen_size (tuple, optional): The (width, height) of the screen surface.
+            dirty_rect_rendering (bool, optional): Draw and present only the screen regions
+                the current state reports as changed. Static frames then cost almost
+                nothing, which matters most with software rendering.
+            asset_budget_bytes (int, optional): Load assets lazily, on first use, and keep
+                the loaded ones within this many bytes (see `AssetManager`).
+            tick_rate (int, optional): Simulation ticks per second.
+            frame_rate (int, optional): Maximum rendered frames per second, e.g. 144 on
+                fast displays; 0 renders as fast as possible.
+            ai_workers (int, optional): Compute enemy AI in this many worker processes
+                (see `ParallelAIScheduler`), e.g. on servers running many NPCs.
+            ai_lod (bool, optional): Update far-off enemies every few ticks and
+                extrapolate them in between (see `LODAIScheduler`). Takes precedence
+                over `ai_workers`.
+            ai_budget_ms (float, optional): With `ai_lod`, defer AI updates beyond this
+                many milliseconds per tick to the following ticks.
+            atlas (bool, optional): Pack small images into a texture atlas after loading
+                (see `TextureAtlas`). This copies every packed image, including those
+                mapped zero-copy from the asset pack, so it is off by default; enable it
+                when draw calls, not load time or memory, are the bottleneck.
         """
+        self.headless = headless
+        if headless:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
         pygame.init()
-        self.screen = pygame.display.set_mode((800, 600))
+        if headless:
+            # A 1x1 dummy display is still needed so surfaces can be converted
+            # (e.g. convert_alpha while loading assets).
+            pygame.display.set_mode((1, 1))
+            self.screen = pygame.Surface(screen_size)
+        else:
+            self.screen = pygame.display.set_mode(screen_size)
         self.clock = pygame.time.Clock()
+        self.tick_rate = tick_rate
+        self.frame_rate = frame_rate
+        self.ai_workers = ai_workers
+        self.ai_lod = ai_lod
+        self.ai_budget_ms = ai_budget_ms
+        self.atlas = atlas
         self.running = True
-        self.font = pygame.font.Font(None, 36)  # Set up a basic font
+        self.tick_count = 0
+        self.dirty_rect_rendering = dirty_rect_rendering
+        self.dirty_rects = None
+        self.text_cache = TextCache()
+        self.font = self.text_cache.get_font(None, 36)  # Set up a basic font
+        self.profiler = FrameProfiler()
+        self.profiler_font = self.text_cache.get_font(None, 20)
 
         # Initialize managers
         self.state_manager = StateManager(self)
-        self.asset_manager = AssetManager()
+        lazy_assets = asset_budget_bytes is not None
+        self.asset_manager = AssetManager(lazy=lazy_assets, budget_bytes=asset_budget_bytes)
         self.event_manager = EventManager()
+        self.input = InputManager()
+        self.event_manager.register_listener(self, (pygame.KEYDOWN,), priority=100)
 
-        self.load_assets()  # Preload assets
-        self.setup_states()  # Set up initial game states
+        if headless or lazy_assets:
+            # Headless runs are driven tick by tick, so load everything up front;
+            # lazy loading only reads the manifest here.
+            self.load_assets()  # Preload assets
+            self.setup_states()  # Set up initial game states
+        else:
+            self.start_loading()  # Load assets in the background behind a loading screen
 
     def load_assets(self):
         """
         Loads game assets through the AssetManager. This method can be expanded to
         load assets from a configuration file or through specific asset loading
-        functions.
+        functions. Images present in the asset pack, if one was built, are used
+        without decoding, and small images are packed into a texture atlas if `atlas`
+        is set and assets are not loaded lazily.
+        """
+        self.asset_manager.open_pack(self.ASSET_PACK_PATH)
+        self.asset_manager.load_assets_from_config(self.ASSET_CONFIG_PATH)
+        if self.atlas and not self.asset_manager.lazy:
+            self.asset_manager.build_atlas(self.ATLAS_LAYOUT_PATH)
+
+    def start_loading(self):
         """
-        self.asset_manager.load_assets_from_config('assets_config.json')
+        Shows the Loading state, which loads the configured assets on a thread pool
+        while the game loop keeps running, and sets up the remaining game states once
+        loading has finished.
+        """
+        self.asset_manager.open_pack(self.ASSET_PACK_PATH)
+        asset_list = self.asset_manager.read_config(self.ASSET_CONFIG_PATH)
+        self.state_manager.add_state("Loading", Loading(self, asset_list, self.finish_loading))
+        self.state_manager.change_state("Loading")
+
+    def finish_loading(self):
+        """
+        Called by the Loading state once every asset is loaded: packs small images into
+        the texture atlas if `atlas` is set and sets up the game states.
+        """
+        if self.atlas:
+            self.asset_manager.build_atlas(self.ATLAS_LAYOUT_PATH)
+        self.setup_states()
 
     def setup_states(self):
         """
@@ -66,31 +181,132 @@ class Game:
         """
         Executes the main game loop, processing events, updating the current game
         state, and rendering to the screen, until the game is no longer running.
+
+        Simulation runs at a fixed rate (`tick_rate`), independent of how often frames
+        are rendered (`frame_rate`): real elapsed time is accumulated and consumed in
+        fixed ticks, at most MAX_CATCHUP_TICKS per frame, and each frame is drawn with
+        the fraction of a tick left over as the interpolation alpha.
         """
+        tick_duration = 1.0 / self.tick_rate
+        accumulator = 0.0
+        previous = time.perf_counter()
         while self.running:
-            events = pygame.event.get()
-            for event in events:
-                if event.type == pygame.QUIT:
-                    self.quit()
-            
-            # Handle input events for the current state.
-            # This line sends all Pygame events collected at the start of the loop to the
-            # current active game state for processing. This could include player movements,
-            # actions, or other inputs that affect the game state.
-            self.state_manager.current_state.handle_event(events)
-
-            # Process global events that are not specific to any game state.
-            # The EventManager may handle system-wide events or trigger actions that are
-            # independent of the current game state, such as logging, debugging actions, or
-            # global shortcuts.
-            self.event_manager.process_events(events)
-
-            # Update the current game state.
-            # This call advances the game logic by one tick or frame. Depending on the current
-            # state, this can involve moving game entities, handling game logic, checking for
-            # collisions, or other game-specific updates.
-            self.state_manager.update()
+            self.profiler.begin_frame()
+            self.process_input()
 
+            now = time.perf_counter()
+            accumulator += now - previous
+            previous = now
+            ticks = 0
+            while accumulator >= tick_duration and ticks < self.MAX_CATCHUP_TICKS:
+                self.simulate()
+                accumulator -= tick_duration
+                ticks += 1
+            if ticks == self.MAX_CATCHUP_TICKS and accumulator >= tick_duration:
+                # Too far behind to catch up: drop the backlog rather than spiral.
+                accumulator = 0.0
+
+            self.render(accumulator / tick_duration)
+
+            if self.dirty_rects is None:
+                pygame.display.flip()
+            elif self.dirty_rects:
+                pygame.display.update(self.dirty_rects)
+
+            self.clock.tick(self.frame_rate)  # Cap the render rate (0 leaves it uncapped)
+            self.profiler.mark("present")
+            self.profiler.end_frame()
+
+    def step(self, ticks=1, render=False):
+        """
+        Advances the game by a number of ticks as fast as possible, without a frame
+        cap or display flip. Intended for headless simulation, load and soak tests,
+        and fast-forwarding.
+
+        Parameters:
+            ticks (int, optional): The number of ticks to simulate.
+            render (bool, optional): Whether to draw each tick to the screen surface.
+
+        Returns:
+            int: The number of ticks actually simulated; fewer than requested if the
+            game stopped running.
+        """
+        for done in range(ticks):
+            if not self.running:
+                return done
+            self.tick(render)
+            self.profiler.end_frame()
+        return ticks
+
+    def tick(self, render=True):
+        """
+        Runs a single iteration of the game loop: event handling, one simulation tick
+        and, optionally, drawing to the screen surface. Presenting the frame, frame
+        pacing and ending the profiler frame are left to the caller.
+
+        Parameters:
+            render (bool, optional): Whether to draw the current state to the screen surface.
+        """
+        self.profiler.begin_frame()
+        self.process_input()
+        self.simulate()
+        if render:
+            self.render()
+
+    def process_input(self):
+        """
+        Polls the frame's input and hands its events to the current state and the
+        EventManager. Runs once per rendered frame.
+        """
+        # The only place the event queue is drained; everything else reads the snapshot.
+        events = self.input.poll().events
+        for event in events:
+            if event.type == pygame.QUIT:
+                self.quit()
+        self.profiler.mark("events")
+
+        # Handle input events for the current state.
+        # This line sends all Pygame events collected at the start of the loop to the
+        # current active game state for processing. This could include player movements,
+        # actions, or other inputs that affect the game state.
+        self.state_manager.current_state.handle_event(events)
+        self.profiler.mark("handle_event")
+
+        # Process global events that are not specific to any game state.
+        # The EventManager may handle system-wide events or trigger actions that are
+        # independent of the current game state, such as logging, debugging actions, or
+        # global shortcuts.
+        self.event_manager.process_events(events)
+        self.profiler.mark("process_events")
+
+    def simulate(self):
+        """
+        Advances the current game state by one fixed simulation tick.
+        """
+        # Update the current game state.
+        # This call advances the game logic by one tick. Depending on the current
+        # state, this can involve moving game entities, handling game logic, checking for
+        # collisions, or other game-specific updates.
+        self.state_manager.update()
+        self.tick_count += 1
+        self.profiler.mark("update")
+
+    def render(self, alpha=1.0):
+        """
+        Draws the current state to the screen surface, or only the regions it reports
+        as changed when dirty-rectangle rendering is on.
+
+        Parameters:
+            alpha (float, optional): How far, between 0 and 1, the frame lies between the
+                previous and the latest simulation tick; states interpolate with it.
+        """
+        self.dirty_rects = None
+        if self.dirty_rect_rendering:
+            self.dirty_rects = self.state_manager.get_dirty_rects()
+            if self.profiler.overlay_visible:
+                self.dirty_rects = None
+
+        if self.dirty_rects != []:
             # Render the current frame.
             self.screen.fill((0, 0, 0))  # Clear the screen with a black color before drawing the new frame.
             # This ensures that each frame starts with a blank canvas, preventing ghosting from previous frames.
@@ -98,11 +314,30 @@ class Game:
             # Draw the current state's visuals to the screen.
             # Depending on the active state, this could include drawing the main menu, the game
             # playfield, pause menu, or game over screen. Each state is responsible for its own rendering.
-            self.state_manager.draw(self.screen)
-            
-            pygame.display.flip()
+            self.state_manager.draw(self.screen, alpha)
+            self.profiler.draw_overlay(self.screen, self.profiler_font)
+            self.profiler.mark("draw")
 
-            self.clock.tick(60)  # Maintain 60 frames per second
+    def handle_event(self, event):
+        """
+        Handles the global debug keys. Registered with the EventManager for key presses
+        only, ahead of other listeners: F3 toggles the profiler overlay and F4 captures
+        a cProfile of the next frames.
+
+        Parameters:
+            event (pygame.event.Event): A KEYDOWN event.
+
+        Returns:
+            bool: True if the key was a debug key, consuming the event.
+        """
+        if event.key == pygame.K_F3:
+            self.profiler.toggle_overlay()
+            self.state_manager.state_changed = True  # Repaint the area under the overlay
+            return True
+        if event.key == pygame.K_F4:
+            self.profiler.capture_profile(self.PROFILE_CAPTURE_FRAMES, self.PROFILE_CAPTURE_PATH)
+            return True
+        return False
 
     def quit(self):
         """
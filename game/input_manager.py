@@ -0,0 +1,102 @@
+from collections import namedtuple
+
+import pygame
+
+# Default bindings of named actions to keys. Several keys may trigger one action.
+DEFAULT_ACTIONS = {
+    "move_left": (pygame.K_a,),
+    "move_right": (pygame.K_d,),
+    "move_up": (pygame.K_w,),
+    "move_down": (pygame.K_s,),
+    "pause": (pygame.K_ESCAPE,),
+}
+
+
+class InputSnapshot(namedtuple("InputSnapshot", "events keys mouse_buttons mouse_pos actions")):
+    """
+    An immutable view of the input for one frame: every event drained from the queue
+    that frame, the keyboard and mouse button state arrays and the mouse position.
+    All readers in a frame see the same input, so no event is consumed twice or lost.
+
+    Attributes:
+        events (tuple): The pygame events of the frame.
+        keys (sequence): Pressed state of every key, indexed by key constant.
+        mouse_buttons (tuple): Pressed state of the mouse buttons.
+        mouse_pos (tuple): The mouse position.
+        actions (dict): The action name -> keys bindings in effect for the frame.
+    """
+
+    __slots__ = ()
+
+    def is_pressed(self, action):
+        """
+        Returns True if any key bound to the action is held down.
+
+        Parameters:
+            action (str): The action name.
+        """
+        keys = self.keys
+        return any(keys[key] for key in self.actions.get(action, ()))
+
+    def was_pressed(self, action):
+        """
+        Returns True if a key bound to the action was pressed during the frame.
+
+        Parameters:
+            action (str): The action name.
+        """
+        bound = self.actions.get(action, ())
+        return any(event.type == pygame.KEYDOWN and event.key in bound for event in self.events)
+
+
+class InputManager:
+    """
+    The InputManager drains the pygame event queue once per frame into an
+    `InputSnapshot` and maps raw keys to named actions, so game code asks whether
+    "move_left" is pressed instead of polling the keyboard or the event queue itself.
+
+    Attributes:
+        actions (dict): Maps an action name to the tuple of keys bound to it.
+        snapshot (InputSnapshot): The input of the current frame.
+    """
+
+    def __init__(self, actions=None):
+        """
+        Initializes the InputManager with the given or default bindings and an empty
+        snapshot.
+
+        Parameters:
+            actions (dict, optional): Maps action names to tuples of key constants.
+        """
+        self.actions = dict(actions if actions is not None else DEFAULT_ACTIONS)
+        self.snapshot = InputSnapshot((), pygame.key.get_pressed(), (False, False, False), (0, 0), dict(self.actions))
+
+    def poll(self):
+        """
+        Drains the event queue and captures the key and mouse state. Call exactly once
+        per frame; everything else should read the returned snapshot.
+
+        Returns:
+            InputSnapshot: The input of the new frame.
+        """
+        self.snapshot = InputSnapshot(
+            tuple(pygame.event.get()),
+            pygame.key.get_pressed(),
+            pygame.mouse.get_pressed(),
+            pygame.mouse.get_pos(),
+            self.snapshot.actions,
+        )
+        return self.snapshot
+
+    def bind(self, action, keys):
+        """
+        Binds an action to a set of keys, replacing its previous binding. Takes effect
+        immediately: the current snapshot is updated too, and later snapshots carry
+        the binding forward.
+
+        Parameters:
+            action (str): The action name.
+            keys (iterable): The key constants that trigger the action.
+        """
+        self.actions[action] = tuple(keys)
+        self.snapshot = self.snapshot._replace(actions=dict(self.actions))
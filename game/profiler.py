@@ -0,0 +1,172 @@
+import cProfile
+import csv
+import json
+import pstats
+import time
+from collections import deque
+
+
+class FrameProfiler:
+    """
+    The FrameProfiler records how long each phase of a frame takes. Timings for the
+    most recent frames are kept in a ring buffer, from which p50/p95/p99 statistics
+    are computed, shown in an optional on-screen overlay and exported to JSON or CSV.
+    It can also run cProfile over a chosen number of upcoming frames to find out what
+    causes a spike.
+
+    The game loop calls `begin_frame`, then `mark(phase)` at the end of each phase,
+    and finally `end_frame`.
+
+    Attributes:
+        enabled (bool): Whether timings are recorded.
+        overlay_visible (bool): Whether `draw_overlay` renders anything.
+        frames (collections.deque): The most recent frames, each a dictionary mapping a
+            phase name (and "total") to its duration in seconds.
+        profile_stats (pstats.Stats or None): Results of the last finished cProfile capture.
+    """
+
+    PHASES = ("events", "handle_event", "process_events", "update", "draw", "present")
+    OVERLAY_REFRESH_FRAMES = 30  # Statistics shown in the overlay are refreshed this often
+
+    def __init__(self, history=600, enabled=True):
+        """
+        Initializes the profiler with an empty ring buffer.
+
+        Parameters:
+            history (int, optional): The number of frames kept in the ring buffer.
+            enabled (bool, optional): Whether to start recording immediately.
+        """
+        self.enabled = enabled
+        self.overlay_visible = False
+        self.frames = deque(maxlen=history)
+        self.profile_stats = None
+        self._frame_start = 0.0
+        self._last_mark = 0.0
+        self._current = {}
+        self._profiler = None
+        self._profile_frames_left = 0
+        self._profile_path = None
+        self._overlay_lines = []
+        self._overlay_age = self.OVERLAY_REFRESH_FRAMES
+
+    def begin_frame(self):
+        """Starts timing a new frame."""
+        if self.enabled:
+            self._frame_start = self._last_mark = time.perf_counter()
+            self._current = {}
+
+    def mark(self, phase):
+        """Records the time elapsed since the previous mark as the duration of `phase`."""
+        if self.enabled:
+            now = time.perf_counter()
+            self._current[phase] = self._current.get(phase, 0.0) + now - self._last_mark
+            self._last_mark = now
+
+    def end_frame(self):
+        """Finishes the current frame, storing it in the ring buffer."""
+        if self.enabled:
+            self._current["total"] = time.perf_counter() - self._frame_start
+            self.frames.append(self._current)
+            self._current = {}
+        if self._profiler is not None:
+            self._profile_frames_left -= 1
+            if self._profile_frames_left <= 0:
+                self._finish_capture()
+
+    def capture_profile(self, frames, path=None):
+        """
+        Runs cProfile over the next `frames` frames. When the capture finishes the
+        results are kept in `profile_stats` and, if a path is given, dumped to it in
+        the standard pstats format.
+
+        Parameters:
+            frames (int): The number of frames to profile.
+            path (str, optional): Where to write the profile data.
+        """
+        if self._profiler is not None:
+            return
+        self._profiler = cProfile.Profile()
+        self._profile_frames_left = frames
+        self._profile_path = path
+        self._profiler.enable()
+
+    def _finish_capture(self):
+        self._profiler.disable()
+        self.profile_stats = pstats.Stats(self._profiler)
+        if self._profile_path:
+            self.profile_stats.dump_stats(self._profile_path)
+        self._profiler = None
+
+    def stats(self):
+        """
+        Computes frame-time statistics over the ring buffer.
+
+        Returns:
+            dict: Maps each phase (and "total") to a dictionary with its "mean", "p50",
+            "p95", "p99" and "max" duration in milliseconds.
+        """
+        result = {}
+        for phase in self.PHASES + ("total",):
+            samples = sorted(frame.get(phase, 0.0) * 1000 for frame in self.frames)
+            if not samples:
+                continue
+            result[phase] = {
+                "mean": sum(samples) / len(samples),
+                "p50": self._percentile(samples, 50),
+                "p95": self._percentile(samples, 95),
+                "p99": self._percentile(samples, 99),
+                "max": samples[-1],
+            }
+        return result
+
+    @staticmethod
+    def _percentile(samples, percent):
+        """Nearest-rank percentile of an already sorted list."""
+        rank = max(0, min(len(samples) - 1, -(-len(samples) * percent // 100) - 1))
+        return samples[rank]
+
+    def export_json(self, path):
+        """Writes the statistics and the raw per-frame timings (in milliseconds) to a JSON file."""
+        data = {
+            "stats": self.stats(),
+            "frames": [{phase: duration * 1000 for phase, duration in frame.items()} for frame in self.frames],
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+    def export_csv(self, path):
+        """Writes one row per recorded frame, with per-phase durations in milliseconds, to a CSV file."""
+        columns = self.PHASES + ("total",)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("frame",) + columns)
+            for index, frame in enumerate(self.frames):
+                writer.writerow([index] + [f"{frame.get(phase, 0.0) * 1000:.4f}" for phase in columns])
+
+    def toggle_overlay(self):
+        """Shows or hides the on-screen statistics overlay."""
+        self.overlay_visible = not self.overlay_visible
+        self._overlay_age = self.OVERLAY_REFRESH_FRAMES
+
+    def draw_overlay(self, screen, font):
+        """
+        Draws the p50/p95/p99 statistics in the top-left corner of the screen when the
+        overlay is visible. Text is re-rendered only every few frames.
+
+        Parameters:
+            screen (pygame.Surface): The surface to draw on.
+            font (pygame.font.Font): The font used for the statistics.
+        """
+        if not self.overlay_visible:
+            return
+        self._overlay_age += 1
+        if self._overlay_age >= self.OVERLAY_REFRESH_FRAMES:
+            self._overlay_age = 0
+            lines = [f"{'phase':<15}{'p50':>7}{'p95':>7}{'p99':>7}"]
+            for phase, values in self.stats().items():
+                lines.append(f"{phase:<15}{values['p50']:>7.2f}{values['p95']:>7.2f}{values['p99']:>7.2f}")
+            self._overlay_lines = [font.render(line, True, (255, 255, 0), (0, 0, 0)) for line in lines]
+        y = 4
+        for surface in self._overlay_lines:
+            screen.blit(surface, (4, y))
+            y += surface.get_height()
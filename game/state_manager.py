@@ -7,7 +7,8 @@ Key Functionalities:
 - `add_state(self, name, state)`: Registers a new state with the StateManager under a given name. This method allows for the dynamic addition of states, making the system flexible and extensible.
 - `change_state(self, name)`: Handles the transition from the current state to a new state identified by `name`. It ensures that exit procedures for the outgoing state are run (such as resource cleanup), and enter procedures for the incoming state are initiated (such as setting up the state's environment).
 - `update(self)`: Delegates the update logic to the currently active state, allowing each state to independently manage its internal logic, such as handling user inputs, updating game entities, and performing collision detection.
-- `draw(self, screen)`: Invokes the draw method of the current state, enabling each state to control how it is rendered on the screen. This method supports the separation of game logic from rendering logic, adhering to good software design practices.
+- `draw(self, screen, alpha)`: Invokes the draw method of the current state, passing the interpolation alpha between the last two simulation ticks, enabling each state to control how it is rendered on the screen. This method supports the separation of game logic from rendering logic, adhering to good software design practices.
+- `get_dirty_rects(self)`: Returns the screen regions the current state changed since the last frame, or None when the whole screen must be redrawn (e.g. right after a state change).
 - `handle_event(self, event)`: Forwards event handling to the currently active state, ensuring that only the active state responds to user inputs and other events. This centralized event management simplifies the handling of state-specific actions and interactions.
 
 The `StateManager` ensures a cohesive yet decoupled relationship between the game's overarching control flow and the individual states, allowing each state to focus on its specific responsibilities while the `StateManager` handles the transitions and delegation of control. This design promotes modularity, scalability, and maintainability within the game's architecture.
@@ -28,6 +29,7 @@ class StateManager:
         self.game = game
         self.states = {}
         self.current_state = None
+        self.state_changed = False  # Forces a full redraw after a transition
 
     def add_state(self, name, state):
         """
@@ -58,6 +60,7 @@ class StateManager:
             self.current_state.exit()
 
         self.current_state = self.states[name]
+        self.state_changed = True
         if self.current_state:
             self.current_state.enter()
 
@@ -71,7 +74,7 @@ class StateManager:
         if self.current_state:
             self.current_state.update()
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         """
         Draw the current state to the given screen.
         
@@ -80,9 +83,32 @@ class StateManager:
         
         Parameters:
             screen: The screen or surface to draw the current state on.
+            alpha (float, optional): How far the frame lies between the previous and the
+                latest simulation tick, for interpolating moving objects.
         """
         if self.current_state:
-            self.current_state.draw(screen)
+            self.current_state.draw(screen, alpha)
+
+    def get_dirty_rects(self):
+        """
+        Get the screen regions changed by the current state since the last frame.
+        
+        The first call after a state change always reports a full redraw, since the
+        whole screen belongs to the new state. States without dirty tracking also
+        report a full redraw.
+        
+        Returns:
+            list of pygame.Rect or None: The changed regions, an empty list if nothing
+            changed, or None if the whole screen must be redrawn.
+        """
+        if self.state_changed or not self.current_state:
+            self.state_changed = False
+            if self.current_state and hasattr(self.current_state, "get_dirty_rects"):
+                self.current_state.get_dirty_rects()  # Discard changes made before the transition
+            return None
+        if not hasattr(self.current_state, "get_dirty_rects"):
+            return None
+        return self.current_state.get_dirty_rects()
 
     def handle_event(self, event):
         """
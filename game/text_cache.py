@@ -0,0 +1,84 @@
+from collections import OrderedDict
+
+import pygame
+
+
+class TextCache:
+    """
+    The TextCache shares fonts and rendered text surfaces between game states so that
+    static text (menu options, labels) is rendered once instead of every frame.
+
+    Rendered surfaces are keyed by (font, text, colour, antialias, background) and the
+    least recently used entries are evicted once the cache is full. Fonts are loaded
+    once per (name, size) and kept for the lifetime of the cache, which also keeps
+    font identities stable for the surface keys.
+
+    Attributes:
+        max_entries (int): The maximum number of rendered surfaces kept.
+        fonts (dict): Loaded fonts, keyed by (name, size).
+        surfaces (OrderedDict): Rendered surfaces, in least to most recently used order.
+        hits (int): Number of renders served from the cache.
+        misses (int): Number of renders that had to call `Font.render`.
+    """
+
+    def __init__(self, max_entries=256):
+        """
+        Initializes an empty cache.
+
+        Parameters:
+            max_entries (int, optional): The maximum number of rendered surfaces kept.
+        """
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_font(self, name=None, size=36):
+        """
+        Returns a shared font, loading it on first use.
+
+        Parameters:
+            name (str, optional): The font file, or None for pygame's default font.
+            size (int, optional): The font size.
+
+        Returns:
+            pygame.font.Font: The font.
+        """
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.Font(name, size)
+        return font
+
+    def render(self, font, text, color, antialias=True, background=None):
+        """
+        Returns the rendered surface for a piece of text, rendering it only on a cache
+        miss. The returned surface is shared and must not be modified.
+
+        Parameters:
+            font (pygame.font.Font): The font to render with, ideally from `get_font`.
+            text (str): The text to render.
+            color (tuple): The text colour.
+            antialias (bool, optional): Whether to antialias the text.
+            background (tuple, optional): A background colour, or None for transparency.
+
+        Returns:
+            pygame.Surface: The rendered text.
+        """
+        key = (font, text, tuple(color), antialias, tuple(background) if background else None)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color, background)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """Drops every rendered surface; fonts are kept."""
+        self.surfaces.clear()
@@ -0,0 +1,179 @@
+"""
+Texture atlases.
+
+A `TextureAtlas` packs many small images into a few large page surfaces and hands
+out subsurfaces of those pages, so drawing many different sprites reads from a few
+contiguous blocks of memory instead of one scattered surface per sprite.
+
+Images are placed with a skyline bottom-left bin packer. The resulting layout is
+saved to a JSON file together with a signature of the packed image names and sizes,
+and reused as-is on later launches while the signature still matches.
+"""
+
+import hashlib
+import json
+import os
+
+import pygame
+
+
+def pack_rects(sizes, page_size, padding=1):
+    """
+    Packs rectangles into as few pages as possible with a skyline bottom-left packer.
+
+    Parameters:
+        sizes (dict): Maps a name to the (width, height) to place.
+        page_size (tuple): The (width, height) of a page.
+        padding (int, optional): Empty pixels kept to the right of and below each
+            rectangle, so filtering never bleeds between neighbours.
+
+    Returns:
+        dict: Maps each name to its placement as (page index, x, y).
+
+    Raises:
+        ValueError: If a rectangle does not fit in an empty page.
+    """
+    page_width, page_height = page_size
+    skylines = []  # One list of [x, y, width] segments per page
+    placements = {}
+    # Placing tall images first gives much flatter skylines.
+    for name in sorted(sizes, key=lambda n: (-sizes[n][1], -sizes[n][0], n)):
+        width, height = sizes[name][0] + padding, sizes[name][1] + padding
+        if width > page_width or height > page_height:
+            raise ValueError(f"{name} ({sizes[name][0]}x{sizes[name][1]}) does not fit in a {page_width}x{page_height} page")
+        for page, skyline in enumerate(skylines):
+            spot = _find_spot(skyline, width, height, page_width, page_height)
+            if spot:
+                break
+        else:
+            page = len(skylines)
+            skyline = [[0, 0, page_width]]
+            skylines.append(skyline)
+            spot = _find_spot(skyline, width, height, page_width, page_height)
+        index, x, y = spot
+        _place(skyline, index, x, y + height, width)
+        placements[name] = (page, x, y)
+    return placements
+
+
+def _find_spot(skyline, width, height, page_width, page_height):
+    """Returns the (segment index, x, y) with the lowest resulting top edge, or None."""
+    best = None
+    for index, (x, _, _) in enumerate(skyline):
+        if x + width > page_width:
+            break
+        # The rectangle rests on the highest segment it spans.
+        y, remaining, i = 0, width, index
+        while remaining > 0:
+            y = max(y, skyline[i][1])
+            remaining -= skyline[i][2]
+            i += 1
+        if y + height <= page_height and (best is None or (y + height, x) < (best[2] + height, best[1])):
+            best = (index, x, y)
+    return best
+
+
+def _place(skyline, index, x, top, width):
+    """Raises the skyline to `top` over [x, x + width) and merges equal neighbours."""
+    skyline.insert(index, [x, top, width])
+    right = x + width
+    i = index + 1
+    while i < len(skyline) and skyline[i][0] < right:
+        segment = skyline[i]
+        overlap = right - segment[0]
+        if overlap >= segment[2]:
+            del skyline[i]
+        else:
+            segment[0] += overlap
+            segment[2] -= overlap
+            break
+    i = 0
+    while i < len(skyline) - 1:
+        if skyline[i][1] == skyline[i + 1][1]:
+            skyline[i][2] += skyline[i + 1][2]
+            del skyline[i + 1]
+        else:
+            i += 1
+
+
+class TextureAtlas:
+    """
+    A set of atlas pages and the regions of the images packed into them.
+
+    Attributes:
+        page_size (tuple): The (width, height) of every page.
+        pages (list of pygame.Surface): The page surfaces.
+        regions (dict): Maps an image name to its (page index, pygame.Rect).
+    """
+
+    def __init__(self, page_size=(1024, 1024)):
+        """
+        Initializes an empty atlas.
+
+        Parameters:
+            page_size (tuple, optional): The (width, height) of a page.
+        """
+        self.page_size = tuple(page_size)
+        self.pages = []
+        self.regions = {}
+
+    @staticmethod
+    def signature(sizes, page_size):
+        """Returns a digest identifying a set of image sizes packed into a page size."""
+        text = json.dumps([sorted((name, list(size)) for name, size in sizes.items()), list(page_size)])
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def build(self, images, layout_path=None):
+        """
+        Packs images into pages, reusing the layout saved at `layout_path` if it was
+        computed for the same images and sizes, and saving a new one otherwise.
+
+        Parameters:
+            images (dict): Maps a name to the pygame.Surface to pack.
+            layout_path (str, optional): Where the packing layout is persisted.
+        """
+        sizes = {name: image.get_size() for name, image in images.items()}
+        signature = self.signature(sizes, self.page_size)
+        placements = self._read_layout(layout_path, signature)
+        if placements is None:
+            placements = pack_rects(sizes, self.page_size)
+            self._write_layout(layout_path, signature, placements)
+
+        page_count = max((page for page, _, _ in placements.values()), default=-1) + 1
+        self.pages = [pygame.Surface(self.page_size, pygame.SRCALPHA) for _ in range(page_count)]
+        if pygame.display.get_surface() is not None:
+            self.pages = [page.convert_alpha() for page in self.pages]
+        self.regions = {}
+        for name, (page, x, y) in placements.items():
+            self.pages[page].blit(images[name], (x, y))
+            self.regions[name] = (page, pygame.Rect((x, y), sizes[name]))
+
+    def _read_layout(self, layout_path, signature):
+        if not layout_path or not os.path.exists(layout_path):
+            return None
+        try:
+            with open(layout_path, "r") as f:
+                layout = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if layout.get("signature") != signature:
+            return None
+        return {name: tuple(placement) for name, placement in layout["placements"].items()}
+
+    def _write_layout(self, layout_path, signature, placements):
+        if not layout_path:
+            return
+        with open(layout_path, "w") as f:
+            json.dump({"signature": signature, "page_size": list(self.page_size),
+                       "placements": placements}, f, indent=2, sort_keys=True)
+
+    def get_image(self, name):
+        """
+        Returns the region of a packed image as a subsurface of its page, or None if
+        the image is not in the atlas.
+        """
+        region = self.regions.get(name)
+        if region is None:
+            return None
+        page, rect = region
+        return self.pages[page].subsurface(rect)
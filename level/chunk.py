@@ -0,0 +1,316 @@
+"""
+Level chunks.
+
+Large levels are split into square chunks of CHUNK_SIZE x CHUNK_SIZE cells. Each
+chunk stores its cells as a bytearray of tile IDs (see `level.tile`), one byte per
+cell, and the chunks near the player are resident: they are drawn from their own
+baked surface and entities on them are updated.
+
+A `ChunkStore` holds the cells of every chunk, resident or not, and does the slow
+part of streaming on a background thread: reading chunks when they come into range,
+and writing edited chunks back (to disk, if the store has a directory) when they go
+out of range.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+from .tile import EMPTY, TILE_SIZE, TILE_TYPES
+
+CHUNK_SIZE = 16  # Width and height of a chunk, in cells
+BACKGROUND_COLOR = (0, 0, 0)  # Colour baked into cells that have no tile
+
+
+def chunk_key(col, row, size=CHUNK_SIZE):
+    """Returns the (chunk col, chunk row) key of the chunk containing a grid cell."""
+    return col // size, row // size
+
+
+def split_layout(layout, table, size=CHUNK_SIZE):
+    """
+    Splits a layout (a list of strings, one character per cell) into chunks.
+
+    Parameters:
+        layout (list of str): The layout rows.
+        table (bytes): A `bytes.translate` table from layout characters to tile IDs.
+        size (int, optional): The chunk width and height, in cells.
+
+    Returns:
+        dict: Maps a chunk key to the chunk's size * size tile IDs, row by row.
+    """
+    chunks = {}
+    for row, line in enumerate(layout):
+        chunk_row, local_row = divmod(row, size)
+        ids = line.encode("ascii", "replace").translate(table)
+        for start in range(0, len(ids), size):
+            cells = chunks.get((start // size, chunk_row))
+            if cells is None:
+                cells = chunks[(start // size, chunk_row)] = bytearray(size * size)
+            segment = ids[start:start + size]
+            cells[local_row * size:local_row * size + len(segment)] = segment
+    return {key: bytes(cells) for key, cells in chunks.items()}
+
+
+class Chunk:
+    """
+    A resident chunk: its tile IDs and its baked surface.
+
+    Attributes:
+        key (tuple): The (chunk col, chunk row) of the chunk.
+        size (int): The chunk's width and height, in cells.
+        cells (bytearray or memoryview): The tile ID of every cell, row by row. A
+            writable buffer given to the constructor, such as a chunk of a
+            memory-mapped level file, is used in place.
+        modified (bool): Whether a cell was edited since the chunk was loaded, in which
+            case it is written back to the store when it is unloaded.
+        surface (pygame.Surface or None): The baked tiles, or None until the next draw.
+        origin (tuple): The level pixel position of the surface's top-left corner.
+        dirty_cells (set): Edited cells to re-render into the surface on the next draw.
+    """
+
+    def __init__(self, key, size, cells=None):
+        self.key = key
+        self.size = size
+        if cells is None:
+            cells = bytearray(size * size)
+        elif not isinstance(cells, (bytearray, memoryview)):
+            cells = bytearray(cells)
+        self.cells = cells
+        self.modified = False
+        self.surface = None
+        self.origin = (0, 0)
+        self.dirty_cells = set()
+
+    @property
+    def rect(self):
+        """The area of the level covered by the chunk, in pixels."""
+        span = self.size * TILE_SIZE
+        return pygame.Rect(self.key[0] * span, self.key[1] * span, span, span)
+
+    def get_id(self, col, row):
+        """Returns the tile ID of a level cell inside the chunk."""
+        size = self.size
+        return self.cells[(row - self.key[1] * size) * size + col - self.key[0] * size]
+
+    def set_id(self, col, row, tile_id):
+        """Sets the tile ID of a level cell inside the chunk."""
+        size = self.size
+        self.cells[(row - self.key[1] * size) * size + col - self.key[0] * size] = tile_id
+
+    def occupied(self):
+        """Yields (col, row, tile ID) for every non-empty cell, in level cell coordinates."""
+        size, cells = self.size, self.cells
+        base_col, base_row = self.key[0] * size, self.key[1] * size
+        for local_row in range(size):
+            start = local_row * size
+            if not any(cells[start:start + size]):
+                continue
+            for local_col in range(size):
+                tile_id = cells[start + local_col]
+                if tile_id != EMPTY:
+                    yield base_col + local_col, base_row + local_row, tile_id
+
+    def occupied_bounds(self):
+        """Returns the level pixel rect around the non-empty cells, or None if there are none."""
+        size, cells = self.size, self.cells
+        left, top, right, bottom = size, None, 0, 0
+        for local_row in range(size):
+            segment = bytes(cells[local_row * size:(local_row + 1) * size])
+            width = len(segment.rstrip(b"\0"))
+            if not width:
+                continue
+            if top is None:
+                top = local_row
+            bottom = local_row + 1
+            left = min(left, size - len(segment.lstrip(b"\0")))
+            right = max(right, width)
+        if top is None:
+            return None
+        x, y = self.key[0] * size + left, self.key[1] * size + top
+        return pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, (right - left) * TILE_SIZE, (bottom - top) * TILE_SIZE)
+
+    def bake(self):
+        """Render every tile of the chunk once into an off-screen surface."""
+        self.dirty_cells.clear()
+        bounds = self.occupied_bounds()
+        if bounds is None:
+            self.surface = None
+            return
+        surface = pygame.Surface(bounds.size)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()  # Match the display format for fast blits
+        surface.fill(BACKGROUND_COLOR)
+        offset = (-bounds.x, -bounds.y)
+        for col, row, tile_id in self.occupied():
+            TILE_TYPES[tile_id].draw_cell(surface, col, row, offset)
+        self.surface = surface
+        self.origin = bounds.topleft
+
+    def redraw_dirty_cells(self):
+        """Re-render only the edited cells into the baked surface."""
+        ox, oy = self.origin
+        bounds = self.surface.get_rect(topleft=self.origin)
+        for col, row in self.dirty_cells:
+            cell_rect = pygame.Rect(col * TILE_SIZE, row * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+            if not bounds.contains(cell_rect):
+                # The edit grew the chunk past the baked area; render it all again.
+                self.bake()
+                return
+            local_rect = cell_rect.move(-ox, -oy)
+            self.surface.fill(BACKGROUND_COLOR, local_rect)
+            tile_id = self.get_id(col, row)
+            if tile_id != EMPTY:
+                self.surface.set_clip(local_rect)
+                TILE_TYPES[tile_id].draw_cell(self.surface, col, row, (-ox, -oy))
+                self.surface.set_clip(None)
+        self.dirty_cells.clear()
+
+    def needs_redraw(self):
+        """Returns True if the next draw re-renders part of the baked surface."""
+        return (self.surface is None and any(self.cells)) or bool(self.dirty_cells)
+
+    def draw(self, screen, offset=(0, 0), view=None):
+        """
+        Draw the chunk's tiles, baking or patching its surface first if needed.
+
+        Parameters:
+            screen (pygame.Surface): The surface to draw on.
+            offset (tuple, optional): Added to level positions to get screen positions.
+            view (pygame.Rect, optional): The visible area of the level; only the part
+                of the surface inside it is blitted.
+        """
+        if self.surface is None:
+            self.bake()
+        elif self.dirty_cells:
+            self.redraw_dirty_cells()
+        if self.surface is None:
+            return
+        if view is None:
+            screen.blit(self.surface, (self.origin[0] + offset[0], self.origin[1] + offset[1]))
+            return
+        visible = view.clip(self.surface.get_rect(topleft=self.origin))
+        if visible:
+            area = visible.move(-self.origin[0], -self.origin[1])
+            screen.blit(self.surface, (visible.x + offset[0], visible.y + offset[1]), area)
+
+
+class ChunkStore:
+    """
+    The cells of every chunk of a level, resident or not, and the background worker
+    that reads and writes them.
+
+    All work runs on a single worker thread in submission order, so a chunk that is
+    requested again right after being unloaded is always rebuilt from its saved cells.
+
+    Attributes:
+        size (int): The chunk width and height, in cells.
+        data (dict): Maps a chunk key to its cells (bytes), for chunks held in memory.
+        directory (str or None): When set, chunks written back are stored as files in
+            this directory and dropped from memory.
+        keys (set): The keys of the chunks held in `data` or written to the directory.
+        source (LevelFile or None): The memory-mapped level file providing every chunk
+            not in `keys`.
+    """
+
+    def __init__(self, size=CHUNK_SIZE, directory=None):
+        self.size = size
+        self.data = {}
+        self.directory = directory
+        self.keys = set()
+        self.source = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chunk-store")
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def reset(self, chunks, source=None, size=None):
+        """
+        Replaces the stored chunks, given as a dict of chunk key -> cells and/or a
+        level file whose chunks are read straight from its mapping. Work already
+        queued for the previous chunks is finished first, so a late save cannot
+        write an old chunk into the new ones, and the previous level file is closed.
+
+        Parameters:
+            chunks (dict): Maps a chunk key to its cells.
+            source (LevelFile, optional): Provides every chunk not in `chunks`.
+            size (int, optional): The new chunk width and height, in cells.
+        """
+        self.flush()
+        with self._lock:
+            previous = self.source
+            self.data = dict(chunks)
+            self.keys = set(chunks)
+            self.source = source
+            if size is not None:
+                self.size = size
+        if previous is not None and previous is not source:
+            previous.close()
+
+    def has(self, key):
+        """Returns True if the level has a chunk with the given key."""
+        return key in self.keys or (self.source is not None and self.source.has_chunk(key))
+
+    def all_keys(self):
+        """Returns the keys of every chunk of the level."""
+        keys = set(self.keys)
+        if self.source is not None:
+            keys.update(self.source.chunk_keys())
+        return keys
+
+    def flush(self):
+        """Waits until every load and save queued so far has run."""
+        self._executor.submit(lambda: None).result()
+
+    def chunk_path(self, key):
+        return os.path.join(self.directory, f"chunk_{key[0]}_{key[1]}.bin")
+
+    def get(self, key):
+        """Returns the cells of a chunk, or None if the level has no such chunk."""
+        with self._lock:
+            data = self.data.get(key)
+            if data is not None:
+                return data
+            if key not in self.keys:
+                if self.source is not None and self.source.has_chunk(key):
+                    return self.source.chunk(key)
+                return None
+        with open(self.chunk_path(key), "rb") as f:
+            return f.read()
+
+    def put(self, key, data):
+        """Stores the cells of a chunk, on disk if the store has a directory."""
+        if self.directory:
+            with open(self.chunk_path(key), "wb") as f:
+                f.write(data)
+            with self._lock:
+                self.data.pop(key, None)
+                self.keys.add(key)
+        else:
+            with self._lock:
+                self.data[key] = data
+                self.keys.add(key)
+
+    def load(self, key):
+        """
+        Reads a chunk on the worker thread.
+
+        Returns:
+            concurrent.futures.Future: Resolves to a new `Chunk`, or None if the level
+            has no such chunk.
+        """
+        return self._executor.submit(self._load, key)
+
+    def _load(self, key):
+        data = self.get(key)
+        return None if data is None else Chunk(key, self.size, data)
+
+    def save(self, key, data):
+        """
+        Writes a chunk's cells back on the worker thread.
+
+        Returns:
+            concurrent.futures.Future: Resolves once the cells are stored.
+        """
+        return self._executor.submit(self.put, key, bytes(data))
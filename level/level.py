@@ -1,32 +1,294 @@
-from .tile import WallTile, FloorTile
+import pygame
+from .chunk import CHUNK_SIZE, Chunk, ChunkStore, chunk_key, split_layout
+from .level_file import LevelFile
+from .tile import EMPTY, TILE_SIZE, TILE_TYPES, char_table, get_tile_type, tile_type_for_char
 
 class Level:
-    """Manages the game level including tiles and entities."""
-    def __init__(self, game):
+    """
+    Manages the game level including tiles and entities.
+
+    Cells are stored as one-byte tile IDs whose shared properties (colour, solidity,
+    sprite) live in the tile type registry of `level.tile`; `get_tile` returns a
+    `Tile` view of a cell for callers that want an object.
+
+    The level is divided into chunks (see `level.chunk`). By default every chunk is
+    resident. With a `stream_radius`, only the chunks within that many chunks of the
+    point passed to `stream_around` (usually the player) are resident; the rest are
+    read and written back on a background thread as the player moves, so memory and
+    per-frame cost do not grow with the size of the map.
+
+    Levels are loaded from a layout (a list of strings) with `load`, or from a binary
+    level file with `load_file`, whose memory-mapped tile layer is used directly as
+    the chunks' cells.
+    """
+    def __init__(self, game, chunk_size=CHUNK_SIZE, stream_radius=None, chunk_directory=None):
         self.game = game
-        self.tiles = []
         self.entities = []  # Placeholder for level entities like enemies and items
+        self.listeners = []  # Notified when the tile layout is loaded or edited
+        self.revision = 0  # Bumped on every layout change so caches can detect staleness
+        self.chunk_size = chunk_size
+        self.stream_radius = stream_radius
+        self.store = ChunkStore(chunk_size, chunk_directory)
+        self.chunks = {}  # Resident chunks by chunk key
+        self.pending = {}  # Chunk key -> Future of a chunk being read in the background
+        self.generation = 0  # Bumped by load so reads for an older layout are dropped
+        self.drawn_revision = None  # Layout revision of the last draw
+        self.bounds = pygame.Rect(0, 0, 0, 0)  # Extent of the whole layout, in pixels
+        self.spawns = []  # (kind, col, row) spawn points of a level file
+
+    @property
+    def tiles(self):
+        """Tile views of every non-empty resident cell. Builds an object per cell; prefer the grid queries."""
+        return [TILE_TYPES[tile_id].make_tile(col, row)
+                for chunk in self.chunks.values() for col, row, tile_id in chunk.occupied()]
 
     def load(self, layout):
-        """Load level from a given layout."""
-        self.tiles = []  # Reset/clear tiles when loading a new level
-        for y, row in enumerate(layout):
-            for x, col in enumerate(row):
-                if col == "W":
-                    self.tiles.append(WallTile(x * 50, y * 50))
-                elif col == "F":
-                    self.tiles.append(FloorTile(x * 50, y * 50))
-                # Add more elif clauses for other tile types
+        """
+        Load level from a given layout. Without streaming every chunk is made resident
+        immediately; otherwise chunks are loaded by `stream_around`.
+        """
+        width = max((len(line) for line in layout), default=0)
+        self.reset(split_layout(layout, char_table(), self.chunk_size), None, width, len(layout), [])
+
+    def load_file(self, path):
+        """
+        Load a binary level file (see `level.level_file`). The file is memory-mapped
+        and its tile layer used as the chunks' cells as-is, so loading does not
+        depend on the size of the level; its spawn table is kept in `spawns`.
+        """
+        level_file = LevelFile(path)
+        self.reset({}, level_file, level_file.width, level_file.height, list(level_file.spawns),
+                   level_file.chunk_size)
+
+    def reset(self, chunks, source, width, height, spawns, chunk_size=None):
+        """
+        Replace the level's contents with new chunks (see `ChunkStore.reset`) and notify
+        listeners. The chunk size changes only once work queued for the old chunks is done.
+        """
+        self.generation += 1
+        self.pending = {}
+        self.chunks = {}
+        self.store.reset(chunks, source, chunk_size)
+        self.chunk_size = self.store.size
+        self.bounds = pygame.Rect(0, 0, width * TILE_SIZE, height * TILE_SIZE)
+        self.spawns = spawns
+        if self.stream_radius is None:
+            for key in self.store.all_keys():
+                self.add_chunk(Chunk(key, self.chunk_size, self.store.get(key)), notify=False)
+        self.revision += 1
+        for listener in list(self.listeners):
+            listener.on_level_loaded(self)
+
+    def create_tile(self, char, col, row):
+        """Create a tile view for a layout character at the given grid cell, or None."""
+        tile_type = tile_type_for_char(char)
+        return tile_type.make_tile(col, row) if tile_type else None
+
+    def add_chunk(self, chunk, notify=True):
+        """Make a chunk resident."""
+        self.chunks[chunk.key] = chunk
+        if notify:
+            self.revision += 1
+            for listener in list(self.listeners):
+                listener.on_chunk_loaded(self, chunk)
+
+    def remove_chunk(self, key):
+        """Unload a resident chunk, writing it back in the background if it was edited."""
+        chunk = self.chunks.pop(key)
+        self.revision += 1
+        for listener in list(self.listeners):
+            listener.on_chunk_unloaded(self, chunk)
+        if chunk.modified:
+            self.store.save(key, chunk.cells)
+
+    def load_chunk(self, key):
+        """
+        Make a chunk resident right away, waiting for the background worker. Returns
+        the chunk, or None if the level has no such chunk.
+        """
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            self.pending.pop(key, None)
+            chunk = self.store.load(key).result()
+            if chunk is not None:
+                self.add_chunk(chunk)
+        return chunk
+
+    def stream_around(self, position, wait=False):
+        """
+        Keep the chunks near a point resident: chunks within `stream_radius` are
+        requested, chunks further than one chunk beyond it are unloaded, and chunks
+        read in the background are made resident. The chunk containing the point
+        itself is loaded immediately. Does nothing without a stream radius.
+
+        Parameters:
+            position (tuple): The (x, y) level pixel position to stream around.
+            wait (bool, optional): Wait for every requested chunk instead of adding
+                them as they finish.
+        """
+        if self.stream_radius is None:
+            return
+        span = self.chunk_size * TILE_SIZE
+        center_col, center_row = int(position[0]) // span, int(position[1]) // span
+        radius = self.stream_radius
+
+        for key in [key for key in self.chunks
+                    if max(abs(key[0] - center_col), abs(key[1] - center_row)) > radius + 1]:
+            self.remove_chunk(key)
+
+        for row in range(center_row - radius, center_row + radius + 1):
+            for col in range(center_col - radius, center_col + radius + 1):
+                key = (col, row)
+                if key not in self.chunks and key not in self.pending and self.store.has(key):
+                    self.pending[key] = self.store.load(key)
+
+        if self.store.has((center_col, center_row)):
+            self.load_chunk((center_col, center_row))
+
+        generation = self.generation
+        for key, future in list(self.pending.items()):
+            if not (wait or future.done()):
+                continue
+            chunk = future.result()
+            del self.pending[key]
+            in_range = max(abs(key[0] - center_col), abs(key[1] - center_row)) <= radius + 1
+            if chunk is not None and generation == self.generation and in_range and key not in self.chunks:
+                self.add_chunk(chunk)
+
+    def is_loaded_at(self, position):
+        """Return True if the chunk containing a level pixel position is resident."""
+        span = self.chunk_size * TILE_SIZE
+        return (int(position[0]) // span, int(position[1]) // span) in self.chunks
+
+    def resident_cell_bounds(self):
+        """
+        Return (min col, min row, max col, max row) of the resident cells within the
+        layout's bounds, or None if nothing is resident.
+        """
+        if not self.chunks:
+            return None
+        size = self.chunk_size
+        cols = [key[0] for key in self.chunks]
+        rows = [key[1] for key in self.chunks]
+        min_col, min_row = min(cols) * size, min(rows) * size
+        max_col, max_row = (max(cols) + 1) * size - 1, (max(rows) + 1) * size - 1
+        if self.bounds:
+            min_col = max(min_col, self.bounds.left // TILE_SIZE)
+            min_row = max(min_row, self.bounds.top // TILE_SIZE)
+            max_col = min(max_col, (self.bounds.right - 1) // TILE_SIZE)
+            max_row = min(max_row, (self.bounds.bottom - 1) // TILE_SIZE)
+        return min_col, min_row, max_col, max_row
+
+    def get_tile_id(self, col, row):
+        """Return the tile ID of a grid cell; cells on unloaded chunks are EMPTY."""
+        size = self.chunk_size
+        chunk = self.chunks.get((col // size, row // size))
+        if chunk is None:
+            return EMPTY
+        return chunk.cells[(row % size) * size + col % size]
+
+    def get_tile_type(self, col, row):
+        """Return the tile type of a grid cell, or None if it is empty."""
+        return TILE_TYPES[self.get_tile_id(col, row)]
+
+    def get_tile(self, col, row):
+        """Return a tile view of the given grid cell, or None."""
+        tile_id = self.get_tile_id(col, row)
+        return TILE_TYPES[tile_id].make_tile(col, row) if tile_id != EMPTY else None
+
+    def set_tile(self, col, row, tile):
+        """
+        Replace the tile at a grid cell (pass None to clear it), given as a `Tile`
+        of a registered type, and notify listeners.
+        """
+        self.set_tile_id(col, row, EMPTY if tile is None else get_tile_type(tile.tile_type).tile_id)
+
+    def set_tile_id(self, col, row, tile_id):
+        """
+        Set the tile ID of a grid cell and notify listeners, which receive tile
+        views of the old and new contents. The cell's chunk is loaded first if it is
+        not resident.
+        """
+        key = chunk_key(col, row, self.chunk_size)
+        chunk = self.load_chunk(key)
+        if chunk is None:
+            chunk = Chunk(key, self.chunk_size)
+            self.add_chunk(chunk)
+        old_tile = self.get_tile(col, row)
+        chunk.set_id(col, row, tile_id)
+        new_tile = self.get_tile(col, row)
+        chunk.modified = True
+        chunk.dirty_cells.add((col, row))
+        if new_tile is not None:
+            self.bounds.union_ip(new_tile.rect)
+        self.revision += 1
+        for listener in list(self.listeners):
+            listener.on_tile_changed(self, col, row, old_tile, new_tile)
+
+    def register_listener(self, listener):
+        """
+        Register a listener for layout changes. Listeners implement
+        on_level_loaded(level), on_tile_changed(level, col, row, old_tile, new_tile),
+        on_chunk_loaded(level, chunk) and on_chunk_unloaded(level, chunk).
+        """
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def unregister_listener(self, listener):
+        """Stop notifying a previously registered listener."""
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def invalidate(self):
+        """Discard the baked chunk surfaces so the next draw re-renders every tile."""
+        for chunk in self.chunks.values():
+            chunk.surface = None
+            chunk.dirty_cells.clear()
+
+    def visible_chunks(self, view=None):
+        """Return the resident chunks overlapping a level pixel area (all of them without one)."""
+        if view is None:
+            return list(self.chunks.values())
+        span = self.chunk_size * TILE_SIZE
+        chunks = []
+        for row in range(view.top // span, (view.bottom - 1) // span + 1):
+            for col in range(view.left // span, (view.right - 1) // span + 1):
+                chunk = self.chunks.get((col, row))
+                if chunk is not None:
+                    chunks.append(chunk)
+        return chunks
+
+    def needs_redraw(self, view=None):
+        """
+        Return True if the next draw changes the level's pixels: a visible chunk is
+        baked or patched, or chunks were loaded, unloaded or edited since the last draw.
+        """
+        return (self.drawn_revision != self.revision
+                or any(chunk.needs_redraw() for chunk in self.visible_chunks(view)))
 
     def update(self):
-        """Update the level state."""
+        """Update the level state. Only entities on resident chunks are updated."""
         # Here you might update entities within the level
         for entity in self.entities:
-            entity.update()
+            if self.is_loaded_at(entity.rect.center):
+                entity.update()
+
+    def draw(self, screen, offset=(0, 0), view=None):
+        """
+        Draw the resident chunks and the entities on them. With a view, chunks and
+        entities outside it are skipped, and chunks are only baked once they come
+        into view.
 
-    def draw(self, screen):
-        """Draw the level and its entities."""
-        for tile in self.tiles:
-            tile.draw(screen)
+        Parameters:
+            screen (pygame.Surface): The surface to draw on.
+            offset (tuple, optional): Added to level positions to get screen positions.
+            view (pygame.Rect, optional): The visible area of the level.
+        """
+        for chunk in self.visible_chunks(view):
+            chunk.draw(screen, offset, view)
+        self.drawn_revision = self.revision
         for entity in self.entities:
-            entity.draw(screen)
+            if view is not None and not view.colliderect(entity.rect):
+                continue
+            if self.is_loaded_at(entity.rect.center):
+                entity.draw(screen, offset=offset)
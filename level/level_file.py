@@ -0,0 +1,221 @@
+"""
+Binary level files.
+
+A level file holds a level's tile-ID layers and its entity spawn table in a form
+that can be memory-mapped and used as-is: every layer is stored chunk by chunk (see
+`level.chunk`), so the cells of a chunk are one contiguous run of bytes that a
+`Level` uses directly as the chunk's grid, without parsing or copying.
+
+File layout (all integers little endian):
+    header: magic (b"LVL1"), version (uint16), chunk size (uint16), width and height
+        in cells (uint32 each), layer count, palette size (uint16 each), spawn
+        count (uint32)
+    palette: one (tile ID uint8, type name 15 bytes) entry per tile type used, so
+        files stay readable if tile IDs are registered differently later
+    layer table: one (name 16 bytes, data offset uint64) entry per layer
+    spawn table: one (kind 16 bytes, col int32, row int32) entry per spawn
+    layer data: chunks_x * chunks_y chunks of chunk_size * chunk_size tile IDs per
+        layer, chunks in row-major order, each layer starting at a 64-byte aligned offset
+
+Text layouts, one row per line with one character per cell, are converted with:
+    python -m level.level_file level1.txt level1.lvl
+
+In text layouts, SPAWN_CHARS mark spawn points; the cell under a spawn is floor.
+"""
+
+import mmap
+import os
+import struct
+import sys
+
+from .chunk import CHUNK_SIZE, split_layout
+from .tile import EMPTY, TILE_TYPES, char_table, get_tile_type
+
+MAGIC = b"LVL1"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIHHI")
+PALETTE_ENTRY = struct.Struct("<B15s")
+LAYER_ENTRY = struct.Struct("<16sQ")
+SPAWN_ENTRY = struct.Struct("<16sii")
+ALIGNMENT = 64
+SPAWN_CHARS = {"P": "player", "E": "enemy"}  # Spawn markers in text layouts
+SPAWN_FLOOR_CHAR = "F"  # The tile placed under a spawn marker
+
+
+def _name(raw):
+    return raw.rstrip(b"\0").decode("ascii")
+
+
+def _encode_name(name, size):
+    """Encodes a name for a fixed-size field; struct would silently truncate a longer one."""
+    encoded = name.encode("ascii")
+    if len(encoded) > size:
+        raise ValueError(f"name {name!r} is longer than {size} bytes")
+    return encoded
+
+
+def read_layout(path):
+    """
+    Reads a text layout, taking spawn markers out of it.
+
+    Returns:
+        tuple: The layout (list of str) and the spawns, a list of (kind, col, row).
+    """
+    with open(path, "r") as f:
+        lines = f.read().splitlines()
+    layout, spawns = [], []
+    for row, line in enumerate(lines):
+        for col, char in enumerate(line):
+            if char in SPAWN_CHARS:
+                spawns.append((SPAWN_CHARS[char], col, row))
+        for char in SPAWN_CHARS:
+            line = line.replace(char, SPAWN_FLOOR_CHAR)
+        layout.append(line)
+    return layout, spawns
+
+
+def write_level_file(path, layout, spawns=(), chunk_size=CHUNK_SIZE):
+    """
+    Converts a layout into a level file with a single "tiles" layer.
+
+    Parameters:
+        path (str): Where to write the file.
+        layout (list of str): The layout, one character per cell.
+        spawns (iterable, optional): (kind, col, row) spawn points.
+        chunk_size (int, optional): The chunk width and height, in cells.
+
+    Raises:
+        ValueError: If a tile type name is longer than 15 bytes, or a spawn kind or
+            layer name longer than 16 bytes.
+    """
+    width = max((len(line) for line in layout), default=0)
+    height = len(layout)
+    chunks_x, chunks_y = -(-width // chunk_size), -(-height // chunk_size)
+    chunks = split_layout(layout, char_table(), chunk_size)
+    empty = bytes(chunk_size * chunk_size)
+    layer = b"".join(chunks.get((col, row), empty) for row in range(chunks_y) for col in range(chunks_x))
+
+    palette = [tile_type for tile_type in TILE_TYPES if tile_type is not None]
+    layers = [("tiles", layer)]
+    palette_names = [_encode_name(tile_type.name, 15) for tile_type in palette]
+    spawns = [(_encode_name(kind, 16), col, row) for kind, col, row in spawns]
+    table_end = (HEADER.size + len(palette) * PALETTE_ENTRY.size + len(layers) * LAYER_ENTRY.size
+                 + len(spawns) * SPAWN_ENTRY.size)
+    offset = table_end + (-table_end % ALIGNMENT)
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, chunk_size, width, height, len(layers), len(palette), len(spawns)))
+        for tile_type, name in zip(palette, palette_names):
+            f.write(PALETTE_ENTRY.pack(tile_type.tile_id, name))
+        offsets = []
+        for name, data in layers:
+            offsets.append(offset)
+            f.write(LAYER_ENTRY.pack(_encode_name(name, 16), offset))
+            offset += len(data) + (-len(data) % ALIGNMENT)
+        for kind, col, row in spawns:
+            f.write(SPAWN_ENTRY.pack(kind, col, row))
+        for (name, data), data_offset in zip(layers, offsets):
+            f.write(bytes(data_offset - f.tell()))
+            f.write(data)
+
+
+def convert(layout_path, level_path, chunk_size=CHUNK_SIZE):
+    """Converts a text layout file into a level file."""
+    layout, spawns = read_layout(layout_path)
+    write_level_file(level_path, layout, spawns, chunk_size)
+
+
+class LevelFile:
+    """
+    A memory-mapped level file. The mapping is private (copy-on-write), so chunks
+    returned by `chunk` can be edited in place without modifying the file.
+
+    Attributes:
+        path (str): The level file.
+        chunk_size (int): The chunk width and height, in cells.
+        width, height (int): The level size, in cells.
+        chunks_x, chunks_y (int): The level size, in chunks.
+        layers (dict): Maps a layer name to its data offset.
+        spawns (list): The (kind, col, row) spawn points.
+    """
+
+    def __init__(self, path):
+        """
+        Opens and maps a level file.
+
+        Raises:
+            ValueError: If the file is not a level file of a supported version.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self.mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, self.chunk_size, self.width, self.height, layer_count, palette_size, spawn_count = \
+            HEADER.unpack_from(self.mapping)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} level file")
+        self.chunks_x = -(-self.width // self.chunk_size)
+        self.chunks_y = -(-self.height // self.chunk_size)
+
+        position = HEADER.size
+        # Tile IDs are used as stored when they still name the same types; otherwise
+        # chunks are translated to the current IDs as they are read.
+        remap = bytearray(range(256))
+        for _ in range(palette_size):
+            tile_id, name = PALETTE_ENTRY.unpack_from(self.mapping, position)
+            tile_type = get_tile_type(_name(name))
+            remap[tile_id] = tile_type.tile_id if tile_type else EMPTY
+            position += PALETTE_ENTRY.size
+        self.remap = None if remap == bytearray(range(256)) else bytes(remap)
+
+        self.layers = {}
+        for _ in range(layer_count):
+            name, offset = LAYER_ENTRY.unpack_from(self.mapping, position)
+            self.layers[_name(name)] = offset
+            position += LAYER_ENTRY.size
+        self.spawns = []
+        for _ in range(spawn_count):
+            kind, col, row = SPAWN_ENTRY.unpack_from(self.mapping, position)
+            self.spawns.append((_name(kind), col, row))
+            position += SPAWN_ENTRY.size
+        self.view = memoryview(self.mapping)
+
+    def close(self):
+        """
+        Releases the mapping. If chunks still use it as their cells, it is unmapped
+        once they are gone instead.
+        """
+        self.view.release()
+        try:
+            self.mapping.close()
+        except BufferError:
+            pass
+
+    def has_chunk(self, key):
+        """Returns True if a chunk key lies inside the level."""
+        return 0 <= key[0] < self.chunks_x and 0 <= key[1] < self.chunks_y
+
+    def chunk_keys(self):
+        """Yields every chunk key of the level."""
+        for row in range(self.chunks_y):
+            for col in range(self.chunks_x):
+                yield col, row
+
+    def chunk(self, key, layer="tiles"):
+        """
+        Returns the tile IDs of a chunk: a writable view of the mapping, or a
+        translated copy if the file's tile IDs differ from the registered ones.
+        """
+        size = self.chunk_size * self.chunk_size
+        start = self.layers[layer] + (key[1] * self.chunks_x + key[0]) * size
+        cells = self.view[start:start + size]
+        if self.remap is not None:
+            return bytearray(bytes(cells).translate(self.remap))
+        return cells
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python -m level.level_file <layout.txt> <output.lvl>")
+        sys.exit(2)
+    convert(sys.argv[1], sys.argv[2])
+    print(f"Wrote {sys.argv[2]} ({os.path.getsize(sys.argv[2])} bytes)")
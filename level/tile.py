@@ -1,20 +1,128 @@
 import pygame
 
+TILE_SIZE = 50  # Width and height of a grid cell, in pixels
+EMPTY = 0  # Tile ID of a cell without a tile
+
+class TileType:
+    """
+    The properties shared by every cell of one kind. Levels store only the small
+    integer ID of each cell's type; everything else lives here, once per type.
+
+    Attributes:
+        tile_id (int): The ID stored in the level grid, 1-255.
+        name (str): The type name used in collision queries, e.g. "Wall".
+        char (str): The character representing the type in layouts.
+        color (tuple): The colour the tile is drawn with when it has no sprite.
+        solid (bool): Whether entities are blocked by the tile.
+        sprite (pygame.Surface or None): Drawn instead of the colour, if set.
+        tile_class (type): The `Tile` subclass used for tile views of this type.
+    """
+
+    def __init__(self, tile_id, name, char, color, solid=False, sprite=None, tile_class=None):
+        self.tile_id = tile_id
+        self.name = name
+        self.char = char
+        self.color = color
+        self.solid = solid
+        self.sprite = sprite
+        self.tile_class = tile_class
+
+    def make_tile(self, col, row):
+        """Return a `Tile` view of a cell of this type."""
+        if self.tile_class is not None:
+            return self.tile_class(col * TILE_SIZE, row * TILE_SIZE)
+        return Tile(col * TILE_SIZE, row * TILE_SIZE, TILE_SIZE, TILE_SIZE, self.color, self.name)
+
+    def draw_cell(self, surface, col, row, offset=(0, 0)):
+        """Draw a cell of this type at a grid position."""
+        x, y = col * TILE_SIZE + offset[0], row * TILE_SIZE + offset[1]
+        if self.sprite is not None:
+            surface.blit(self.sprite, (x, y))
+        else:
+            surface.fill(self.color, (x, y, TILE_SIZE, TILE_SIZE))
+
+
+TILE_TYPES = [None] * 256  # Indexed by tile ID; ID 0 is the empty cell
+_types_by_name = {}
+_types_by_char = {}
+_matching_ids = {}  # Cache for tile_ids_matching, cleared when a type is registered
+
+
+def register_tile_type(name, char, color, solid=False, sprite=None, tile_class=None):
+    """
+    Add a tile type to the registry under the next free ID and return it.
+
+    Raises:
+        ValueError: If the name or layout character is taken, or all IDs are in use.
+    """
+    if name in _types_by_name or char in _types_by_char:
+        raise ValueError(f"tile type {name!r} / {char!r} is already registered")
+    if None not in TILE_TYPES[1:]:
+        raise ValueError("no tile IDs left")
+    tile_id = TILE_TYPES.index(None, 1)
+    tile_type = TileType(tile_id, name, char, color, solid, sprite, tile_class)
+    TILE_TYPES[tile_id] = tile_type
+    _types_by_name[name] = tile_type
+    _types_by_char[char] = tile_type
+    _matching_ids.clear()
+    return tile_type
+
+
+def get_tile_type(name):
+    """Return the registered tile type with a name, or None."""
+    return _types_by_name.get(name)
+
+
+def tile_type_for_char(char):
+    """Return the registered tile type for a layout character, or None."""
+    return _types_by_char.get(char)
+
+
+def tile_ids_matching(name=None):
+    """
+    Return the frozenset of tile IDs of the type with a name, or of every solid type when
+    no name is given. Empty if no such type is registered.
+    """
+    tile_ids = _matching_ids.get(name)
+    if tile_ids is None:
+        tile_ids = _matching_ids[name] = frozenset(
+            tile_type.tile_id for tile_type in TILE_TYPES
+            if tile_type is not None and (tile_type.name == name if name is not None else tile_type.solid))
+    return tile_ids
+
+
+def char_table():
+    """
+    Return a 256-byte `bytes.translate` table mapping ASCII layout characters to
+    tile IDs (unknown characters map to EMPTY).
+    """
+    table = bytearray(256)
+    for char, tile_type in _types_by_char.items():
+        if ord(char) < 256:
+            table[ord(char)] = tile_type.tile_id
+    return bytes(table)
+
+
 class Tile:
-    """Base class for all tiles."""
+    """
+    Base class for all tiles. Levels do not keep tile objects; `Level.get_tile`
+    returns a tile as a view of a grid cell for callers that want one.
+    """
     def __init__(self, x, y, width, height, color, tile_type):
         self.rect = pygame.Rect(x, y, width, height)
         self.color = color
         self.tile_type = tile_type  # New attribute to identify the tile type
 
-    def draw(self, screen):
-        pygame.draw.rect(screen, self.color, self.rect)
+    def draw(self, screen, offset=(0, 0)):
+        pygame.draw.rect(screen, self.color, self.rect.move(offset))
 
 class WallTile(Tile):
     def __init__(self, x, y):
-        super().__init__(x, y, 50, 50, (100, 100, 100), 'Wall')
+        super().__init__(x, y, TILE_SIZE, TILE_SIZE, WALL.color, 'Wall')
 
 class FloorTile(Tile):
     def __init__(self, x, y):
-        super().__init__(x, y, 50, 50, (200, 200, 200), 'Floor')
+        super().__init__(x, y, TILE_SIZE, TILE_SIZE, FLOOR.color, 'Floor')
 
+WALL = register_tile_type("Wall", "W", (100, 100, 100), solid=True, tile_class=WallTile)
+FLOOR = register_tile_type("Floor", "F", (200, 200, 200), tile_class=FloorTile)
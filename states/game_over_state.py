@@ -10,6 +10,10 @@ class GameOver(GameState):
         # Option to restart or exit
         pass
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         # Display game over message
         pass
+
+    def get_dirty_rects(self):
+        # Nothing is drawn yet, so the screen never changes after the first frame
+        return []
@@ -7,8 +7,9 @@ The class provides a set of methods that can be overridden by subclasses to impl
 - `enter(self)`: Called when transitioning into the state, used for setting up resources and initializing any state-specific elements or variables.
 - `exit(self)`: Called when exiting the state, for cleaning up resources and performing any necessary state-specific shutdown procedures.
 - `update(self)`: Used for updating the state's logic, such as processing game events, updating the positions of game entities, and handling transitions between states.
-- `draw(self, screen)`: Renders the state's elements to the screen. This method takes a screen (or surface) object as a parameter, onto which the state's visual components are drawn.
+- `draw(self, screen, alpha)`: Renders the state's elements to the screen. This method takes a screen (or surface) object as a parameter, onto which the state's visual components are drawn, and the interpolation alpha between the last two simulation ticks.
 - `handle_event(self, event)`: Processes events specific to the state, such as keyboard and mouse input. This method allows each state to respond differently to user actions.
+- `get_dirty_rects(self)`: Reports which screen regions changed since the last frame, for the optional dirty-rectangle renderer. The default reports a full-screen change.
 
 By deriving from `GameState`, different states of the game can be implemented with their unique behavior while maintaining a consistent interface for the game's main loop to interact with.
 """
@@ -58,7 +59,7 @@ class GameState:
         """
         pass
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         """
         Draw the state's visual elements to the screen.
         
@@ -66,8 +67,13 @@ class GameState:
         components. The method takes a screen (or surface) object as a parameter,
         onto which the state's visuals are drawn.
         
+        The game simulates at a fixed tick rate and may render more or fewer frames
+        than it simulates ticks, so moving objects should be drawn `alpha` of the way
+        from their position at the previous tick to their position at the latest one.
+        
         Parameters:
             screen: The Pygame screen (or surface) to draw the visuals on.
+            alpha (float, optional): The interpolation factor between 0 and 1.
         """
         pass
 
@@ -83,3 +89,17 @@ class GameState:
             event: The event to process, typically passed from the Pygame event queue.
         """
         pass
+
+    def get_dirty_rects(self):
+        """
+        Report the screen regions that changed since the previous frame.
+        
+        Used by the game's optional dirty-rectangle renderer, which only draws and
+        presents the reported regions. States that can track their changes should
+        override this method; the default reports the whole screen as changed.
+        
+        Returns:
+            list of pygame.Rect or None: The changed regions, an empty list if nothing
+            changed (the frame is skipped), or None to redraw the whole screen.
+        """
+        return None
@@ -1,7 +1,13 @@
+import os
+
 import pygame
-from game.ai_manager import ChasePlayerBehavior
+from game.ai_manager import FlowFieldBehavior
+from game.ai_scheduler import AIScheduler, LODAIScheduler, ParallelAIScheduler
+from game.camera import Camera
 from game.collision_manager import CollisionManager
 from level.level import Level
+from level.level_file import convert
+from level.tile import TILE_SIZE
 from entities.enemy import Enemy
 from entities.player import Player
 from states.game_state import GameState
@@ -12,10 +18,12 @@ The `Gameplay` class is a concrete implementation of `GameState` that manages th
 Key Components and Behaviors:
 - `__init__(self, game)`: Initializes the gameplay state with necessary game entities such as the player, enemies, and the level. It loads necessary assets and sets up the game environment based on the game's current state or level configuration.
 - `enter(self)`: Prepares the game state for entering the main gameplay, including setting up or resetting the level, player, and enemies. It could also involve loading or initializing game resources specific to the gameplay phase.
-- `update(self)`: The core game loop for the gameplay state, handling event processing, updating the state of the game world (including the player, enemies, and other entities), and managing collisions. It checks for user inputs, updates entity positions and states, and handles the interactions between various game elements.
-- `resolve_entity_collision(self, entity1, entity2)`: A method for resolving collisions between entities, such as the player and enemies. It includes basic logic to adjust the positions of the entities to reflect a collision response.
-- `draw(self, screen)`: Renders the game world to the screen, including the level, player, and enemies. It's responsible for drawing all visual elements of the gameplay state to provide visual feedback to the player.
-- `handle_event(self, events)`: Processes input events specific to the gameplay, such as player movement and actions. It includes handling global game controls, like pausing the game.
+- `update(self)`: The core game loop for the gameplay state, reading player input from the game's per-frame input snapshot, updating the state of the game world (including the player, enemies, and other entities), and managing collisions. The level is streamed around the player, and enemies on chunks that are not loaded are left alone. Enemy AI runs through the AI scheduler: in worker processes when the game is configured with AI workers, or less often for enemies far from the player and off screen, within a per-tick time budget, when AI level of detail is on. It checks for user inputs, updates entity positions and states, and handles the interactions between various game elements.
+- `resolve_entity_collision(self, entity1, entity2)`: A method for resolving collisions between entities, such as the player and enemies. It includes basic logic to adjust the positions of the entities to reflect a collision response, without pushing them into walls.
+- `separate_entities(self, entity1, entity2)`: Nudges overlapping enemies apart. Candidate pairs come from the collision manager's broadphase, so entity-vs-entity checks do not grow quadratically with the enemy count.
+- `draw(self, screen, alpha)`: Renders the game world to the screen through the camera, including the level, player, and enemies, with moving entities interpolated between the last two simulation ticks. Only what the camera sees is drawn: level chunks are picked from the tile grid and entities from the collision manager's spatial index. It's responsible for drawing all visual elements of the gameplay state to provide visual feedback to the player.
+- `get_dirty_rects(self)`: Reports the screen regions covered by entities in this frame and the previous one, so the dirty-rectangle renderer only presents what moved.
+- `handle_event(self, events)`: Processes input specific to the gameplay, such as pausing the game.
 
 The `Gameplay` state is critical for encapsulating the interactive part of the game, ensuring the game's rules are followed, and providing a dynamic and engaging experience for the player. It manages the flow of the game, the game's logic, and the visual presentation of the game world.
 """
@@ -30,9 +38,22 @@ class Gameplay(GameState):
         game (Game): The main game object which holds components like the asset manager and state manager.
         player (Player): The player's character within the game.
         enemies (list): A list of Enemy objects representing the adversaries in the game.
+        swarms (list): EnemySwarm groups for large numbers of identical enemies, stepped
+            with vectorized behaviors.
         level (Level): The current level of the game, handling the layout and progression.
+            Only the chunks within STREAM_RADIUS chunks of the player are loaded.
         collision_manager (CollisionManager): Manages collisions between game entities.
+        ai_scheduler (AIScheduler): Runs the enemies' behaviors each tick, on the main
+            thread, in the game's AI worker processes or, with AI level of detail, at a
+            rate set by distance to the player and visibility.
+        camera (Camera): Maps world space to screen space, following the player.
     """
+
+    MAX_DIRTY_RECTS = 256  # Beyond this many moving entities a full-screen update is cheaper
+    STREAM_RADIUS = 2  # Chunks around the player kept loaded; enemies further away are frozen
+    DRAW_MARGIN = 50  # World pixels beyond the view still drawn, for entities moved since the broadphase
+    LEVEL_SOURCE_PATH = os.path.join("levels", "level1.txt")  # Text layout with spawn markers
+    LEVEL_PATH = os.path.join("levels", "level1.lvl")  # Built from the source when missing or older
     
     def __init__(self, game):
         """
@@ -42,54 +63,98 @@ class Gameplay(GameState):
             game (Game): The main game object which provides access to shared resources and managers.
         """
         super().__init__(game)
-        player_sprite = self.game.asset_manager.get_image("player")
+        # Sprites are pinned so a memory-budgeted asset cache never evicts them while in use.
+        player_sprite = self.game.asset_manager.acquire("player")
         player_x = 800 / 2 - player_sprite.get_width() / 2
         player_y = 500 / 2 - player_sprite.get_height() / 2
         self.player = Player(player_x, player_y, player_sprite, 100)
 
-        self.enemies = [Enemy(200, 150, self.game.asset_manager.get_image("enemy"), 50, ChasePlayerBehavior())]
-        self.level = Level(self.game)
-        self.level.load([
-            "WWWWWWWWWWWWWWWW",
-            "WFFFFFFFFFFFFFFW",
-            "WFFFFFFFFFFFFFFW",
-            "WFFFFFFFFFFFFFFW",
-            "WFFFFFFFFFFFFFFW",
-            "WFFFFFFFFFFFFFFW",
-            "WFFFFFFFFFFFFFFW",
-            "WFFFFFFFFFFFFFFW",
-            "WFFFFFFFFFFFFFFW",
-            "WWWWWWWWWWWWWWWW",
-        ])
+        # One flow field is shared by every enemy, so pathfinding cost does not grow with enemy count.
+        self.enemy_behavior = FlowFieldBehavior()
+        if self.game.ai_lod:
+            self.ai_scheduler = LODAIScheduler(self.game.ai_budget_ms)
+        elif self.game.ai_workers:
+            self.ai_scheduler = ParallelAIScheduler(self.game.ai_workers)
+        else:
+            self.ai_scheduler = AIScheduler()
+        self.swarms = []
+        self.level = Level(self.game, stream_radius=self.STREAM_RADIUS)
+        self.load_level()
+        enemy_sprite = self.game.asset_manager.acquire("enemy")
+        self.enemies = []
+        for kind, col, row in self.level.spawns:
+            if kind == "player":
+                self.player.rect.topleft = (col * TILE_SIZE, row * TILE_SIZE)
+                self.player.store_previous_position()
+            elif kind == "enemy":
+                self.enemies.append(Enemy(col * TILE_SIZE, row * TILE_SIZE, enemy_sprite, 50, self.enemy_behavior))
         self.collision_manager = CollisionManager(self.level)
+        self.level.stream_around(self.player.rect.center, wait=True)
+        self.camera = Camera(*self.game.screen.get_size())
+        self.camera.follow(self.player.rect, self.level.bounds, snap=True)
+        self.previous_entity_rects = None
+        self.drawn_camera_position = None
+
+    def load_level(self):
+        """
+        Loads the level file, converting the text layout into it first if the file is
+        missing or older than the layout.
+        """
+        if (not os.path.exists(self.LEVEL_PATH)
+                or os.path.getmtime(self.LEVEL_SOURCE_PATH) > os.path.getmtime(self.LEVEL_PATH)):
+            convert(self.LEVEL_SOURCE_PATH, self.LEVEL_PATH)
+        self.level.load_file(self.LEVEL_PATH)
 
     def enter(self):
         """
         Prepares the Gameplay state upon entering. This could include loading resources,
         initializing entities, or resetting game variables.
         """
-        pass
+        self.previous_entity_rects = None
+        self.camera.follow(self.player.rect, self.level.bounds, snap=True)
+        # Drawing finds entities through the spatial index, so it must be current.
+        self.collision_manager.update_broadphase([self.player] + self.enemies)
 
     def update(self):
         """
         Updates the game logic each frame, handling player input, updating entity states,
-        and managing game progression.
+        and managing game progression. Player input is read from the frame's input
+        snapshot rather than by polling the event queue again.
         """
-        events = pygame.event.get()
-        for event in events:
-            if event.type == pygame.QUIT:
-                self.game.running = False
-            else:
-                self.player.handle_event(event)
-        
-        self.player.update(self.collision_manager)
+        # Positions at the start of the tick are what `draw` interpolates from.
+        self.player.store_previous_position()
+        for enemy in self.enemies:
+            enemy.store_previous_position()
+        for swarm in self.swarms:
+            swarm.store_previous_positions()
+
+        self.player.update(self.collision_manager, self.game.input.snapshot)
+        self.level.stream_around(self.player.rect.center)
         self.level.update()
 
-        for enemy in self.enemies:
-            enemy.update(self.player, self.collision_manager)
-            if self.collision_manager.check_entity_collision(self.player, enemy):
+        # Enemies on unloaded chunks would walk through walls that are not there.
+        active = [enemy for enemy in self.enemies if self.level.is_loaded_at(enemy.rect.center)]
+        self.ai_scheduler.update(active, self.player, self.collision_manager, self.camera.rect)
+
+        # Only pairs sharing a broadphase cell are tested, so this stays roughly
+        # linear in the number of entities instead of checking every pair.
+        self.collision_manager.update_broadphase([self.player] + self.enemies)
+        for entity1, entity2 in self.collision_manager.get_candidate_pairs():
+            if not self.collision_manager.check_entity_collision(entity1, entity2):
+                continue
+            if entity1 is self.player:
+                self.player.take_damage(10)
+                self.resolve_entity_collision(self.player, entity2)
+            else:
+                self.separate_entities(entity1, entity2)
+
+        for swarm in self.swarms:
+            swarm.update(self.player, self.collision_manager)
+            for index in swarm.colliding_indices(self.player.rect):
                 self.player.take_damage(10)
-                self.resolve_entity_collision(self.player, enemy)
+                self.resolve_entity_collision(self.player, swarm[index])
+
+        self.camera.follow(self.player.rect, self.level.bounds)
 
     def resolve_entity_collision(self, entity1, entity2):
         """
@@ -99,39 +164,93 @@ class Gameplay(GameState):
             entity1 (Entity): The first entity involved in the collision.
             entity2 (Entity): The second entity involved in the collision.
         """
-        # Basic collision resolution logic
-        if entity1.rect.x < entity2.rect.x:
-            entity1.rect.x -= 5
-        else:
-            entity1.rect.x += 5
-        if entity1.rect.y < entity2.rect.y:
-            entity1.rect.y -= 5
-        else:
-            entity1.rect.y += 5
-        entity1.x, entity1.y = entity1.rect.topleft
+        # Basic collision resolution logic; the push stops at walls
+        dx = -5 if entity1.rect.x < entity2.rect.x else 5
+        dy = -5 if entity1.rect.y < entity2.rect.y else 5
+        entity1.rect = self.collision_manager.move_rect(entity1.rect, dx, dy, "Wall")
+
+    def separate_entities(self, entity1, entity2):
+        """
+        Pushes apart two overlapping non-player entities (e.g. enemies crowding the
+        same spot) by nudging the first one away from the second, as far as walls allow.
+
+        Parameters:
+            entity1 (Entity): The entity to move.
+            entity2 (Entity): The entity it overlaps.
+        """
+        dx = -1 if entity1.rect.x < entity2.rect.x else 1
+        dy = -1 if entity1.rect.y < entity2.rect.y else 1
+        entity1.rect = self.collision_manager.move_rect(entity1.rect, dx, dy, "Wall")
 
-    def draw(self, screen):
+    def get_dirty_rects(self):
+        """
+        Reports the regions covered by the player and enemies in the previous frame
+        (to erase them) and in this one (to draw them). An entity is drawn somewhere
+        between its previous and latest tick position, so its region spans both.
+        Falls back to a full redraw when the camera moves, the level's baked surfaces
+        are being re-rendered or there are too many entities.
+
+        Returns:
+            list of pygame.Rect or None: The changed regions, or None for a full redraw.
+        """
+        rects = [self.swept_rect(entity) for entity in [self.player] + self.enemies]
+        for swarm in self.swarms:
+            if len(rects) + len(swarm) > self.MAX_DIRTY_RECTS:
+                # Leaving the swarm out would never present it; redraw everything.
+                self.previous_entity_rects = None
+                return None
+            for x, y, prev_x, prev_y, width, height in zip(
+                    swarm.x.tolist(), swarm.y.tolist(), swarm.prev_x.tolist(), swarm.prev_y.tolist(),
+                    swarm.width.tolist(), swarm.height.tolist()):
+                rect = pygame.Rect(x, y, width, height).union((prev_x, prev_y, width, height))
+                rects.append(rect.inflate(2, 2))
+        previous, self.previous_entity_rects = self.previous_entity_rects, rects
+        if (previous is None or len(rects) + len(previous) > self.MAX_DIRTY_RECTS
+                or self.camera.moved() or self.camera.rect.topleft != self.drawn_camera_position
+                or self.level.needs_redraw(self.camera.rect)):
+            return None
+        offset = self.camera.offset()
+        return [rect.move(offset) for rect in previous + rects]
+
+    @staticmethod
+    def swept_rect(entity):
+        """Returns the region an entity can be drawn in between its previous and latest tick."""
+        rect = entity.rect.union(entity.rect.move(int(entity.prev_x - entity.x), int(entity.prev_y - entity.y)))
+        return rect.inflate(2, 2)
+
+    def draw(self, screen, alpha=1.0):
         """
         Draws the game state to the screen, rendering the level, player, and enemies.
         
         Parameters:
             screen (pygame.Surface): The screen surface to draw the game elements on.
+            alpha (float, optional): How far between the previous and the latest tick to
+                draw moving entities.
         """
         screen.fill((0, 0, 0))
-        self.level.draw(screen)
-        self.player.draw(screen)
-        for enemy in self.enemies:
-            enemy.draw(screen)
+        view = self.camera.view(alpha)
+        dx, dy = offset = self.camera.offset(alpha)
+        self.drawn_camera_position = view.topleft
+        self.level.draw(screen, offset, view)
+
+        # The player comes first in the spatial index, so it is drawn below the enemies
+        # as before. One batched call; enemy sprites usually share an atlas page.
+        visible = self.collision_manager.query_rect(view.inflate(self.DRAW_MARGIN * 2, self.DRAW_MARGIN * 2))
+        blits = []
+        for entity in visible:
+            x, y = entity.interpolated_position(alpha)
+            blits.append((entity.sprite, (x + dx, y + dy)))
+        screen.blits(blits, False)
+        for swarm in self.swarms:
+            swarm.draw(screen, alpha, offset, view)
 
     def handle_event(self, events):
         """
-        Handles player input events, such as movement commands and game state changes.
+        Handles game state changes, such as pausing. Player movement is read from the
+        input snapshot in `update`, so events are not forwarded to the player.
         
         Parameters:
             events (list): A list of events to be processed.
         """
-        for event in events:
-            self.player.handle_event(event)
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    self.game.state_manager.change_state("Pause")
\ No newline at end of file
+        if self.game.input.snapshot.was_pressed("pause"):
+            self.game.state_manager.change_state("Pause")
\ No newline at end of file
@@ -0,0 +1,92 @@
+import pygame
+from states.game_state import GameState
+
+"""
+The `Loading` class is a `GameState` shown while the game's assets load in the background. It starts an asynchronous load through the `AssetManager`, polls it every frame so the window keeps responding, and draws a progress bar driven by the load's progress callback. Once every asset is loaded it hands control back to the game, which sets up the remaining states.
+
+Key Features and Methods:
+- `__init__(self, game, asset_list, on_complete)`: Stores the asset definitions to load and the callback to run once loading has finished.
+- `enter(self)`: Starts loading the assets on the asset manager's thread pool.
+- `update(self)`: Polls the load, finishing loaded assets on the main thread, and calls the completion callback when it is done.
+- `draw(self, screen)`: Draws the loading message and a progress bar.
+"""
+
+class Loading(GameState):
+    """
+    The Loading state displays loading progress while assets are loaded on worker
+    threads.
+
+    Attributes:
+        game (Game): Reference to the main game object.
+        asset_list (list of dict): The asset definitions to load.
+        on_complete (callable): Called once every asset has been loaded.
+        job (AssetLoadJob or None): The running load job.
+        loaded (int): The number of assets loaded so far, as reported by the job.
+        total (int): The number of assets to load.
+    """
+
+    def __init__(self, game, asset_list, on_complete):
+        """
+        Initializes the Loading state.
+
+        Parameters:
+            game (Game): The main game object.
+            asset_list (list of dict): The asset definitions to load.
+            on_complete (callable): Called once every asset has been loaded.
+        """
+        super().__init__(game)
+        self.asset_list = asset_list
+        self.on_complete = on_complete
+        self.job = None
+        self.loaded = 0
+        self.total = 0
+        self.font = game.text_cache.get_font(None, 36)
+
+    def enter(self):
+        """
+        Starts loading the assets in the background.
+        """
+        self.job = self.game.asset_manager.load_assets_async(self.asset_list, self.on_progress)
+        self.total = self.job.total
+
+    def on_progress(self, loaded, total):
+        """
+        Progress callback of the load job.
+
+        Parameters:
+            loaded (int): The number of assets loaded so far.
+            total (int): The number of assets to load.
+        """
+        self.loaded = loaded
+        self.total = total
+
+    def update(self):
+        """
+        Finishes the assets loaded since the last frame and, once everything is loaded,
+        calls the completion callback.
+        """
+        if self.job and self.job.poll():
+            self.job = None
+            self.on_complete()
+
+    def draw(self, screen, alpha=1.0):
+        """
+        Draws the loading message and a progress bar.
+
+        Parameters:
+            screen (pygame.Surface): The screen surface to draw on.
+            alpha (float, optional): Unused; the progress bar is not interpolated.
+        """
+        screen.fill((0, 0, 0))
+        progress = self.loaded / self.total if self.total else 1.0
+        text_surf = self.game.text_cache.render(self.font, f"Loading... {int(progress * 100)}%", (255, 255, 255))
+        x = screen.get_width() / 2 - text_surf.get_width() / 2
+        y = screen.get_height() / 2 - 40
+        screen.blit(text_surf, (x, y))
+
+        bar = pygame.Rect(0, 0, screen.get_width() // 2, 20)
+        bar.center = (screen.get_width() // 2, screen.get_height() // 2 + 10)
+        pygame.draw.rect(screen, (255, 255, 255), bar, 2)
+        filled = bar.inflate(-6, -6)
+        filled.width = int(filled.width * progress)
+        pygame.draw.rect(screen, (255, 255, 255), filled)
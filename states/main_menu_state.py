@@ -12,6 +12,8 @@ class MainMenu:
         options (list): List of menu options as strings.
         selected_option (int): Index of the currently selected menu option.
         font (pygame.font.Font): Font used for rendering menu option texts.
+        dirty_rects (list or None): Screen regions changed since the last frame, or None
+            if the whole menu must be redrawn.
     """
 
     def __init__(self, game):
@@ -25,21 +27,22 @@ class MainMenu:
         self.game = game
         self.options = ["Start Game", "Exit"]
         self.selected_option = 0
-        self.font = pygame.font.Font(None, 36)  # Default font and size
+        self.font = game.text_cache.get_font(None, 36)  # Default font and size, shared through the text cache
+        self.dirty_rects = None
 
     def enter(self):
         """
-        Called when the MainMenu state is entered. It registers the MainMenu as an event
-        listener to the game's event manager to receive input events.
+        Called when the MainMenu state is entered. Input events reach the menu through
+        the state manager like any other state, so it does not register with the event
+        manager (which would deliver every key press a second time).
         """
-        self.game.event_manager.register_listener(self)
+        self.dirty_rects = None
 
     def exit(self):
         """
-        Called when exiting the MainMenu state. It unregisters the MainMenu from the game's
-        event manager, stopping it from receiving further input events.
+        Called when exiting the MainMenu state.
         """
-        self.game.event_manager.unregister_listener(self)
+        pass
 
     def update(self):
         """
@@ -48,18 +51,51 @@ class MainMenu:
         """
         pass
 
-    def draw(self, screen):
+    def option_rect(self, index):
+        """
+        Returns the screen strip occupied by a menu option, used to report the regions
+        that change when the selection moves.
+
+        Parameters:
+            index (int): The index of the option.
+        """
+        return pygame.Rect(0, 150 + index * 40, self.game.screen.get_width(), 40)
+
+    def select_option(self, index):
+        """
+        Moves the selection to another option, marking both affected options as dirty.
+
+        Parameters:
+            index (int): The index of the option to select.
+        """
+        if index != self.selected_option and self.dirty_rects is not None:
+            self.dirty_rects += [self.option_rect(self.selected_option), self.option_rect(index)]
+        self.selected_option = index
+
+    def get_dirty_rects(self):
+        """
+        Reports the regions that changed since the last frame. The menu is static, so
+        this is empty unless the selection moved.
+
+        Returns:
+            list of pygame.Rect or None: The changed regions, or None for a full redraw.
+        """
+        rects, self.dirty_rects = self.dirty_rects, []
+        return rects
+
+    def draw(self, screen, alpha=1.0):
         """
         Draws the MainMenu options to the given screen. Highlights the currently selected
         option to provide visual feedback to the player.
 
         Parameters:
             screen (pygame.Surface): The screen surface to draw the menu options on.
+            alpha (float, optional): Unused; nothing in the menu moves between ticks.
         """
         screen.fill((0, 0, 0))  # Clear screen with black background
         for i, option in enumerate(self.options):
             color = (255, 0, 0) if i == self.selected_option else (255, 255, 255)
-            text_surface = self.font.render(option, True, color)
+            text_surface = self.game.text_cache.render(self.font, option, color)
             screen.blit(text_surface, (screen.get_width() // 2 - text_surface.get_width() // 2, 150 + i*40))
 
     def handle_event(self, events):
@@ -74,9 +110,9 @@ class MainMenu:
         for event in events:
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_UP:
-                    self.selected_option = max(0, self.selected_option - 1)
+                    self.select_option(max(0, self.selected_option - 1))
                 elif event.key == pygame.K_DOWN:
-                    self.selected_option = min(len(self.options) - 1, self.selected_option + 1)
+                    self.select_option(min(len(self.options) - 1, self.selected_option + 1))
                 elif event.key == pygame.K_RETURN:
                     if self.selected_option == 0:  # Start Game
                         self.game.state_manager.change_state("Gameplay")
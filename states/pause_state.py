@@ -7,7 +7,7 @@ The `Pause` class extends the `GameState` class to implement the pause menu func
 Key Features and Methods:
 - `__init__(self, game)`: Initializes the pause state with a reference to the main game object. It sets up the pause menu options and the currently selected menu item.
 - `update(self)`: Handles the logic for navigating the pause menu options. This method should be extended to update the selection based on user input.
-- `draw(self, screen)`: Renders a semi-transparent overlay on the current game screen to create a dim effect, indicating that the game is paused. It then draws the menu options, highlighting the currently selected option.
+- `draw(self, screen)`: Renders a semi-transparent overlay on the current game screen to create a dim effect, indicating that the game is paused. It then draws the menu options, highlighting the currently selected option. The overlay surface is created once and the option texts come from the game's text cache, so drawing the menu allocates nothing.
 - `resume_game(self)`: A method called to resume the game, typically triggered when the "Resume" option is selected.
 - `to_main_menu(self)`: Transitions the game state to the main menu, usually called when the "Main Menu" option is selected.
 - `handle_event(self, events)`: Processes keyboard inputs to navigate through the pause menu options and select an option. It supports navigation with the up and down arrow keys and selection with the return or space key.
@@ -28,6 +28,11 @@ class Pause(GameState):
         options (list of tuple): List of menu options as tuples, where each tuple contains
             the option text and the method to call when selected.
         selected_index (int): Index of the currently selected menu option.
+        font (pygame.font.Font): Font used for the menu options, shared through the text cache.
+        overlay (pygame.Surface or None): The dimming overlay, created on first draw and
+            recreated only if the screen size changes.
+        dirty_rects (list or None): Screen regions changed since the last frame, or None
+            if the whole menu must be redrawn.
     """
 
     def __init__(self, game):
@@ -41,6 +46,15 @@ class Pause(GameState):
         super().__init__(game)
         self.options = [("Resume", self.resume_game), ("Main Menu", self.to_main_menu)]
         self.selected_index = 0
+        self.dirty_rects = None
+        self.font = game.text_cache.get_font(None, 36)
+        self.overlay = None
+
+    def enter(self):
+        """
+        Marks the whole pause menu for redrawing when the state is entered.
+        """
+        self.dirty_rects = None
 
     def update(self):
         """
@@ -50,7 +64,7 @@ class Pause(GameState):
         """
         pass
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         """
         Draws the pause menu to the given screen, including a semi-transparent overlay
         over the current game screen to indicate that the game is paused, and the menu
@@ -58,20 +72,54 @@ class Pause(GameState):
 
         Parameters:
             screen (pygame.Surface): The screen surface to draw the pause menu on.
+            alpha (float, optional): Unused; nothing in the menu moves between ticks.
         """
-        overlay = pygame.Surface((self.game.screen.get_width(), self.game.screen.get_height()))
-        overlay.set_alpha(128)  # Semi-transparent overlay
-        overlay.fill((0, 0, 0))  # Black overlay
-        screen.blit(overlay, (0, 0))
+        size = self.game.screen.get_size()
+        if self.overlay is None or self.overlay.get_size() != size:
+            self.overlay = pygame.Surface(size)
+            self.overlay.set_alpha(128)  # Semi-transparent overlay
+            self.overlay.fill((0, 0, 0))  # Black overlay
+        screen.blit(self.overlay, (0, 0))
 
-        font = pygame.font.Font(None, 36)
         for index, (option_text, _) in enumerate(self.options):
             color = (255, 0, 0) if index == self.selected_index else (255, 255, 255)
-            text_surf = font.render(option_text, True, color)
+            text_surf = self.game.text_cache.render(self.font, option_text, color)
             x = screen.get_width() / 2 - text_surf.get_width() / 2
             y = screen.get_height() / 2 + index * 40
             screen.blit(text_surf, (x, y))
 
+    def option_rect(self, index):
+        """
+        Returns the screen strip occupied by a menu option.
+
+        Parameters:
+            index (int): The index of the option.
+        """
+        screen = self.game.screen
+        return pygame.Rect(0, screen.get_height() // 2 + index * 40, screen.get_width(), 40)
+
+    def select_option(self, index):
+        """
+        Moves the selection to another option, marking both affected options as dirty.
+
+        Parameters:
+            index (int): The index of the option to select.
+        """
+        if index != self.selected_index and self.dirty_rects is not None:
+            self.dirty_rects += [self.option_rect(self.selected_index), self.option_rect(index)]
+        self.selected_index = index
+
+    def get_dirty_rects(self):
+        """
+        Reports the regions that changed since the last frame; empty unless the
+        selection moved.
+
+        Returns:
+            list of pygame.Rect or None: The changed regions, or None for a full redraw.
+        """
+        rects, self.dirty_rects = self.dirty_rects, []
+        return rects
+
     def resume_game(self):
         """
         Resumes the game by changing the current state back to Gameplay.
@@ -96,9 +144,9 @@ class Pause(GameState):
         for event in events:
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_UP:
-                    self.selected_index = (self.selected_index - 1) % len(self.options)
+                    self.select_option((self.selected_index - 1) % len(self.options))
                 elif event.key == pygame.K_DOWN:
-                    self.selected_index = (self.selected_index + 1) % len(self.options)
+                    self.select_option((self.selected_index + 1) % len(self.options))
                 elif event.key == pygame.K_RETURN or event.key == pygame.K_SPACE:
                     _, action = self.options[self.selected_index]
                     action()
\ No newline at end of file
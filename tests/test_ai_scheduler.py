@@ -0,0 +1,171 @@
+import itertools
+import random
+import unittest
+from unittest import mock
+
+import pygame
+from entities.enemy import Enemy
+from entities.player import Player
+from game.ai_manager import AIBehavior, ChasePlayerBehavior, FlowFieldBehavior
+from game.ai_scheduler import LODAIScheduler, ParallelAIScheduler
+from game.collision_manager import CollisionManager
+from level.level import Level
+
+LAYOUT = [
+    "WWWWWWWWWWWWWWWW",
+    "WFFFFFWFFFFFFFFW",
+    "WFWFFFFFFWFFWWFW",
+    "WFFFFWWFFFFFFWFW",
+    "WFFFFFFFWFFFFFFW",
+    "WWFFFFFFFFWWWFFW",
+    "WFFFWFFFFFFFFFFW",
+    "WFFFFFFWFFFWFFFW",
+    "WFFWFFFFFFFFFFFW",
+    "WWWWWWWWWWWWWWWW",
+]
+
+
+class TestParallelAIScheduler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.scheduler = ParallelAIScheduler(2, min_batch=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.scheduler.close()
+
+    def setUp(self):
+        self.level = Level(None)
+        self.level.load(LAYOUT)
+        self.collision_manager = CollisionManager(self.level)
+        self.sprite = pygame.Surface((30, 30))
+        self.player = Player(7 * 50 + 10, 4 * 50 + 10, self.sprite, 100)
+
+    def spawn(self, seed, count=200):
+        """Places enemies with mixed behaviors and speeds on free tiles, the same ones for a seed."""
+        rng = random.Random(seed)
+        chase, flow = ChasePlayerBehavior(), FlowFieldBehavior()
+        enemies = []
+        while len(enemies) < count:
+            x = rng.randrange(len(LAYOUT[0]) * 50 - 30)
+            y = rng.randrange(len(LAYOUT) * 50 - 30)
+            enemy = Enemy(x, y, self.sprite, 50, flow if len(enemies) % 2 else chase)
+            enemy.speed = rng.choice((1, 3, 20, 45, 120))
+            if not self.collision_manager.check_tile_collision(enemy.rect, "Wall"):
+                enemies.append(enemy)
+        return enemies
+
+    def test_intents_match_serial_execute(self):
+        for seed in range(3):
+            serial, parallel = self.spawn(seed), self.spawn(seed)
+            for enemy in serial:
+                enemy.ai_behavior.execute(enemy, self.player, self.collision_manager)
+            self.scheduler.update(parallel, self.player, self.collision_manager)
+            self.scheduler.apply_intents(self.collision_manager)
+            self.assertEqual([enemy.rect for enemy in parallel], [enemy.rect for enemy in serial])
+
+    def test_intents_are_applied_on_the_next_tick(self):
+        enemies = self.spawn(0)
+        start = [enemy.rect.copy() for enemy in enemies]
+        self.scheduler.update(enemies, self.player, self.collision_manager)
+        self.assertEqual([enemy.rect for enemy in enemies], start)
+        self.scheduler.update(enemies, self.player, self.collision_manager)
+        self.assertNotEqual([enemy.rect for enemy in enemies], start)
+        self.scheduler.apply_intents(self.collision_manager)
+
+    def test_moved_enemies_are_resolved_again(self):
+        serial, parallel = self.spawn(1), self.spawn(1)
+        self.scheduler.update(parallel, self.player, self.collision_manager)
+        intents = []
+        for enemy in serial:
+            start = enemy.rect.topleft
+            enemy.ai_behavior.execute(enemy, self.player, self.collision_manager)
+            intents.append((enemy.rect.x - start[0], enemy.rect.y - start[1]))
+        # Pushed apart from each other after the snapshot was taken.
+        expected = []
+        for enemy, (dx, dy) in zip(parallel[::2], intents[::2]):
+            enemy.rect.move_ip(9, -6)
+            expected.append(self.collision_manager.move_rect(enemy.rect, dx, dy, "Wall"))
+        self.scheduler.apply_intents(self.collision_manager)
+        self.assertEqual([enemy.rect for enemy in parallel[::2]], expected)
+        self.assertEqual([enemy.rect for enemy in parallel[1::2]], [enemy.rect for enemy in serial[1::2]])
+
+
+class StepBehavior(AIBehavior):
+    """Moves an enemy by a fixed step as far as walls allow, recording every enemy it runs for."""
+
+    def __init__(self, dx=0, dy=0):
+        self.dx, self.dy = dx, dy
+        self.runs = []
+
+    def execute(self, enemy, player, collision_manager):
+        self.runs.append(enemy)
+        enemy.rect = collision_manager.move_rect(enemy.rect, self.dx, self.dy, "Wall")
+
+
+class TestLODAIScheduler(unittest.TestCase):
+    def setUp(self):
+        self.level = Level(None)
+        self.level.load(LAYOUT)
+        self.collision_manager = CollisionManager(self.level)
+        self.sprite = pygame.Surface((30, 30))
+        self.player = Player(7 * 50 + 10, 4 * 50 + 10, self.sprite, 100)
+
+    def enemy_at(self, distance, behavior):
+        """Returns an enemy whose center is `distance` pixels right of the player's."""
+        return Enemy(self.player.x + distance, self.player.y, self.sprite, 50, behavior)
+
+    def tick(self, scheduler, enemies, ticks=1, view=None):
+        for _ in range(ticks):
+            scheduler.update(enemies, self.player, self.collision_manager, view)
+
+    def test_tier_intervals(self):
+        behavior = StepBehavior()
+        near, middle, far = (self.enemy_at(distance, behavior) for distance in (300, 1000, 3000))
+        self.tick(LODAIScheduler(), [near, middle, far], 32)
+        self.assertEqual([behavior.runs.count(enemy) for enemy in (near, middle, far)], [32, 8, 2])
+
+    def test_visible_enemies_run_every_tick(self):
+        behavior = StepBehavior()
+        far = self.enemy_at(3000, behavior)
+        self.tick(LODAIScheduler(), [far], 16, view=far.rect.inflate(10, 10))
+        self.assertEqual(len(behavior.runs), 16)
+
+    def test_new_enemies_are_spread_over_their_interval(self):
+        behavior = StepBehavior()
+        enemies = [self.enemy_at(3000 + index, behavior) for index in range(32)]
+        scheduler = LODAIScheduler()
+        for _ in range(32):
+            self.tick(scheduler, enemies)
+            self.assertEqual(scheduler.stats["run"], 2)
+        self.assertEqual(sorted(map(id, behavior.runs)), sorted(map(id, enemies * 2)))
+
+    def test_budget_defers_to_the_next_tick(self):
+        behavior = StepBehavior()
+        enemies = [self.enemy_at(100, behavior) for _ in range(5)]
+        scheduler = LODAIScheduler(budget_ms=0)
+        # Every clock reading is later than the last, so each budget runs out after one update.
+        with mock.patch("game.ai_scheduler.time.perf_counter", side_effect=itertools.count()):
+            for _ in range(5):
+                self.tick(scheduler, enemies)
+                self.assertEqual(scheduler.stats, {"run": 1, "deferred": 4, "extrapolated": 0})
+        # Deferred enemies are the most overdue, so each runs before any runs again.
+        self.assertEqual(behavior.runs, enemies)
+
+    def test_extrapolation_stops_at_walls(self):
+        # Row 1 is clear from column 7 up to the wall at column 15.
+        behavior = StepBehavior(dx=10)
+        enemy = Enemy(655, 60, self.sprite, 50, behavior)
+        scheduler = LODAIScheduler(tiers=((10, 1),), far_interval=16)
+        self.tick(scheduler, [enemy], 16)
+        self.assertEqual((enemy.x, scheduler.stats), (665, {"run": 1, "deferred": 0, "extrapolated": 0}))
+        self.tick(scheduler, [enemy])
+        self.assertEqual((enemy.x, scheduler.stats), (675, {"run": 0, "deferred": 0, "extrapolated": 1}))
+        self.tick(scheduler, [enemy], 4)
+        self.assertEqual(enemy.x, 715)
+        self.tick(scheduler, [enemy])  # The next step would enter the wall
+        self.assertEqual((enemy.x, scheduler.stats), (715, {"run": 0, "deferred": 0, "extrapolated": 0}))
+        self.tick(scheduler, [enemy], 9)
+        self.assertEqual(enemy.x, 715)
+        self.tick(scheduler, [enemy])  # Its next update slides it flush against the wall
+        self.assertEqual((enemy.x, enemy.rect.right, len(behavior.runs)), (720, 750, 2))
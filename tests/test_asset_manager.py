@@ -0,0 +1,62 @@
+import os
+import unittest
+
+import pygame
+from game.asset_manager import AssetManager
+
+ASSETS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+
+
+class TestAssetBudget(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        pygame.display.init()
+        pygame.display.set_mode((1, 1))  # Needed by convert_alpha
+
+    def manager(self, budget_bytes):
+        manager = AssetManager(lazy=True, budget_bytes=budget_bytes)
+        manager.manifest = {
+            "player": {"type": "image", "name": "player", "path": os.path.join(ASSETS, "player.jpg"),
+                       "width": 40, "height": 40},
+            "enemy": {"type": "image", "name": "enemy", "path": os.path.join(ASSETS, "enemy.jpg"),
+                      "width": 40, "height": 40},
+        }
+        return manager
+
+    def test_least_recently_used_is_evicted(self):
+        manager = self.manager(40 * 40 * 4)
+        manager.get_image("player")
+        manager.get_image("enemy")
+        self.assertNotIn("player", manager.images)
+        self.assertIn("enemy", manager.images)
+        self.assertEqual(manager.stats["evictions"], 1)
+
+    def test_asset_over_budget_stays_until_replaced(self):
+        manager = self.manager(100)
+        image = manager.get_image("player")
+        self.assertIn("player", manager.images)
+        self.assertIs(manager.get_image("player"), image)
+        self.assertEqual(manager.stats["misses"], 1)
+        manager.get_image("enemy")
+        self.assertNotIn("player", manager.images)
+
+    def test_acquired_asset_over_budget_is_pinned(self):
+        manager = self.manager(100)
+        image = manager.acquire("player")
+        self.assertEqual(manager.pins, {("image", "player"): 1})
+        manager.get_image("enemy")
+        self.assertIs(manager.get_image("player"), image)
+        self.assertEqual(manager.stats["misses"], 2)  # Only the first loads of each image
+        manager.release("player")
+        self.assertEqual(manager.pins, {})
+        self.assertNotIn("player", manager.images)
+
+    def test_unknown_assets_are_not_pinned(self):
+        manager = self.manager(100)
+        self.assertIsNone(manager.acquire("missing"))
+        self.assertEqual(manager.pins, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
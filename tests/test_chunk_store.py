@@ -0,0 +1,31 @@
+import threading
+import unittest
+
+from level.chunk import ChunkStore
+
+
+class TestChunkStore(unittest.TestCase):
+    def setUp(self):
+        self.store = ChunkStore(size=2)
+
+    def test_save_and_load(self):
+        self.store.reset({(0, 0): bytes(4)})
+        self.store.save((0, 0), bytearray(b"\x01\x02\x03\x04")).result()
+        chunk = self.store.load((0, 0)).result()
+        self.assertEqual(bytes(chunk.cells), b"\x01\x02\x03\x04")
+        self.assertIsNone(self.store.load((5, 5)).result())
+
+    def test_reset_waits_for_queued_saves(self):
+        self.store.reset({(0, 0): bytes(4)})
+        release = threading.Event()
+        self.store._executor.submit(release.wait)  # Hold the worker so the save stays queued
+        self.store.save((0, 0), b"\x01\x01\x01\x01")
+        threading.Timer(0.05, release.set).start()
+        self.store.reset({(1, 1): bytes(4)})
+        self.store.flush()
+        self.assertEqual(self.store.keys, {(1, 1)})
+        self.assertIsNone(self.store.get((0, 0)))
+
+
+if __name__ == "__main__":
+    unittest.main()
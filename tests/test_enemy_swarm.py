@@ -0,0 +1,98 @@
+import os
+import unittest
+
+import pygame
+from entities.enemy_swarm import EnemySwarm, SwarmChasePlayerBehavior
+from game.game import Game
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAYOUT = ["W" * 20] + ["W" + "F" * 18 + "W" for _ in range(14)] + ["W" * 20]
+COLOR = (255, 0, 255)
+
+
+class TestSwarmGameplay(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.cwd = os.getcwd()
+        os.chdir(ROOT)  # The game reads its asset config and level relative to the working directory
+        cls.game = Game(headless=True, screen_size=(400, 300))
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls.cwd)
+
+    def setUp(self):
+        self.gameplay = self.game.state_manager.states["Gameplay"]
+        self.gameplay.level.load(LAYOUT)
+        self.gameplay.enemies = []
+        self.gameplay.player.rect.topleft = (450, 350)
+        self.gameplay.player.store_previous_position()
+        self.gameplay.player.health = 100
+        self.gameplay.level.stream_around(self.gameplay.player.rect.center, wait=True)
+        self.game.state_manager.change_state("Gameplay")
+        self.sprite = pygame.Surface((20, 20))
+        self.sprite.fill(COLOR)
+        self.swarm = EnemySwarm(self.sprite, SwarmChasePlayerBehavior())
+        self.gameplay.swarms = [self.swarm]
+
+    def screen_position(self, x, y):
+        offset = self.gameplay.camera.offset()
+        return x + offset[0], y + offset[1]
+
+    def test_swarm_is_stepped_and_drawn(self):
+        self.swarm.spawn([300, 600], [350, 200], 10, speed=4)
+        self.game.step(5, render=True)
+        self.assertEqual(self.swarm.x.tolist(), [320, 580])
+        self.assertEqual(self.swarm.y.tolist(), [350, 220])
+        for member in self.swarm:
+            position = self.screen_position(member.x + 10, member.y + 10)
+            self.assertEqual(self.game.screen.get_at(position)[:3], COLOR)
+
+    def test_swarm_stops_at_walls(self):
+        self.swarm.spawn(60, 60, 10, speed=40)  # Next to the top-left corner, chasing away from it
+        self.gameplay.player.rect.topleft = (55, 55)
+        self.game.step(1)
+        self.assertEqual((int(self.swarm.x[0]), int(self.swarm.y[0])), (50, 50))
+
+    def test_touching_members_hurt_the_player(self):
+        self.swarm.spawn(self.gameplay.player.x, self.gameplay.player.y, 10)
+        self.game.step(1)
+        self.assertEqual(self.gameplay.player.health, 90)
+
+    def test_dirty_rects_cover_the_swarm(self):
+        self.swarm.spawn([300, 600], [350, 200], 10, speed=4)
+        self.game.step(2, render=True)
+        self.gameplay.get_dirty_rects()
+        self.swarm.store_previous_positions()
+        self.swarm.update(self.gameplay.player, self.gameplay.collision_manager)
+        rects = self.gameplay.get_dirty_rects()
+        self.assertIsNotNone(rects)
+        for member in self.swarm:
+            drawn = member.rect.move(self.gameplay.camera.offset())
+            self.assertTrue(any(rect.contains(drawn) for rect in rects), drawn)
+
+    def test_large_swarm_redraws_everything(self):
+        self.swarm.spawn(list(range(60, 60 + self.gameplay.MAX_DIRTY_RECTS)), 60, 10)
+        self.game.step(1, render=True)
+        self.gameplay.get_dirty_rects()
+        self.assertIsNone(self.gameplay.get_dirty_rects())
+        self.assertIsNone(self.gameplay.previous_entity_rects)
+
+
+class TestSwarmEnemy(unittest.TestCase):
+    def test_draw_matches_entity_signature(self):
+        sprite = pygame.Surface((4, 4))
+        sprite.fill(COLOR)
+        swarm = EnemySwarm(sprite)
+        swarm.spawn(0, 0, 10)
+        swarm.store_previous_positions()
+        swarm[0].move(10, 20)
+        screen = pygame.Surface((40, 40))
+        swarm[0].draw(screen, 0.5, (3, 4))
+        self.assertEqual(screen.get_at((8, 14))[:3], COLOR)
+        self.assertEqual(screen.get_at((7, 14))[:3], (0, 0, 0))
+        self.assertEqual(swarm[0].interpolated_position(0.5), (5, 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
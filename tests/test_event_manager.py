@@ -0,0 +1,80 @@
+import unittest
+
+import pygame
+from game.event_manager import EventManager
+
+
+class Recorder:
+    def __init__(self, name, log, consume=False, action=None):
+        self.name = name
+        self.log = log
+        self.consume = consume
+        self.action = action
+
+    def handle_event(self, event):
+        self.log.append(self.name)
+        if self.action:
+            self.action()
+        return self.consume
+
+
+class TestEventManager(unittest.TestCase):
+    def setUp(self):
+        self.manager = EventManager()
+        self.log = []
+        self.key = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a)
+
+    def listener(self, name, **kwargs):
+        return Recorder(name, self.log, **kwargs)
+
+    def test_priority_order(self):
+        self.manager.register_listener(self.listener("low"), priority=-1)
+        self.manager.register_listener(self.listener("first"))
+        self.manager.register_listener(self.listener("high"), priority=10)
+        self.manager.register_listener(self.listener("second"))
+        self.manager.dispatch(self.key)
+        self.assertEqual(self.log, ["high", "first", "second", "low"])
+
+    def test_event_type_filter(self):
+        self.manager.register_listener(self.listener("keys"), event_types=(pygame.KEYDOWN,))
+        self.manager.register_listener(self.listener("mouse"), event_types=(pygame.MOUSEBUTTONDOWN,))
+        self.manager.register_listener(self.listener("all"))
+        self.manager.dispatch(self.key)
+        self.assertEqual(self.log, ["keys", "all"])
+
+    def test_consuming_stops_dispatch(self):
+        self.manager.register_listener(self.listener("consumer", consume=True), priority=1)
+        self.manager.register_listener(self.listener("after"))
+        self.assertTrue(self.manager.dispatch(self.key))
+        self.assertEqual(self.log, ["consumer"])
+        self.manager.unregister_listener(self.manager.listeners[0])
+        self.assertFalse(self.manager.dispatch(self.key))
+
+    def test_unregister_during_dispatch(self):
+        later = self.listener("later")
+        self.manager.register_listener(
+            self.listener("remover", action=lambda: self.manager.unregister_listener(later)), priority=1)
+        self.manager.register_listener(later)
+        self.manager.dispatch(self.key)
+        self.assertEqual(self.log, ["remover"])
+        self.assertNotIn(later, self.manager.listeners)
+
+    def test_register_during_dispatch(self):
+        added = self.listener("added")
+        self.manager.register_listener(
+            self.listener("adder", action=lambda: self.manager.register_listener(added)))
+        self.manager.dispatch(self.key)
+        self.assertEqual(self.log, ["adder"])  # Takes effect from the next event
+        self.manager.dispatch(self.key)
+        self.assertEqual(self.log, ["adder", "adder", "added"])
+
+    def test_duplicate_registration_is_ignored(self):
+        listener = self.listener("once")
+        self.manager.register_listener(listener)
+        self.manager.register_listener(listener, priority=5)
+        self.manager.dispatch(self.key)
+        self.assertEqual(self.log, ["once"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from level.level import Level
+from level.level_file import HEADER, LAYER_ENTRY, PALETTE_ENTRY, LevelFile, read_layout, write_level_file
+from level.tile import EMPTY, FLOOR, WALL
+
+LAYOUT = [
+    "WWWWW",
+    "WFFFW",
+    "WFWFW",
+    "WWWWW",
+]
+
+
+class TestLevelFile(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "test.lvl")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def load(self, chunk_size=2):
+        write_level_file(self.path, LAYOUT, [("player", 1, 1), ("enemy", 3, 2)], chunk_size)
+        level = Level(None)
+        level.load_file(self.path)
+        self.addCleanup(level.store.source.close)
+        return level
+
+    def assert_layout(self, level):
+        for row, line in enumerate(LAYOUT):
+            for col, char in enumerate(line):
+                expected = WALL if char == "W" else FLOOR
+                self.assertEqual(level.get_tile_id(col, row), expected.tile_id, (col, row))
+
+    def test_round_trip(self):
+        level = self.load()
+        self.assert_layout(level)
+        self.assertEqual(level.spawns, [("player", 1, 1), ("enemy", 3, 2)])
+        self.assertEqual(level.bounds.size, (5 * 50, 4 * 50))
+        self.assertEqual(level.chunk_size, 2)
+        # Padding of the partial chunks at the right and bottom edges is empty.
+        self.assertEqual(level.get_tile_id(5, 0), EMPTY)
+
+    def test_read_layout_takes_out_spawn_markers(self):
+        path = os.path.join(self.directory, "test.txt")
+        with open(path, "w") as f:
+            f.write("WWW\nWPW\nWEW\n")
+        layout, spawns = read_layout(path)
+        self.assertEqual(layout, ["WWW", "WFW", "WFW"])
+        self.assertEqual(spawns, [("player", 1, 1), ("enemy", 1, 2)])
+
+    def test_palette_remap(self):
+        write_level_file(self.path, LAYOUT, [], chunk_size=2)
+        # Rewrite the file as if Wall and Floor had swapped IDs when it was written.
+        swap = bytes.maketrans(bytes([WALL.tile_id, FLOOR.tile_id]), bytes([FLOOR.tile_id, WALL.tile_id]))
+        with open(self.path, "r+b") as f:
+            data = bytearray(f.read())
+            palette_size = HEADER.unpack_from(data)[6]
+            for index in range(palette_size):
+                position = HEADER.size + index * PALETTE_ENTRY.size
+                data[position] = swap[data[position]]
+            layers = HEADER.size + palette_size * PALETTE_ENTRY.size
+            offset = LAYER_ENTRY.unpack_from(data, layers)[1]
+            data[offset:] = bytes(data[offset:]).translate(swap)
+            f.seek(0)
+            f.write(data)
+
+        level_file = LevelFile(self.path)
+        self.addCleanup(level_file.close)
+        self.assertIsNotNone(level_file.remap)
+        level = Level(None)
+        level.load_file(self.path)
+        self.addCleanup(level.store.source.close)
+        self.assert_layout(level)
+
+    def test_edits_do_not_modify_the_file(self):
+        level = self.load()
+        level.set_tile_id(1, 1, WALL.tile_id)
+        self.assertEqual(level.get_tile_id(1, 1), WALL.tile_id)
+        reloaded = self.load()
+        self.assertEqual(reloaded.get_tile_id(1, 1), FLOOR.tile_id)
+
+    def test_rejects_names_that_do_not_fit(self):
+        with mock.patch.object(WALL, "name", "W" * 16):
+            with self.assertRaises(ValueError):
+                write_level_file(self.path, LAYOUT)
+        with self.assertRaises(ValueError):
+            write_level_file(self.path, LAYOUT, [("a_very_long_spawn_kind", 0, 0)])
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a level file" * 4)
+        with self.assertRaises(ValueError):
+            LevelFile(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import random
+import unittest
+
+import numpy as np
+import pygame
+from entities.enemy_swarm import EnemySwarm, SwarmChasePlayerBehavior
+from entities.player import Player
+from game.ai_scheduler import ParallelAIScheduler, _sweep
+from game.collision_manager import CollisionManager
+from level.level import Level
+from level.tile import tile_ids_matching
+
+LAYOUT = [
+    "WWWWWWWWWWWW",
+    "WFFFFFWFFFFW",
+    "WFWFFFFFFWFW",
+    "WFFFFWWFFFFW",
+    "WFFFFFFFWFFW",
+    "WWFFFFFFFFFW",
+    "WFFFWFFFFFFW",
+    "WWWWWWWWWWWW",
+]
+
+
+def step_reference(collision_manager, rect, delta, axis):
+    """
+    Moves a rect pixel by pixel along one axis, stopping before it would overlap a
+    wall in a grid line it did not overlap at the start.
+    """
+    size = collision_manager.cell_size
+    start_lines = range(rect[axis] // size, (rect[axis] + rect.size[axis] - 1) // size + 1)
+    step = (1 if delta > 0 else -1, 0) if axis == 0 else (0, 1 if delta > 0 else -1)
+    for _ in range(abs(delta)):
+        moved = rect.move(step)
+        for col, row in collision_manager._cells(moved):
+            line = col if axis == 0 else row
+            tile_type = collision_manager.level.get_tile_type(col, row)
+            if line not in start_lines and tile_type is not None and tile_type.name == "Wall":
+                return rect
+        rect = moved
+    return rect
+
+
+class TestMoveRect(unittest.TestCase):
+    def setUp(self):
+        self.level = Level(None)
+        self.level.load(LAYOUT)
+        self.collision_manager = CollisionManager(self.level)
+        self.size = self.collision_manager.cell_size
+
+    def reference(self, rect, dx, dy):
+        rect = step_reference(self.collision_manager, rect, dx, 0)
+        return step_reference(self.collision_manager, rect, dy, 1)
+
+    def test_matches_pixel_stepping(self):
+        rng = random.Random(7)
+        width, height = len(LAYOUT[0]) * self.size, len(LAYOUT) * self.size
+        for _ in range(2000):
+            rect = pygame.Rect(rng.randrange(width), rng.randrange(height),
+                               rng.choice((1, 10, 30, 50, 70)), rng.choice((1, 10, 30, 50, 70)))
+            dx, dy = rng.randint(-160, 160), rng.randint(-160, 160)
+            self.assertEqual(self.collision_manager.move_rect(rect, dx, dy, "Wall"),
+                             self.reference(rect, dx, dy), (rect, dx, dy))
+
+    def test_stops_flush_against_walls(self):
+        rect = pygame.Rect(60, 60, 30, 30)  # Inside cell (1, 1); wall column 0 to the left
+        self.assertEqual(self.collision_manager.move_rect(rect, -25, 0, "Wall").left, 50)
+        self.assertEqual(self.collision_manager.move_rect(rect, 0, -25, "Wall").top, 50)
+        self.assertEqual(self.collision_manager.move_rect(rect, 500, 0, "Wall").right, 300)
+
+    def test_slides_along_walls(self):
+        rect = pygame.Rect(60, 60, 30, 30)
+        moved = self.collision_manager.move_rect(rect, -20, 40, "Wall")
+        self.assertEqual(moved.topleft, (50, 100))
+
+    def test_fast_moves_do_not_tunnel(self):
+        rect = pygame.Rect(160, 60, 30, 30)  # Cell (3, 1); wall at column 6
+        moved = self.collision_manager.move_rect(rect, 1000, 0, "Wall")
+        self.assertEqual(moved.right, 300)
+
+    def test_can_leave_overlapped_walls(self):
+        rect = pygame.Rect(40, 60, 30, 30)  # Overlaps the wall at column 0
+        self.assertEqual(self.collision_manager.move_rect(rect, 10, 0, "Wall").left, 50)
+        # Only walls in newly entered lines block: moving down, the wall below stops it.
+        self.assertEqual(self.collision_manager.move_rect(rect, -5, 0, "Wall").left, 35)
+        self.assertEqual(self.collision_manager.move_rect(rect, 0, 20, "Wall").top, 70)
+
+    def test_other_tile_types_do_not_block(self):
+        rect = pygame.Rect(60, 60, 30, 30)
+        self.assertEqual(self.collision_manager.move_rect(rect, -25, 0, "Floor").left, 35)
+        self.assertEqual(self.collision_manager.move_rect(rect, -25, 0, "Lava").left, 35)
+
+    def test_worker_sweep_matches(self):
+        cols, rows = len(LAYOUT[0]), len(LAYOUT)
+        grid = bytearray(cols * rows)
+        ParallelAIScheduler.write_grid(grid, self.level, 0, 0, cols, rows)
+        blocked = tile_ids_matching("Wall")
+        rng = random.Random(11)
+        for _ in range(1000):
+            rect = pygame.Rect(rng.randrange(cols * self.size), rng.randrange(rows * self.size), 40, 40)
+            dx, dy = rng.randint(-160, 160), rng.randint(-160, 160)
+            x, y, width, height = rect
+            moved_x = _sweep(grid, blocked, 0, 0, cols, rows, self.size, x, x + width, y, y + height, dx, False)
+            moved_y = _sweep(grid, blocked, 0, 0, cols, rows, self.size, y, y + height, x + moved_x,
+                             x + moved_x + width, dy, True)
+            self.assertEqual(rect.move(moved_x, moved_y), self.collision_manager.move_rect(rect, dx, dy, "Wall"),
+                             (rect, dx, dy))
+
+    def test_swarm_step_matches(self):
+        rng = random.Random(13)
+        cols, rows = len(LAYOUT[0]), len(LAYOUT)
+        sprite = pygame.Surface((1, 1))
+        for _ in range(20):
+            swarm = EnemySwarm(sprite, SwarmChasePlayerBehavior())
+            count = 200
+            swarm.spawn([rng.randrange(-100, cols * self.size + 100) for _ in range(count)],
+                        [rng.randrange(-100, rows * self.size + 100) for _ in range(count)], 10,
+                        [rng.choice((1, 7, 30, 60, 160)) for _ in range(count)])
+            swarm.width = np.array([rng.choice((1, 10, 40, 70)) for _ in range(count)], dtype=np.int64)
+            swarm.height = np.array([rng.choice((1, 10, 40, 70)) for _ in range(count)], dtype=np.int64)
+            player = Player(rng.randrange(cols * self.size), rng.randrange(rows * self.size), sprite, 100)
+            expected = []
+            for member in swarm:
+                rect, speed = member.rect, member.speed
+                dx = speed if player.x > rect.x else -speed if player.x < rect.x else 0
+                dy = speed if player.y > rect.y else -speed if player.y < rect.y else 0
+                expected.append(self.collision_manager.move_rect(rect, dx, dy, "Wall"))
+            swarm.update(player, self.collision_manager)
+            self.assertEqual([member.rect for member in swarm], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+from level import tile
+from level.chunk import CHUNK_SIZE
+from level.level import Level
+from level.tile import EMPTY, FLOOR, WALL, get_tile_type, register_tile_type, tile_ids_matching
+
+
+class TestTileRegistry(unittest.TestCase):
+    def setUp(self):
+        # Tile types registered by a test are removed again afterwards.
+        saved = (list(tile.TILE_TYPES), dict(tile._types_by_name), dict(tile._types_by_char))
+
+        def restore():
+            tile.TILE_TYPES[:], names, chars = saved
+            tile._types_by_name.clear()
+            tile._types_by_name.update(names)
+            tile._types_by_char.clear()
+            tile._types_by_char.update(chars)
+            tile._matching_ids.clear()
+        self.addCleanup(restore)
+
+    def test_matching_ids(self):
+        self.assertEqual(tile_ids_matching("Wall"), frozenset({WALL.tile_id}))
+        self.assertEqual(tile_ids_matching("Floor"), frozenset({FLOOR.tile_id}))
+        self.assertEqual(tile_ids_matching(), frozenset({WALL.tile_id}))
+        self.assertEqual(tile_ids_matching("Lava"), frozenset())
+
+    def test_registering_a_type_refreshes_cached_queries(self):
+        self.assertEqual(tile_ids_matching("Lava"), frozenset())
+        solid_before = tile_ids_matching()
+        lava = register_tile_type("Lava", "L", (255, 0, 0), solid=True)
+        self.assertEqual(tile_ids_matching("Lava"), frozenset({lava.tile_id}))
+        self.assertEqual(tile_ids_matching(), solid_before | {lava.tile_id})
+        self.assertIs(get_tile_type("Lava"), lava)
+
+    def test_duplicate_names_and_chars_are_rejected(self):
+        with self.assertRaises(ValueError):
+            register_tile_type("Wall", "?", (0, 0, 0))
+        with self.assertRaises(ValueError):
+            register_tile_type("Other", "W", (0, 0, 0))
+
+
+class TestLevelGrid(unittest.TestCase):
+    def test_round_trip_across_chunk_borders(self):
+        level = Level(None)
+        level.load(["F" * (CHUNK_SIZE * 2)] * (CHUNK_SIZE * 2))
+        edge = CHUNK_SIZE - 1
+        cells = [(edge, edge), (edge + 1, edge), (edge, edge + 1), (edge + 1, edge + 1)]
+        for index, (col, row) in enumerate(cells):
+            level.set_tile_id(col, row, WALL.tile_id if index % 2 else EMPTY)
+        for index, (col, row) in enumerate(cells):
+            self.assertEqual(level.get_tile_id(col, row), WALL.tile_id if index % 2 else EMPTY)
+        # Neighbouring cells in every chunk are untouched.
+        self.assertEqual(level.get_tile_id(edge - 1, edge), FLOOR.tile_id)
+        self.assertEqual(level.get_tile_id(edge + 2, edge + 1), FLOOR.tile_id)
+        self.assertEqual(len(level.chunks), 4)
+
+    def test_unloaded_cells_are_empty(self):
+        level = Level(None, stream_radius=0)
+        level.load(["W" * (CHUNK_SIZE * 4)] * CHUNK_SIZE)
+        self.assertEqual(level.get_tile_id(0, 0), EMPTY)
+        level.stream_around((0, 0), wait=True)
+        self.assertEqual(level.get_tile_id(0, 0), WALL.tile_id)
+        self.assertEqual(level.get_tile_id(CHUNK_SIZE * 3, 0), EMPTY)
+        self.assertEqual(level.get_tile_id(-1, -1), EMPTY)
+
+    def test_setting_an_unloaded_cell_loads_its_chunk(self):
+        level = Level(None, stream_radius=0)
+        level.load(["W" * (CHUNK_SIZE * 4)] * CHUNK_SIZE)
+        col = CHUNK_SIZE * 3 + 1
+        level.set_tile_id(col, 0, FLOOR.tile_id)
+        self.assertEqual(level.get_tile_id(col, 0), FLOOR.tile_id)
+        self.assertEqual(level.get_tile_id(col + 1, 0), WALL.tile_id)
+
+
+if __name__ == "__main__":
+    unittest.main()